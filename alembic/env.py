@@ -0,0 +1,49 @@
+"""
+Ambiente do Alembic
+
+Usa a mesma URL do banco da aplicação (settings.database_url, driver
+síncrono pymysql) e os metadados dos modelos para --autogenerate.
+"""
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.core.database import Base
+import app.models  # noqa: F401 - registra as tabelas em Base.metadata
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+def run_migrations_offline() -> None:
+    """Gera o SQL das migrações sem conectar (alembic upgrade head --sql)"""
+    context.configure(
+        url=settings.database_url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online() -> None:
+    """Executa as migrações conectado ao MySQL"""
+    connectable = create_engine(settings.database_url, poolclass=NullPool)
+
+    with connectable.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,117 @@
+"""Índices compostos alinhados às consultas da API
+
+Cria os índices compostos usados pelas listagens (paginação keyset por
+usuario_id + coluna de ordenação + id), pelos filtros por status, pelo feed
+de atividades e pelas estatísticas/remoções por hábito e objetivo.
+
+Remove os índices de uma coluna criados por index=True nos modelos
+(ix_<tabela>_<coluna>): usuario_id, habito_id e objetivo_id são prefixos
+dos compostos, e status/prioridade/progresso/prazo/posicao/created_at
+sozinhos nunca são usados, já que toda consulta filtra pelo usuário. Cada
+índice a mais é custo em todo INSERT/UPDATE.
+
+Idempotente: bancos que já receberam parte dos índices por
+criar_indices_paginacao.sql, criar_indices_atividade.sql ou
+Base.metadata.create_all só ganham os que faltam.
+
+Revision ID: 0001_indices_compostos
+Revises:
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0001_indices_compostos"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (nome, tabela, colunas) - mesmos índices declarados em __table_args__ dos modelos
+INDICES = [
+    # OBJETIVOS
+    ("ix_objetivos_usuario_created_at_id", "objetivos", ["usuario_id", "created_at", "id"]),
+    ("ix_objetivos_usuario_updated_at_id", "objetivos", ["usuario_id", "updated_at", "id"]),
+    ("ix_objetivos_usuario_titulo_id", "objetivos", ["usuario_id", "titulo", "id"]),
+    ("ix_objetivos_usuario_progresso_id", "objetivos", ["usuario_id", "progresso", "id"]),
+    ("ix_objetivos_usuario_inicio_id", "objetivos", ["usuario_id", "inicio", "id"]),
+    ("ix_objetivos_usuario_fim_id", "objetivos", ["usuario_id", "fim", "id"]),
+    ("ix_objetivos_usuario_status_created_at_id", "objetivos", ["usuario_id", "status", "created_at", "id"]),
+
+    # HABITOS
+    ("ix_habitos_usuario_created_at_id", "habitos", ["usuario_id", "created_at", "id"]),
+    ("ix_habitos_usuario_updated_at_id", "habitos", ["usuario_id", "updated_at", "id"]),
+    ("ix_habitos_usuario_titulo_id", "habitos", ["usuario_id", "titulo", "id"]),
+    ("ix_habitos_usuario_progresso_id", "habitos", ["usuario_id", "progresso", "id"]),
+    ("ix_habitos_usuario_objetivo_created_at_id", "habitos", ["usuario_id", "objetivo_id", "created_at", "id"]),
+    ("ix_habitos_usuario_status_created_at_id", "habitos", ["usuario_id", "status", "created_at", "id"]),
+    ("ix_habitos_objetivo_usuario", "habitos", ["objetivo_id", "usuario_id"]),
+
+    # TAREFAS
+    ("ix_tarefas_usuario_created_at_id", "tarefas", ["usuario_id", "created_at", "id"]),
+    ("ix_tarefas_usuario_updated_at_id", "tarefas", ["usuario_id", "updated_at", "id"]),
+    ("ix_tarefas_usuario_titulo_id", "tarefas", ["usuario_id", "titulo", "id"]),
+    ("ix_tarefas_usuario_prioridade_id", "tarefas", ["usuario_id", "prioridade", "id"]),
+    ("ix_tarefas_usuario_progresso_id", "tarefas", ["usuario_id", "progresso", "id"]),
+    ("ix_tarefas_usuario_prazo_id", "tarefas", ["usuario_id", "prazo", "id"]),
+    ("ix_tarefas_usuario_posicao_id", "tarefas", ["usuario_id", "posicao", "id"]),
+    ("ix_tarefas_usuario_habito_created_at_id", "tarefas", ["usuario_id", "habito_id", "created_at", "id"]),
+    ("ix_tarefas_usuario_status_created_at_id", "tarefas", ["usuario_id", "status", "created_at", "id"]),
+    ("ix_tarefas_usuario_status_updated_at_id", "tarefas", ["usuario_id", "status", "updated_at", "id"]),
+    ("ix_tarefas_habito_usuario", "tarefas", ["habito_id", "usuario_id"]),
+
+    # FEED DE ATIVIDADES
+    ("ix_habito_realizacoes_usuario_created_at_id", "habito_realizacoes", ["usuario_id", "created_at", "id"]),
+    ("ix_audit_log_usuario_tabela_created_at_id", "audit_log", ["usuario_id", "tabela", "created_at", "id"]),
+]
+
+# (tabela, coluna) dos índices de uma coluna substituídos pelos compostos acima
+INDICES_REDUNDANTES = [
+    *(("objetivos", coluna) for coluna in ("usuario_id", "status", "progresso", "created_at")),
+    *(("habitos", coluna) for coluna in ("usuario_id", "objetivo_id", "frequencia", "status", "progresso", "created_at")),
+    *(("tarefas", coluna) for coluna in (
+        "usuario_id", "habito_id", "prioridade", "status", "prazo", "progresso", "posicao", "created_at"
+    )),
+    ("habito_realizacoes", "usuario_id"),
+]
+
+
+def _indices_existentes():
+    """
+    {tabela: {nomes dos índices}} das tabelas presentes no banco
+    (None no modo offline, --sql, em que não há banco para inspecionar)
+    """
+    if op.get_context().as_sql:
+        return None
+    inspector = sa.inspect(op.get_bind())
+    tabelas = set(inspector.get_table_names())
+    return {
+        tabela: {indice["name"] for indice in inspector.get_indexes(tabela)}
+        for tabela in {tabela for _, tabela, _ in INDICES} | {tabela for tabela, _ in INDICES_REDUNDANTES}
+        if tabela in tabelas
+    }
+
+
+def upgrade() -> None:
+    existentes = _indices_existentes()
+    for nome, tabela, colunas in INDICES:
+        if existentes is None or (tabela in existentes and nome not in existentes[tabela]):
+            op.create_index(nome, tabela, colunas)
+
+    for tabela, coluna in INDICES_REDUNDANTES:
+        nome = f"ix_{tabela}_{coluna}"
+        if existentes is None or nome in existentes.get(tabela, ()):
+            op.drop_index(nome, table_name=tabela)
+
+
+def downgrade() -> None:
+    existentes = _indices_existentes()
+    for tabela, coluna in INDICES_REDUNDANTES:
+        nome = f"ix_{tabela}_{coluna}"
+        if existentes is None or (tabela in existentes and nome not in existentes[tabela]):
+            op.create_index(nome, tabela, [coluna])
+    for nome, tabela, _ in reversed(INDICES):
+        if existentes is None or nome in existentes.get(tabela, ()):
+            op.drop_index(nome, table_name=tabela)
@@ -0,0 +1,75 @@
+"""Índices FULLTEXT para a busca das listagens
+
+Cria os índices FULLTEXT usados por settings.fulltext_search
+(app/utils/busca.py) em objetivos e hábitos (titulo, descricao) e em
+tarefas (titulo, descricao, tags_texto). tags_texto é uma coluna gerada
+(STORED) com o texto do JSON de tags, já que o FULLTEXT não indexa JSON.
+
+Apenas MySQL; idempotente como a 0001.
+
+Revision ID: 0002_busca_fulltext
+Revises: 0001_indices_compostos
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0002_busca_fulltext"
+down_revision: Union[str, None] = "0001_indices_compostos"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (nome, tabela, colunas) - mesmas colunas de COLUNAS_FULLTEXT em app/utils/busca.py
+INDICES_FULLTEXT = [
+    ("ft_objetivos_busca", "objetivos", ["titulo", "descricao"]),
+    ("ft_habitos_busca", "habitos", ["titulo", "descricao"]),
+    ("ft_tarefas_busca", "tarefas", ["titulo", "descricao", "tags_texto"]),
+]
+
+
+def _existentes():
+    """
+    ({tabela: nomes dos índices}, colunas de tarefas) presentes no banco.
+    No modo offline (--sql) não há banco para inspecionar: tudo é gerado.
+    """
+    if op.get_context().as_sql:
+        return {}, set()
+    inspector = sa.inspect(op.get_bind())
+    indices = {
+        tabela: {indice["name"] for indice in inspector.get_indexes(tabela)}
+        for tabela in {tabela for _, tabela, _ in INDICES_FULLTEXT}
+    }
+    colunas = {coluna["name"] for coluna in inspector.get_columns("tarefas")}
+    return indices, colunas
+
+
+def upgrade() -> None:
+    if op.get_context().dialect.name != "mysql":
+        return
+    indices, colunas = _existentes()
+
+    if "tags_texto" not in colunas:
+        op.add_column("tarefas", sa.Column(
+            "tags_texto", sa.Text(), sa.Computed("CAST(tags AS CHAR)", persisted=True)
+        ))
+
+    for nome, tabela, colunas_indice in INDICES_FULLTEXT:
+        if nome not in indices.get(tabela, ()):
+            op.create_index(nome, tabela, colunas_indice, mysql_prefix="FULLTEXT")
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name != "mysql":
+        return
+    indices, colunas = _existentes()
+    offline = op.get_context().as_sql
+
+    for nome, tabela, _ in reversed(INDICES_FULLTEXT):
+        if offline or nome in indices[tabela]:
+            op.drop_index(nome, table_name=tabela)
+
+    if offline or "tags_texto" in colunas:
+        op.drop_column("tarefas", "tags_texto")
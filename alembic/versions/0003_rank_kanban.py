@@ -0,0 +1,99 @@
+"""Chave fracionária de ordem do kanban (tarefas.rank_kanban)
+
+Adiciona tarefas.rank_kanban (app/utils/rank.py), o índice
+(habito_id, status, rank_kanban, id) que mantém a leitura do quadro na ordem
+do índice e preenche as chaves das tarefas existentes, coluna a coluna do
+quadro (hábito + status exibidos na coluna, app/services/kanban.py), na
+ordem de posicao e created_at.
+
+Idempotente como a 0001: só cria o que falta e só preenche tarefas sem chave.
+
+Revision ID: 0003_rank_kanban
+Revises: 0002_busca_fulltext
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.services.kanban import COLUNAS_KANBAN, coluna_kanban
+from app.utils.rank import TAMANHO_COLUNA_RANK, ranks_distribuidos
+
+
+revision: str = "0003_rank_kanban"
+down_revision: Union[str, None] = "0002_busca_fulltext"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDICE = "ix_tarefas_habito_status_rank_kanban"
+
+tarefas = sa.table(
+    "tarefas",
+    sa.column("id", sa.String),
+    sa.column("habito_id", sa.String),
+    sa.column("status", sa.String),
+    sa.column("posicao", sa.Integer),
+    sa.column("created_at", sa.DateTime),
+    sa.column("rank_kanban", sa.String),
+)
+
+
+def _existentes():
+    """
+    (colunas, índices) de tarefas presentes no banco.
+    No modo offline (--sql) não há banco para inspecionar: tudo é gerado.
+    """
+    if op.get_context().as_sql:
+        return set(), set()
+    inspector = sa.inspect(op.get_bind())
+    colunas = {coluna["name"] for coluna in inspector.get_columns("tarefas")}
+    indices = {indice["name"] for indice in inspector.get_indexes("tarefas")}
+    return colunas, indices
+
+
+def _preencher_ranks() -> None:
+    """Chaves igualmente espaçadas por coluna, para as colunas com tarefas sem chave"""
+    conexao = op.get_bind()
+    pendentes = sa.select(tarefas.c.habito_id, tarefas.c.status).where(tarefas.c.rank_kanban.is_(None)).distinct()
+    colunas = {(habito_id, coluna_kanban(status)) for habito_id, status in conexao.execute(pendentes)}
+    for habito_id, coluna in sorted(colunas):
+        ids = conexao.execute(
+            sa.select(tarefas.c.id)
+            .where(tarefas.c.habito_id == habito_id, tarefas.c.status.in_(COLUNAS_KANBAN[coluna]))
+            .order_by(
+                tarefas.c.rank_kanban.is_(None), tarefas.c.rank_kanban,
+                tarefas.c.posicao.is_(None), tarefas.c.posicao,
+                tarefas.c.created_at, tarefas.c.id
+            )
+        ).scalars().all()
+        conexao.execute(
+            tarefas.update()
+            .where(tarefas.c.id == sa.bindparam("b_id"))
+            .values(rank_kanban=sa.bindparam("b_rank")),
+            [{"b_id": tarefa_id, "b_rank": rank} for tarefa_id, rank in zip(ids, ranks_distribuidos(len(ids)))]
+        )
+
+
+def upgrade() -> None:
+    colunas, indices = _existentes()
+
+    if "rank_kanban" not in colunas:
+        op.add_column("tarefas", sa.Column("rank_kanban", sa.String(TAMANHO_COLUNA_RANK), nullable=True))
+
+    if INDICE not in indices:
+        op.create_index(INDICE, "tarefas", ["habito_id", "status", "rank_kanban", "id"])
+
+    if not op.get_context().as_sql:
+        _preencher_ranks()
+
+
+def downgrade() -> None:
+    colunas, indices = _existentes()
+    offline = op.get_context().as_sql
+
+    if offline or INDICE in indices:
+        op.drop_index(INDICE, table_name="tarefas")
+
+    if offline or "rank_kanban" in colunas:
+        op.drop_column("tarefas", "rank_kanban")
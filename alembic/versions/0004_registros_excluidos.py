@@ -0,0 +1,52 @@
+"""Tombstones da sincronização incremental (registros_excluidos)
+
+Cria a tabela registros_excluidos, onde as rotas de exclusão gravam
+(usuario_id, tabela, registro_id, excluido_em), e o índice
+(usuario_id, excluido_em, id) lido por GET /sync?since=<cursor>.
+
+Idempotente como a 0001: só cria o que falta.
+
+Revision ID: 0004_registros_excluidos
+Revises: 0003_rank_kanban
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0004_registros_excluidos"
+down_revision: Union[str, None] = "0003_rank_kanban"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABELA = "registros_excluidos"
+INDICE = "ix_registros_excluidos_usuario_excluido_em_id"
+
+
+def _existe_tabela() -> bool:
+    """No modo offline (--sql) não há banco para inspecionar: tudo é gerado"""
+    if op.get_context().as_sql:
+        return False
+    return sa.inspect(op.get_bind()).has_table(TABELA)
+
+
+def upgrade() -> None:
+    if _existe_tabela():
+        return
+
+    op.create_table(
+        TABELA,
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("usuario_id", sa.String(36), nullable=False),
+        sa.Column("tabela", sa.String(50), nullable=False),
+        sa.Column("registro_id", sa.String(36), nullable=False),
+        sa.Column("excluido_em", sa.DateTime, nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index(INDICE, TABELA, ["usuario_id", "excluido_em", "id"])
+
+
+def downgrade() -> None:
+    if op.get_context().as_sql or _existe_tabela():
+        op.drop_table(TABELA)
@@ -0,0 +1,86 @@
+"""Data de conclusão das tarefas (tarefas.concluida_em)
+
+Adiciona tarefas.concluida_em, gravada quando o status passa a concluida e
+limpa quando a tarefa é reaberta. O feed de atividades ordena as tarefas
+concluídas por ela (updated_at também avança em edições e na reordenação
+do kanban), então o índice do feed passa a ser
+(usuario_id, status, concluida_em, id) no lugar de
+(usuario_id, status, updated_at, id).
+
+As tarefas já concluídas recebem concluida_em = updated_at, a melhor data
+disponível.
+
+Idempotente como a 0001: só cria o que falta e só preenche tarefas sem data.
+
+Revision ID: 0005_tarefas_concluida_em
+Revises: 0004_registros_excluidos
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0005_tarefas_concluida_em"
+down_revision: Union[str, None] = "0004_registros_excluidos"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDICE = "ix_tarefas_usuario_status_concluida_em_id"
+INDICE_ANTERIOR = "ix_tarefas_usuario_status_updated_at_id"
+
+tarefas = sa.table(
+    "tarefas",
+    sa.column("status", sa.String),
+    sa.column("updated_at", sa.DateTime),
+    sa.column("concluida_em", sa.DateTime),
+)
+
+
+def _existentes():
+    """
+    (colunas, índices) de tarefas presentes no banco.
+    No modo offline (--sql) não há banco para inspecionar: tudo é gerado.
+    """
+    if op.get_context().as_sql:
+        return set(), set()
+    inspector = sa.inspect(op.get_bind())
+    colunas = {coluna["name"] for coluna in inspector.get_columns("tarefas")}
+    indices = {indice["name"] for indice in inspector.get_indexes("tarefas")}
+    return colunas, indices
+
+
+def upgrade() -> None:
+    colunas, indices = _existentes()
+    offline = op.get_context().as_sql
+
+    if "concluida_em" not in colunas:
+        op.add_column("tarefas", sa.Column("concluida_em", sa.DateTime, nullable=True))
+
+    # updated_at = updated_at: o preenchimento não conta como edição da tarefa
+    op.execute(
+        tarefas.update()
+        .where(tarefas.c.status == "concluida", tarefas.c.concluida_em.is_(None))
+        .values(concluida_em=tarefas.c.updated_at, updated_at=tarefas.c.updated_at)
+    )
+
+    if INDICE not in indices:
+        op.create_index(INDICE, "tarefas", ["usuario_id", "status", "concluida_em", "id"])
+
+    if offline or INDICE_ANTERIOR in indices:
+        op.drop_index(INDICE_ANTERIOR, table_name="tarefas")
+
+
+def downgrade() -> None:
+    colunas, indices = _existentes()
+    offline = op.get_context().as_sql
+
+    if offline or INDICE_ANTERIOR not in indices:
+        op.create_index(INDICE_ANTERIOR, "tarefas", ["usuario_id", "status", "updated_at", "id"])
+
+    if offline or INDICE in indices:
+        op.drop_index(INDICE, table_name="tarefas")
+
+    if offline or "concluida_em" in colunas:
+        op.drop_column("tarefas", "concluida_em")
@@ -0,0 +1,68 @@
+"""Estatísticas por objetivo (objetivo_stats)
+
+Cria a tabela objetivo_stats (até aqui só em criar_objetivo_stats.sql e
+Base.metadata.create_all), mantida incrementalmente pela API
+(app/services/estatisticas.py), e a preenche a partir de hábitos e tarefas
+com o mesmo INSERT ... SELECT de reconstruir_objetivo_stats.
+
+Idempotente como a 0001: uma tabela já existente não é recriada nem
+repreenchida (use `python objetivo_stats.py verificar` / `reconstruir`).
+
+Revision ID: 0006_objetivo_stats
+Revises: 0005_tarefas_concluida_em
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.models import ObjetivoStats
+from app.services.estatisticas import CAMPOS_STATS, consulta_estatisticas
+
+
+revision: str = "0006_objetivo_stats"
+down_revision: Union[str, None] = "0005_tarefas_concluida_em"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABELA = "objetivo_stats"
+INDICE = "ix_objetivo_stats_usuario_id"
+
+
+def _existe_tabela() -> bool:
+    """No modo offline (--sql) não há banco para inspecionar: tudo é gerado"""
+    if op.get_context().as_sql:
+        return False
+    return sa.inspect(op.get_bind()).has_table(TABELA)
+
+
+def upgrade() -> None:
+    if _existe_tabela():
+        return
+
+    op.create_table(
+        TABELA,
+        sa.Column("objetivo_id", sa.String(36), primary_key=True),
+        sa.Column("usuario_id", sa.String(36), nullable=False),
+        sa.Column("total_habitos", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("habitos_ativos", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("soma_progresso_habitos", sa.Numeric(14, 2), nullable=False, server_default="0.00"),
+        sa.Column("total_tarefas", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("tarefas_concluidas", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("soma_progresso_tarefas", sa.Numeric(14, 2), nullable=False, server_default="0.00"),
+        sa.Column("updated_at", sa.DateTime, nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index(INDICE, TABELA, ["usuario_id"])
+
+    op.execute(
+        sa.insert(ObjetivoStats.__table__).from_select(
+            ["objetivo_id", "usuario_id", *CAMPOS_STATS],
+            consulta_estatisticas()
+        )
+    )
+
+
+def downgrade() -> None:
+    if op.get_context().as_sql or _existe_tabela():
+        op.drop_table(TABELA)
@@ -2,22 +2,25 @@
 Rotas da API - Autenticação e Dashboard
 Implementa autenticação, registro e dashboard do usuário
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from sqlalchemy import func, text
-from typing import Dict, Any
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, text, select
+from typing import Dict, Any, Optional
 from datetime import datetime, timedelta
-from app.core.database import get_db
+from fastapi.concurrency import run_in_threadpool
+from app.core.database import get_async_db
 from app.models import Usuario, Objetivo, Habito, Tarefa, HabitoRealizacao
 from app.schemas import (
     UserRegister, UserLogin, TokenResponse, UserResponse,
     DataResponse, DashboardResponse
 )
 from app.services.auth import (
-    authenticate_user, create_access_token, hash_password,
-    get_current_user, get_password_hash, verify_password
+    authenticate_user_async, create_access_token, hash_password,
+    get_current_user, get_password_hash, verify_password, invalidar_usuario
 )
+from app.services.dashboard import cache_dashboard
+from app.services.atividades import listar_atividades
 
 # Routers separados para organização
 auth_router = APIRouter(prefix="/auth", tags=["autenticação"])
@@ -29,12 +32,14 @@ user_router = APIRouter(prefix="/user", tags=["usuário"])
 @auth_router.post("/register", response_model=DataResponse, status_code=status.HTTP_201_CREATED)
 async def registrar_usuario(
     user_data: UserRegister,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Registra um novo usuário"""
     
     # Verificar se email já existe
-    existing_user = db.query(Usuario).filter(Usuario.email == user_data.email).first()
+    existing_user = (await db.execute(
+        select(Usuario).where(Usuario.email == user_data.email)
+    )).scalar_one_or_none()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -42,7 +47,7 @@ async def registrar_usuario(
         )
     
     # Criar usuário
-    hashed_password = hash_password(user_data.password)
+    hashed_password = await run_in_threadpool(hash_password, user_data.password)
     novo_usuario = Usuario(
         nome=user_data.nome,
         email=user_data.email,
@@ -51,8 +56,8 @@ async def registrar_usuario(
     )
     
     db.add(novo_usuario)
-    db.commit()
-    db.refresh(novo_usuario)
+    await db.commit()
+    await db.refresh(novo_usuario)
     
     # Gerar token de acesso
     access_token = create_access_token(data={"sub": novo_usuario.id})
@@ -72,11 +77,11 @@ async def registrar_usuario(
 @auth_router.post("/login", response_model=DataResponse)
 async def login_usuario(
     credentials: UserLogin,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Autentica usuário e retorna token"""
     
-    user = authenticate_user(db, credentials.email, credentials.password)
+    user = await authenticate_user_async(db, credentials.email, credentials.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -126,12 +131,14 @@ async def logout_usuario(
 
 @user_router.get("/profile", response_model=DataResponse)
 async def obter_perfil(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Obtém o perfil do usuário atual"""
     
-    usuario = db.query(Usuario).filter(Usuario.id == current_user["sub"]).first()
+    usuario = (await db.execute(
+        select(Usuario).where(Usuario.id == current_user["sub"])
+    )).scalar_one_or_none()
     
     if not usuario:
         raise HTTPException(
@@ -151,12 +158,14 @@ async def obter_perfil(
 @user_router.put("/profile", response_model=DataResponse)
 async def atualizar_perfil(
     update_data: Dict[str, Any],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Atualiza o perfil do usuário"""
     
-    usuario = db.query(Usuario).filter(Usuario.id == current_user["sub"]).first()
+    usuario = (await db.execute(
+        select(Usuario).where(Usuario.id == current_user["sub"])
+    )).scalar_one_or_none()
     
     if not usuario:
         raise HTTPException(
@@ -171,8 +180,9 @@ async def atualizar_perfil(
         if field in allowed_fields and value is not None:
             setattr(usuario, field, value)
     
-    db.commit()
-    db.refresh(usuario)
+    await db.commit()
+    invalidar_usuario(usuario.id)
+    await db.refresh(usuario)
     
     return DataResponse(data={
         "id": usuario.id,
@@ -185,7 +195,7 @@ async def atualizar_perfil(
 @user_router.post("/change-password", response_model=DataResponse)
 async def alterar_senha(
     passwords: Dict[str, str],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Altera a senha do usuário"""
@@ -199,7 +209,9 @@ async def alterar_senha(
             detail="Senha atual e nova senha são obrigatórias"
         )
     
-    usuario = db.query(Usuario).filter(Usuario.id == current_user["sub"]).first()
+    usuario = (await db.execute(
+        select(Usuario).where(Usuario.id == current_user["sub"])
+    )).scalar_one_or_none()
     
     if not usuario:
         raise HTTPException(
@@ -208,15 +220,16 @@ async def alterar_senha(
         )
     
     # Verificar senha atual
-    if not verify_password(current_password, usuario.senha_hash):
+    if not await run_in_threadpool(verify_password, current_password, usuario.senha_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Senha atual incorreta"
         )
     
     # Atualizar senha
-    usuario.senha_hash = get_password_hash(new_password)
-    db.commit()
+    usuario.senha_hash = await run_in_threadpool(get_password_hash, new_password)
+    await db.commit()
+    invalidar_usuario(usuario.id)
     
     return DataResponse(data={
         "message": "Senha alterada com sucesso"
@@ -226,127 +239,29 @@ async def alterar_senha(
 
 @dashboard_router.get("/stats", response_model=DataResponse)
 async def obter_estatisticas(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
-    """Obtém estatísticas do dashboard do usuário"""
+    """Obtém estatísticas do dashboard do usuário (cache por usuário, uma consulta agregada em falha)"""
     
-    user_id = current_user["sub"]
-    
-    # Contadores principais
-    total_objetivos = db.query(func.count(Objetivo.id)).filter(Objetivo.usuario_id == user_id).scalar()
-    total_habitos = db.query(func.count(Habito.id)).filter(Habito.usuario_id == user_id).scalar()
-    total_tarefas = db.query(func.count(Tarefa.id)).filter(Tarefa.usuario_id == user_id).scalar()
-    
-    # Objetivos por status
-    objetivos_ativos = db.query(func.count(Objetivo.id)).filter(
-        Objetivo.usuario_id == user_id,
-        Objetivo.status == 'ativo'
-    ).scalar()
-    
-    objetivos_concluidos = db.query(func.count(Objetivo.id)).filter(
-        Objetivo.usuario_id == user_id,
-        Objetivo.status == 'concluido'
-    ).scalar()
-    
-    # Hábitos por status
-    habitos_ativos = db.query(func.count(Habito.id)).filter(
-        Habito.usuario_id == user_id,
-        Habito.status == 'ativo'
-    ).scalar()
-    
-    # Tarefas por status kanban
-    tarefas_backlog = db.query(func.count(Tarefa.id)).filter(
-        Tarefa.usuario_id == user_id,
-        Tarefa.status_kanban == 'backlog'
-    ).scalar()
-    
-    tarefas_fazendo = db.query(func.count(Tarefa.id)).filter(
-        Tarefa.usuario_id == user_id,
-        Tarefa.status_kanban == 'fazendo'
-    ).scalar()
-    
-    tarefas_feitas = db.query(func.count(Tarefa.id)).filter(
-        Tarefa.usuario_id == user_id,
-        Tarefa.status_kanban == 'feito'
-    ).scalar()
-    
-    # Progresso médio dos objetivos
-    avg_progresso_objetivos = db.query(func.avg(Objetivo.progresso)).filter(
-        Objetivo.usuario_id == user_id,
-        Objetivo.status == 'ativo'
-    ).scalar() or 0
-    
-    # Progresso médio dos hábitos
-    avg_progresso_habitos = db.query(func.avg(Habito.progresso)).filter(
-        Habito.usuario_id == user_id,
-        Habito.status == 'ativo'
-    ).scalar() or 0
-    
-    # Realizações da semana (últimos 7 dias)
-    data_limite = datetime.utcnow() - timedelta(days=7)
-    realizacoes_semana = db.query(func.count(HabitoRealizacao.id)).filter(
-        HabitoRealizacao.usuario_id == user_id,
-        HabitoRealizacao.created_at >= data_limite
-    ).scalar()
-    
-    return DataResponse(data={
-        "totais": {
-            "objetivos": total_objetivos,
-            "habitos": total_habitos,
-            "tarefas": total_tarefas
-        },
-        "objetivos": {
-            "ativos": objetivos_ativos,
-            "concluidos": objetivos_concluidos,
-            "progresso_medio": float(avg_progresso_objetivos)
-        },
-        "habitos": {
-            "ativos": habitos_ativos,
-            "progresso_medio": float(avg_progresso_habitos)
-        },
-        "tarefas": {
-            "backlog": tarefas_backlog,
-            "fazendo": tarefas_fazendo,
-            "feitas": tarefas_feitas
-        },
-        "atividade": {
-            "realizacoes_ultima_semana": realizacoes_semana
-        }
-    })
+    estatisticas = await cache_dashboard.obter(db, current_user["sub"])
+    return DataResponse(data=estatisticas)
 
 @dashboard_router.get("/recent-activity", response_model=DataResponse)
 async def obter_atividade_recente(
-    limit: int = 10,
-    db: Session = Depends(get_db),
+    limit: int = Query(10, ge=1, le=100, description="Atividades por página"),
+    cursor: Optional[str] = Query(None, description="Cursor opaco retornado em next_cursor"),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
-    """Obtém atividades recentes do usuário"""
-    
-    user_id = current_user["sub"]
+    """Obtém atividades recentes do usuário (hábitos, tarefas e objetivos)"""
     
-    # Realizações recentes de hábitos
-    realizacoes_recentes = db.query(HabitoRealizacao).filter(
-        HabitoRealizacao.usuario_id == user_id
-    ).order_by(HabitoRealizacao.created_at.desc()).limit(limit).all()
+    atividades, pagination = await listar_atividades(db, current_user["sub"], limit, cursor)
     
-    atividades = []
-    for realizacao in realizacoes_recentes:
-        # Buscar dados do hábito
-        habito = db.query(Habito).filter(Habito.id == realizacao.habito_id).first()
-        if habito:
-            atividades.append({
-                "tipo": "habito_realizado",
-                "data": realizacao.created_at,
-                "descricao": f"Completou hábito: {habito.titulo}",
-                "entidade": {
-                    "id": habito.id,
-                    "titulo": habito.titulo,
-                    "tipo": "habito"
-                }
-            })
-    
-    return DataResponse(data=atividades)
+    return DataResponse(
+        data=[atividade.model_dump() for atividade in atividades],
+        pagination=pagination
+    )
 
 # === ROTAS DE UTILIDADE ===
 
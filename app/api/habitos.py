@@ -3,19 +3,25 @@ Rotas da API - Hábitos
 Implementa todas as operações CRUD para hábitos
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc, asc, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, desc, asc, func, text, select, delete
 from typing import List, Optional
 from datetime import date, datetime
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.models import Habito, HabitoRealizacao, Tarefa
 from app.schemas import (
-    HabitoCreate, HabitoUpdate, HabitoResponse, MarcarHabitoFeito,
+    HabitoCreate, HabitoUpdate, HabitoResponse, MarcarHabitoFeito, MarcarHabitosFeitosLote,
     HabitoFilters, PaginationParams, PaginationResponse, DataResponse
 )
 from app.services.auth import get_current_user
-from app.services.progress import recalcular_progresso_habito, marcar_habito_feito, resetar_ciclo_habito
-from app.utils.serialization import serialize_model, serialize_models, serialize_tarefas
+from app.services.progress import recalcular_progresso_habito, marcar_habito_feito, marcar_habitos_feitos, resetar_ciclo_habito
+from app.services.estatisticas import registrar_habito, registrar_alteracao_habito, registrar_remocao_habito
+from app.services.sincronizacao import registrar_exclusoes
+from app.utils.serialization import serialize_model, serialize_models, serialize_tarefas_linhas, colunas_modelo
+from app.utils.pagination import paginar, coluna_ordenacao, invalidar_totais, WITH_TOTAL_PATTERN
+from app.services.dashboard import invalidar_dashboard
+from app.utils.responses import resposta_lista
+from app.utils.busca import condicao_busca
 
 router = APIRouter(prefix="/habitos", tags=["habitos"])
 
@@ -25,64 +31,59 @@ async def listar_habitos(
     busca: Optional[str] = Query(None, description="Busca em título e descrição"),
     status: Optional[List[str]] = Query(None, description="Filtro por status"),
     frequencia: Optional[List[str]] = Query(None, description="Filtro por frequência"),
-    order_by: str = Query("created_at", description="Campo para ordenação"),
+    order_by: str = Query("created_at", description="Campo para ordenação (relevancia com busca)"),
     order_dir: str = Query("desc", pattern=r"^(asc|desc)$", description="Direção da ordenação"),
     page: int = Query(1, ge=1, description="Página"),
     limit: int = Query(50, ge=1, le=100, description="Itens por página"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (next_cursor)"),
+    with_total: str = Query("exact", pattern=WITH_TOTAL_PATTERN, description="Total: exact, estimate (cache) ou false"),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Lista hábitos do usuário com filtros e paginação"""
     
     # Query base
-    query = db.query(Habito).filter(Habito.usuario_id == current_user["sub"])
+    query = select(Habito).where(Habito.usuario_id == current_user["sub"])
     
     # Aplicar filtros
     if objetivo_id:
-        query = query.filter(Habito.objetivo_id == objetivo_id)
+        query = query.where(Habito.objetivo_id == objetivo_id)
     
+    relevancia = None
     if busca:
-        query = query.filter(
-            or_(
-                Habito.titulo.contains(busca),
-                Habito.descricao.contains(busca)
-            )
-        )
+        condicao, relevancia = condicao_busca(Habito, busca)
+        query = query.where(condicao)
     
     if status:
-        query = query.filter(Habito.status.in_(status))
+        query = query.where(Habito.status.in_(status))
     
     if frequencia:
-        query = query.filter(Habito.frequencia.in_(frequencia))
-    
-    # Total de registros
-    total = query.count()
-    
-    # Ordenação
-    order_column = getattr(Habito, order_by, Habito.created_at)
-    if order_dir == "desc":
-        query = query.order_by(desc(order_column))
-    else:
-        query = query.order_by(asc(order_column))
-    
-    # Paginação
-    offset = (page - 1) * limit
-    habitos = query.offset(offset).limit(limit).all()
-    
-    # Cálculo da paginação
-    total_pages = (total + limit - 1) // limit
-    
-    pagination = PaginationResponse(
+        query = query.where(Habito.frequencia.in_(frequencia))
+    
+    # Ordenação e paginação (offset ou cursor); por relevância a coluna
+    # acompanha as linhas para que o cursor seja lido delas
+    coluna = coluna_ordenacao(Habito, order_by, relevancia)
+    por_relevancia = coluna is relevancia
+    if por_relevancia:
+        query = query.add_columns(relevancia)
+    
+    habitos, pagination = await paginar(
+        db, query,
+        coluna=coluna,
+        coluna_id=Habito.id,
+        order_dir=order_dir,
         page=page,
         limit=limit,
-        total=total,
-        total_pages=total_pages,
-        has_next=page < total_pages,
-        has_prev=page > 1
+        cursor=cursor,
+        entidade=not por_relevancia,
+        with_total=with_total,
+        usuario_id=current_user["sub"]
     )
+    if por_relevancia:
+        habitos = [linha[0] for linha in habitos]
     
     habitos_data = serialize_models(habitos)
-    return DataResponse(data=habitos_data, pagination=pagination)
+    return resposta_lista(habitos_data, pagination)
 
 # Rota para listar tarefas de um hábito (deve vir antes de /{habito_id} para evitar conflito)
 @router.get("/{habito_id}/tarefas", response_model=DataResponse)
@@ -90,18 +91,23 @@ async def listar_tarefas_do_habito(
     habito_id: str,
     page: int = Query(1, ge=1, description="Página"),
     limit: int = Query(50, ge=1, le=100, description="Itens por página"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (next_cursor)"),
+    with_total: str = Query("exact", pattern=WITH_TOTAL_PATTERN, description="Total: exact, estimate (cache) ou false"),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Lista tarefas de um hábito específico"""
     
     # Verificar se o hábito existe e pertence ao usuário
-    habito = db.query(Habito).filter(
-        and_(
-            Habito.id == habito_id,
-            Habito.usuario_id == current_user["sub"]
+    result = await db.execute(
+        select(Habito).where(
+            and_(
+                Habito.id == habito_id,
+                Habito.usuario_id == current_user["sub"]
+            )
         )
-    ).first()
+    )
+    habito = result.scalar_one_or_none()
     
     if not habito:
         raise HTTPException(
@@ -109,49 +115,50 @@ async def listar_tarefas_do_habito(
             detail="Hábito não encontrado"
         )
     
-    # Buscar tarefas do hábito
-    query = db.query(Tarefa).filter(
+    # Buscar tarefas do hábito (colunas Core, sem materializar objetos ORM)
+    query = select(*colunas_modelo(Tarefa)).where(
         and_(
             Tarefa.habito_id == habito_id,
             Tarefa.usuario_id == current_user["sub"]
         )
     )
     
-    total = query.count()
-    offset = (page - 1) * limit
-    tarefas = query.order_by(desc(Tarefa.created_at)).offset(offset).limit(limit).all()
-    
-    total_pages = (total + limit - 1) // limit
-    
-    pagination = PaginationResponse(
+    tarefas, pagination = await paginar(
+        db, query,
+        coluna=Tarefa.created_at,
+        coluna_id=Tarefa.id,
+        order_dir="desc",
         page=page,
         limit=limit,
-        total=total,
-        total_pages=total_pages,
-        has_next=page < total_pages,
-        has_prev=page > 1
+        cursor=cursor,
+        entidade=False,
+        with_total=with_total,
+        usuario_id=current_user["sub"]
     )
     
-    # Serializar tarefas usando o schema Pydantic para garantir camelCase
-    # e incluir todos os campos (estimativa_horas, horas_gastas, etc)
-    tarefas_data = serialize_tarefas(tarefas)
+    # Serializar em camelCase com todos os campos de TarefaResponse
+    # (estimativa_horas, horas_gastas, etc)
+    tarefas_data = serialize_tarefas_linhas(tarefas)
     
-    return DataResponse(data=tarefas_data, pagination=pagination)
+    return resposta_lista(tarefas_data, pagination)
 
 @router.get("/{habito_id}", response_model=DataResponse)
 async def obter_habito(
     habito_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Obtém um hábito específico"""
     
-    habito = db.query(Habito).filter(
-        and_(
-            Habito.id == habito_id,
-            Habito.usuario_id == current_user["sub"]
+    result = await db.execute(
+        select(Habito).where(
+            and_(
+                Habito.id == habito_id,
+                Habito.usuario_id == current_user["sub"]
+            )
         )
-    ).first()
+    )
+    habito = result.scalar_one_or_none()
     
     if not habito:
         raise HTTPException(
@@ -164,7 +171,7 @@ async def obter_habito(
 @router.post("", response_model=DataResponse, status_code=status.HTTP_201_CREATED)
 async def criar_habito(
     habito_data: HabitoCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Cria um novo hábito"""
@@ -177,12 +184,15 @@ async def criar_habito(
         )
         
         db.add(novo_habito)
-        db.commit()
-        db.refresh(novo_habito)
+        await db.run_sync(registrar_habito, novo_habito)
+        await db.commit()
+        invalidar_totais(current_user["sub"])
+        invalidar_dashboard(current_user["sub"])
+        await db.refresh(novo_habito)
         
         return DataResponse(data=serialize_model(novo_habito))
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         print(f"❌ ERRO AO CRIAR HÁBITO: {str(e)}")
         print(f"📋 Dados recebidos: {habito_data.model_dump()}")
         raise HTTPException(
@@ -194,17 +204,20 @@ async def criar_habito(
 async def atualizar_habito(
     habito_id: str,
     habito_data: HabitoUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Atualiza um hábito existente"""
     
-    habito = db.query(Habito).filter(
-        and_(
-            Habito.id == habito_id,
-            Habito.usuario_id == current_user["sub"]
+    result = await db.execute(
+        select(Habito).where(
+            and_(
+                Habito.id == habito_id,
+                Habito.usuario_id == current_user["sub"]
+            )
         )
-    ).first()
+    )
+    habito = result.scalar_one_or_none()
     
     if not habito:
         raise HTTPException(
@@ -213,32 +226,39 @@ async def atualizar_habito(
         )
     
     # Atualizar campos fornecidos
+    status_anterior = habito.status
     update_data = habito_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(habito, field, value)
     
-    db.commit()
-    db.refresh(habito)
+    await db.run_sync(registrar_alteracao_habito, habito, status_anterior)
     
-    # Recalcular progresso se necessário
-    recalcular_progresso_habito(db, habito_id)
+    # Recalcular progresso e gravar tudo em um único commit
+    await db.flush()
+    await db.run_sync(recalcular_progresso_habito, habito_id)
+    invalidar_totais(current_user["sub"])
+    invalidar_dashboard(current_user["sub"])
+    await db.refresh(habito)
     
     return DataResponse(data=serialize_model(habito))
 
 @router.delete("/{habito_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def deletar_habito(
     habito_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Remove um hábito"""
     
-    habito = db.query(Habito).filter(
-        and_(
-            Habito.id == habito_id,
-            Habito.usuario_id == current_user["sub"]
+    result = await db.execute(
+        select(Habito).where(
+            and_(
+                Habito.id == habito_id,
+                Habito.usuario_id == current_user["sub"]
+            )
         )
-    ).first()
+    )
+    habito = result.scalar_one_or_none()
     
     if not habito:
         raise HTTPException(
@@ -246,18 +266,66 @@ async def deletar_habito(
             detail="Hábito não encontrado"
         )
     
-    # Remover realizações relacionadas
-    db.query(HabitoRealizacao).filter(HabitoRealizacao.habito_id == habito_id).delete()
-    
-    # Remover hábito
-    db.delete(habito)
-    db.commit()
+    # Remover realizações relacionadas (com os tombstones da sincronização)
+    realizacao_ids = (await db.execute(
+        select(HabitoRealizacao.id).where(HabitoRealizacao.habito_id == habito_id)
+    )).scalars().all()
+    await db.run_sync(registrar_exclusoes, current_user["sub"], HabitoRealizacao.__tablename__, realizacao_ids)
+    await db.execute(delete(HabitoRealizacao).where(HabitoRealizacao.habito_id == habito_id))
+    
+    # Remover hábito (descontando-o das estatísticas do objetivo)
+    await db.run_sync(registrar_remocao_habito, habito)
+    await db.run_sync(registrar_exclusoes, current_user["sub"], Habito.__tablename__, [habito_id])
+    await db.delete(habito)
+    await db.commit()
+    invalidar_totais(current_user["sub"])
+    invalidar_dashboard(current_user["sub"])
+
+@router.post("/marcar-feito/bulk", response_model=DataResponse)
+async def marcar_habitos_como_feitos(
+    lote: MarcarHabitosFeitosLote,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Registra várias realizações em uma transação (ex.: check-ins feitos offline).
+    Cada hábito e cada objetivo afetado é recalculado uma única vez.
+    """
+    
+    resultados = await db.run_sync(marcar_habitos_feitos, current_user["sub"], lote.realizacoes)
+    
+    # Estado final dos hábitos alterados
+    habito_ids = {resultado["habito_id"] for resultado in resultados if resultado["erro"] is None}
+    habitos = []
+    if habito_ids:
+        result = await db.execute(
+            select(Habito.id, Habito.realizados_no_periodo, Habito.progresso, Habito.updated_at)
+            .where(Habito.id.in_(habito_ids), Habito.usuario_id == current_user["sub"])
+        )
+        habitos = [
+            {
+                "id": linha.id,
+                "realizados_no_periodo": linha.realizados_no_periodo,
+                "progresso": float(linha.progresso),
+                "updated_at": linha.updated_at
+            }
+            for linha in result
+        ]
+    
+    falhas = sum(1 for resultado in resultados if resultado["erro"] is not None)
+    return DataResponse(data={
+        "resultados": resultados,
+        "habitos": habitos,
+        "total": len(resultados),
+        "sucesso": len(resultados) - falhas,
+        "falhas": falhas,
+    })
 
 @router.post("/{habito_id}/marcar-feito", response_model=DataResponse)
 async def marcar_habito_como_feito(
     habito_id: str,
     dados: MarcarHabitoFeito,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Incrementa contador de realizações do hábito"""
@@ -265,12 +333,15 @@ async def marcar_habito_como_feito(
     data_realizacao = dados.data_realizacao or date.today()
     
     # Verificar se hábito existe e pertence ao usuário
-    habito = db.query(Habito).filter(
-        and_(
-            Habito.id == habito_id,
-            Habito.usuario_id == current_user["sub"]
+    result = await db.execute(
+        select(Habito).where(
+            and_(
+                Habito.id == habito_id,
+                Habito.usuario_id == current_user["sub"]
+            )
         )
-    ).first()
+    )
+    habito = result.scalar_one_or_none()
     
     if not habito:
         raise HTTPException(
@@ -290,8 +361,8 @@ async def marcar_habito_como_feito(
     db.add(realizacao)
     
     # Marcar como feito
-    success = marcar_habito_feito(
-        db, habito_id, current_user["sub"], 
+    success = await db.run_sync(
+        marcar_habito_feito, habito_id, current_user["sub"],
         str(data_realizacao), dados.quantidade
     )
     
@@ -302,7 +373,7 @@ async def marcar_habito_como_feito(
         )
     
     # Buscar hábito atualizado
-    db.refresh(habito)
+    await db.refresh(habito)
     
     return DataResponse(data={
         "id": habito.id,
@@ -314,12 +385,12 @@ async def marcar_habito_como_feito(
 @router.post("/{habito_id}/reset-ciclo", response_model=DataResponse)
 async def resetar_ciclo_habito_endpoint(
     habito_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Reseta contador de realizações para zero"""
     
-    success = resetar_ciclo_habito(db, habito_id, current_user["sub"])
+    success = await db.run_sync(resetar_ciclo_habito, habito_id, current_user["sub"])
     
     if not success:
         raise HTTPException(
@@ -328,7 +399,8 @@ async def resetar_ciclo_habito_endpoint(
         )
     
     # Buscar hábito atualizado
-    habito = db.query(Habito).filter(Habito.id == habito_id).first()
+    habito = (await db.execute(select(Habito).where(Habito.id == habito_id))).scalar_one()
+    await db.refresh(habito)
     
     return DataResponse(data={
         "id": habito.id,
@@ -343,32 +415,31 @@ async def listar_habitos_por_objetivo(
     objetivo_id: str,
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=100),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (next_cursor)"),
+    with_total: str = Query("exact", pattern=WITH_TOTAL_PATTERN, description="Total: exact, estimate (cache) ou false"),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Lista hábitos de um objetivo específico"""
     
-    query = db.query(Habito).filter(
+    query = select(Habito).where(
         and_(
             Habito.objetivo_id == objetivo_id,
             Habito.usuario_id == current_user["sub"]
         )
     )
     
-    total = query.count()
-    offset = (page - 1) * limit
-    habitos = query.offset(offset).limit(limit).all()
-    
-    total_pages = (total + limit - 1) // limit
-    
-    pagination = PaginationResponse(
+    habitos, pagination = await paginar(
+        db, query,
+        coluna=Habito.created_at,
+        coluna_id=Habito.id,
+        order_dir="desc",
         page=page,
         limit=limit,
-        total=total,
-        total_pages=total_pages,
-        has_next=page < total_pages,
-        has_prev=page > 1
+        cursor=cursor,
+        with_total=with_total,
+        usuario_id=current_user["sub"]
     )
     
     habitos_data = serialize_models(habitos)
-    return DataResponse(data=habitos_data, pagination=pagination)
\ No newline at end of file
+    return resposta_lista(habitos_data, pagination)
\ No newline at end of file
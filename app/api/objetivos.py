@@ -3,18 +3,24 @@ Rotas da API - Objetivos
 Implementa todas as operações CRUD para objetivos
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc, asc, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, desc, asc, func, text, select
 from typing import List, Optional
-from app.core.database import get_db
-from app.models import Objetivo, Habito, Tarefa
+from app.core.database import get_async_db
+from app.models import Objetivo, ObjetivoStats, Habito, Tarefa, AuditLog
 from app.schemas import (
     ObjetivoCreate, ObjetivoUpdate, ObjetivoResponse, ObjetivoComEstatisticas,
     ObjetivoFilters, PaginationParams, PaginationResponse, DataResponse
 )
 from app.services.auth import get_current_user
 from app.services.progress import recalcular_progresso_objetivo
+from app.services.estatisticas import criar_stats_objetivo, progresso_medio
+from app.services.exclusao import remover_objetivos
 from app.utils.serialization import serialize_model, serialize_models
+from app.utils.pagination import paginar, coluna_ordenacao, invalidar_totais, WITH_TOTAL_PATTERN
+from app.services.dashboard import invalidar_dashboard
+from app.utils.responses import resposta_lista
+from app.utils.busca import condicao_busca
 from decimal import Decimal
 
 router = APIRouter(prefix="/objetivos", tags=["objetivos"])
@@ -25,141 +31,106 @@ async def listar_objetivos(
     status: Optional[List[str]] = Query(None, description="Filtro por status"),
     inicio: Optional[str] = Query(None, description="Data início mínima (YYYY-MM-DD)"),
     fim: Optional[str] = Query(None, description="Data fim máxima (YYYY-MM-DD)"), 
-    order_by: str = Query("created_at", description="Campo para ordenação"),
+    order_by: str = Query("created_at", description="Campo para ordenação (relevancia com busca)"),
     order_dir: str = Query("desc", pattern=r"^(asc|desc)$", description="Direção da ordenação"),
     page: int = Query(1, ge=1, description="Página"),
     limit: int = Query(50, ge=1, le=100, description="Itens por página"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (next_cursor)"),
+    with_total: str = Query("exact", pattern=WITH_TOTAL_PATTERN, description="Total: exact, estimate (cache) ou false"),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Lista objetivos do usuário com filtros e paginação"""
     
-    # Query base usando a view com estatísticas
-    query = db.execute(text("""
-        SELECT 
-            o.*,
-            COALESCE(COUNT(DISTINCT h.id), 0) as total_habitos,
-            COALESCE(COUNT(DISTINCT CASE WHEN h.status = 'ativo' THEN h.id END), 0) as habitos_ativos,
-            COALESCE(COUNT(DISTINCT t.id), 0) as total_tarefas,
-            COALESCE(COUNT(DISTINCT CASE WHEN t.status = 'concluida' THEN t.id END), 0) as tarefas_concluidas,
-            COALESCE(AVG(h.progresso), 0) as progresso_medio_habitos,
-            COALESCE(AVG(CASE WHEN t.status = 'concluida' THEN 100 ELSE t.progresso END), 0) as progresso_medio_tarefas
-        FROM objetivos o
-        LEFT JOIN habitos h ON o.id = h.objetivo_id AND h.usuario_id = o.usuario_id
-        LEFT JOIN tarefas t ON h.id = t.habito_id AND t.usuario_id = o.usuario_id
-        WHERE o.usuario_id = :user_id
-    """), {"user_id": current_user["sub"]})
-    
     # Aplicar filtros
-    conditions = ["o.usuario_id = :user_id"]
-    params = {"user_id": current_user["sub"]}
+    conditions = [Objetivo.usuario_id == current_user["sub"]]
+    relevancia = None
     
     if busca:
-        conditions.append("(o.titulo LIKE :busca OR o.descricao LIKE :busca)")
-        params["busca"] = f"%{busca}%"
+        condicao, relevancia = condicao_busca(Objetivo, busca)
+        conditions.append(condicao)
     
     if status:
-        placeholders = ",".join([f":status_{i}" for i in range(len(status))])
-        conditions.append(f"o.status IN ({placeholders})")
-        for i, s in enumerate(status):
-            params[f"status_{i}"] = s
+        conditions.append(Objetivo.status.in_(status))
     
     if inicio:
-        conditions.append("o.inicio >= :inicio")
-        params["inicio"] = inicio
+        conditions.append(Objetivo.inicio >= inicio)
         
     if fim:
-        conditions.append("o.fim <= :fim")
-        params["fim"] = fim
-    
-    # Query completa
-    where_clause = " AND ".join(conditions)
-    group_by = "GROUP BY o.id, o.usuario_id, o.titulo, o.descricao, o.inicio, o.fim, o.status, o.progresso, o.cor, o.icone, o.created_at, o.updated_at"
-    order_clause = f"ORDER BY o.{order_by} {'DESC' if order_dir == 'desc' else 'ASC'}"
-    
-    # Query para total de registros
-    count_query = f"""
-        SELECT COUNT(DISTINCT o.id)
-        FROM objetivos o
-        WHERE {where_clause}
-    """
-    total = db.execute(text(count_query), params).scalar()
-    
-    # Query principal com paginação
-    offset = (page - 1) * limit
-    main_query = f"""
-        SELECT 
-            o.*,
-            COALESCE(COUNT(DISTINCT h.id), 0) as total_habitos,
-            COALESCE(COUNT(DISTINCT CASE WHEN h.status = 'ativo' THEN h.id END), 0) as habitos_ativos,
-            COALESCE(COUNT(DISTINCT t.id), 0) as total_tarefas,
-            COALESCE(COUNT(DISTINCT CASE WHEN t.status = 'concluida' THEN t.id END), 0) as tarefas_concluidas,
-            COALESCE(AVG(h.progresso), 0) as progresso_medio_habitos,
-            COALESCE(AVG(CASE WHEN t.status = 'concluida' THEN 100 ELSE t.progresso END), 0) as progresso_medio_tarefas
-        FROM objetivos o
-        LEFT JOIN habitos h ON o.id = h.objetivo_id AND h.usuario_id = o.usuario_id
-        LEFT JOIN tarefas t ON h.id = t.habito_id AND t.usuario_id = o.usuario_id
-        WHERE {where_clause}
-        {group_by}
-        {order_clause}
-        LIMIT {limit} OFFSET {offset}
-    """
-    
-    resultados = db.execute(text(main_query), params).fetchall()
+        conditions.append(Objetivo.fim <= fim)
     
-    # Converter para formato de resposta
-    objetivos = []
-    for row in resultados:
-        objetivo = {
-            "id": row[0],
-            "usuario_id": row[1], 
-            "titulo": row[2],
-            "descricao": row[3],
-            "inicio": row[4],
-            "fim": row[5],
-            "status": row[6],
-            "progresso": row[7],
-            "cor": row[8],
-            "icone": row[9],
-            "created_at": row[10],
-            "updated_at": row[11],
-            "total_habitos": row[12],
-            "habitos_ativos": row[13],
-            "total_tarefas": row[14],
-            "tarefas_concluidas": row[15],
-            "progresso_medio_habitos": row[16],
-            "progresso_medio_tarefas": row[17]
-        }
-        objetivos.append(objetivo)
+    # Query para total de registros (sem o JOIN de estatísticas)
+    count_query = select(func.count(Objetivo.id)).where(*conditions)
     
-    # Cálculo da paginação
-    total_pages = (total + limit - 1) // limit
+    # Query principal: estatísticas lidas da tabela objetivo_stats (JOIN pela chave primária)
+    query = (
+        select(Objetivo, ObjetivoStats)
+        .outerjoin(ObjetivoStats, ObjetivoStats.objetivo_id == Objetivo.id)
+        .where(*conditions)
+    )
+    
+    coluna = coluna_ordenacao(Objetivo, order_by, relevancia)
+    if coluna is relevancia:
+        query = query.add_columns(relevancia)
     
-    pagination = PaginationResponse(
+    resultados, pagination = await paginar(
+        db, query,
+        coluna=coluna,
+        coluna_id=Objetivo.id,
+        order_dir=order_dir,
         page=page,
         limit=limit,
-        total=total,
-        total_pages=total_pages,
-        has_next=page < total_pages,
-        has_prev=page > 1
+        cursor=cursor,
+        query_total=count_query,
+        entidade=False,
+        with_total=with_total,
+        usuario_id=current_user["sub"]
     )
     
-    return DataResponse(data=objetivos, pagination=pagination)
+    # Converter para formato de resposta
+    objetivos = []
+    for o, stats, *_ in resultados:
+        objetivo = {
+            "id": o.id,
+            "usuario_id": o.usuario_id, 
+            "titulo": o.titulo,
+            "descricao": o.descricao,
+            "inicio": o.inicio,
+            "fim": o.fim,
+            "status": o.status,
+            "progresso": o.progresso,
+            "cor": o.cor,
+            "icone": o.icone,
+            "created_at": o.created_at,
+            "updated_at": o.updated_at,
+            "total_habitos": stats.total_habitos if stats else 0,
+            "habitos_ativos": stats.habitos_ativos if stats else 0,
+            "total_tarefas": stats.total_tarefas if stats else 0,
+            "tarefas_concluidas": stats.tarefas_concluidas if stats else 0,
+            "progresso_medio_habitos": progresso_medio(stats.soma_progresso_habitos, stats.total_habitos) if stats else progresso_medio(0, 0),
+            "progresso_medio_tarefas": progresso_medio(stats.soma_progresso_tarefas, stats.total_tarefas) if stats else progresso_medio(0, 0)
+        }
+        objetivos.append(objetivo)
+    
+    return resposta_lista(objetivos, pagination)
 
 @router.get("/{objetivo_id}", response_model=DataResponse)
 async def obter_objetivo(
     objetivo_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Obtém um objetivo específico"""
     
-    objetivo = db.query(Objetivo).filter(
-        and_(
-            Objetivo.id == objetivo_id,
-            Objetivo.usuario_id == current_user["sub"]
+    result = await db.execute(
+        select(Objetivo).where(
+            and_(
+                Objetivo.id == objetivo_id,
+                Objetivo.usuario_id == current_user["sub"]
+            )
         )
-    ).first()
+    )
+    objetivo = result.scalar_one_or_none()
     
     if not objetivo:
         raise HTTPException(
@@ -172,7 +143,7 @@ async def obter_objetivo(
 @router.post("", response_model=DataResponse, status_code=status.HTTP_201_CREATED)
 async def criar_objetivo(
     objetivo_data: ObjetivoCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Cria um novo objetivo"""
@@ -184,8 +155,11 @@ async def criar_objetivo(
     )
     
     db.add(novo_objetivo)
-    db.commit()
-    db.refresh(novo_objetivo)
+    await db.run_sync(criar_stats_objetivo, novo_objetivo)
+    await db.commit()
+    invalidar_totais(current_user["sub"])
+    invalidar_dashboard(current_user["sub"])
+    await db.refresh(novo_objetivo)
     
     return DataResponse(data=serialize_model(novo_objetivo))
 
@@ -193,17 +167,20 @@ async def criar_objetivo(
 async def atualizar_objetivo(
     objetivo_id: str,
     objetivo_data: ObjetivoUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Atualiza um objetivo existente"""
     
-    objetivo = db.query(Objetivo).filter(
-        and_(
-            Objetivo.id == objetivo_id,
-            Objetivo.usuario_id == current_user["sub"]
+    result = await db.execute(
+        select(Objetivo).where(
+            and_(
+                Objetivo.id == objetivo_id,
+                Objetivo.usuario_id == current_user["sub"]
+            )
         )
-    ).first()
+    )
+    objetivo = result.scalar_one_or_none()
     
     if not objetivo:
         raise HTTPException(
@@ -212,97 +189,89 @@ async def atualizar_objetivo(
         )
     
     # Atualizar campos fornecidos
+    status_anterior = objetivo.status
     update_data = objetivo_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(objetivo, field, value)
     
-    db.commit()
-    db.refresh(objetivo)
-    
-    # Recalcular progresso se necessário
-    recalcular_progresso_objetivo(db, objetivo_id)
+    # Mudança de status vai para o audit_log (feed de atividades), no mesmo commit
+    status_novo = getattr(objetivo.status, "value", objetivo.status)
+    if status_novo != status_anterior:
+        db.add(AuditLog(
+            usuario_id=current_user["sub"],
+            tabela="objetivos",
+            registro_id=objetivo.id,
+            acao="UPDATE",
+            dados_antigos={"status": status_anterior},
+            dados_novos={"status": status_novo}
+        ))
+    
+    # Recalcular progresso e gravar tudo em um único commit
+    await db.flush()
+    await db.run_sync(recalcular_progresso_objetivo, objetivo_id)
+    invalidar_totais(current_user["sub"])
+    invalidar_dashboard(current_user["sub"])
+    await db.refresh(objetivo)
     
     return DataResponse(data=serialize_model(objetivo))
 
 @router.delete("/{objetivo_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def deletar_objetivo(
     objetivo_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
-    """Remove um objetivo e todos os hábitos/tarefas vinculados"""
-    
-    objetivo = db.query(Objetivo).filter(
-        and_(
-            Objetivo.id == objetivo_id,
-            Objetivo.usuario_id == current_user["sub"]
+    """Remove um objetivo e todos os hábitos/tarefas/realizações vinculados"""
+    
+    result = await db.execute(
+        select(Objetivo.id).where(
+            and_(
+                Objetivo.id == objetivo_id,
+                Objetivo.usuario_id == current_user["sub"]
+            )
         )
-    ).first()
+    )
     
-    if not objetivo:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Objetivo não encontrado"
         )
     
-    # Buscar hábitos vinculados ao objetivo
-    habitos = db.query(Habito).filter(Habito.objetivo_id == objetivo_id).all()
-    habito_ids = [h.id for h in habitos]
-    
-    # Remover tarefas vinculadas aos hábitos (tarefas agora são ligadas apenas a hábitos)
-    if habito_ids:
-        db.query(Tarefa).filter(Tarefa.habito_id.in_(habito_ids)).delete()
-    
-    # Remover hábitos vinculados
-    db.query(Habito).filter(Habito.objetivo_id == objetivo_id).delete()
-    
-    # Remover objetivo
-    db.delete(objetivo)
-    db.commit()
+    # Remover hábitos, tarefas, realizações e estatísticas (DELETEs por conjunto)
+    await db.run_sync(remover_objetivos, current_user["sub"], [objetivo_id])
+    invalidar_totais(current_user["sub"])
+    invalidar_dashboard(current_user["sub"])
 
 @router.delete("", response_model=DataResponse)
 async def deletar_objetivos_lote(
     ids: List[str],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Remove múltiplos objetivos"""
     
     # Verificar se todos os objetivos pertencem ao usuário
-    objetivos = db.query(Objetivo).filter(
-        and_(
-            Objetivo.id.in_(ids),
-            Objetivo.usuario_id == current_user["sub"]
+    ids = list(dict.fromkeys(ids))
+    encontrados = (await db.execute(
+        select(Objetivo.id).where(
+            and_(
+                Objetivo.id.in_(ids),
+                Objetivo.usuario_id == current_user["sub"]
+            )
         )
-    ).all()
+    )).scalars().all()
     
-    if len(objetivos) != len(ids):
+    if len(encontrados) != len(ids):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Um ou mais objetivos não foram encontrados"
         )
     
-    # Buscar hábitos vinculados aos objetivos
-    habitos = db.query(Habito).filter(Habito.objetivo_id.in_(ids)).all()
-    habito_ids = [h.id for h in habitos]
-    
-    # Remover tarefas vinculadas aos hábitos (tarefas agora são ligadas apenas a hábitos)
-    if habito_ids:
-        db.query(Tarefa).filter(Tarefa.habito_id.in_(habito_ids)).delete()
-    
-    # Remover hábitos vinculados
-    for objetivo_id in ids:
-        db.query(Habito).filter(Habito.objetivo_id == objetivo_id).delete()
-    
-    # Remover objetivos
-    deleted_count = db.query(Objetivo).filter(
-        and_(
-            Objetivo.id.in_(ids),
-            Objetivo.usuario_id == current_user["sub"]
-        )
-    ).delete(synchronize_session=False)
-    
-    db.commit()
+    # Remover hábitos, tarefas, realizações e estatísticas (DELETEs por conjunto)
+    deleted_count = await db.run_sync(remover_objetivos, current_user["sub"], ids)
+    invalidar_totais(current_user["sub"])
+    invalidar_dashboard(current_user["sub"])
     
     return DataResponse(data={
         "message": f"{deleted_count} objetivos removidos com sucesso",
@@ -314,18 +283,23 @@ async def listar_habitos_do_objetivo(
     objetivo_id: str,
     page: int = Query(1, ge=1, description="Página"),
     limit: int = Query(50, ge=1, le=100, description="Itens por página"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (next_cursor)"),
+    with_total: str = Query("exact", pattern=WITH_TOTAL_PATTERN, description="Total: exact, estimate (cache) ou false"),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Lista hábitos de um objetivo específico"""
     
     # Verificar se o objetivo existe e pertence ao usuário
-    objetivo = db.query(Objetivo).filter(
-        and_(
-            Objetivo.id == objetivo_id,
-            Objetivo.usuario_id == current_user["sub"]
+    result = await db.execute(
+        select(Objetivo).where(
+            and_(
+                Objetivo.id == objetivo_id,
+                Objetivo.usuario_id == current_user["sub"]
+            )
         )
-    ).first()
+    )
+    objetivo = result.scalar_one_or_none()
     
     if not objetivo:
         raise HTTPException(
@@ -334,52 +308,51 @@ async def listar_habitos_do_objetivo(
         )
     
     # Query para buscar hábitos do objetivo
-    query = db.query(Habito).filter(
+    query = select(Habito).where(
         and_(
             Habito.objetivo_id == objetivo_id,
             Habito.usuario_id == current_user["sub"]
         )
     )
     
-    # Total de registros
-    total = query.count()
-    
-    # Paginação
-    offset = (page - 1) * limit
-    habitos = query.order_by(desc(Habito.created_at)).offset(offset).limit(limit).all()
-    
-    # Cálculo da paginação
-    total_pages = (total + limit - 1) // limit
-    
-    pagination = PaginationResponse(
+    # Paginação (offset ou cursor)
+    habitos, pagination = await paginar(
+        db, query,
+        coluna=Habito.created_at,
+        coluna_id=Habito.id,
+        order_dir="desc",
         page=page,
         limit=limit,
-        total=total,
-        total_pages=total_pages,
-        has_next=page < total_pages,
-        has_prev=page > 1
+        cursor=cursor,
+        with_total=with_total,
+        usuario_id=current_user["sub"]
     )
     
     habitos_data = serialize_models(habitos)
-    return DataResponse(data=habitos_data, pagination=pagination)
+    return resposta_lista(habitos_data, pagination)
 
 @router.get("/{objetivo_id}/tarefas", response_model=DataResponse)
 async def listar_tarefas_do_objetivo(
     objetivo_id: str,
     page: int = Query(1, ge=1, description="Página"),
     limit: int = Query(50, ge=1, le=100, description="Itens por página"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (next_cursor)"),
+    with_total: str = Query("exact", pattern=WITH_TOTAL_PATTERN, description="Total: exact, estimate (cache) ou false"),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Lista tarefas de um objetivo específico através dos hábitos do objetivo"""
     
     # Verificar se o objetivo existe e pertence ao usuário
-    objetivo = db.query(Objetivo).filter(
-        and_(
-            Objetivo.id == objetivo_id,
-            Objetivo.usuario_id == current_user["sub"]
+    result = await db.execute(
+        select(Objetivo).where(
+            and_(
+                Objetivo.id == objetivo_id,
+                Objetivo.usuario_id == current_user["sub"]
+            )
         )
-    ).first()
+    )
+    objetivo = result.scalar_one_or_none()
     
     if not objetivo:
         raise HTTPException(
@@ -388,39 +361,33 @@ async def listar_tarefas_do_objetivo(
         )
     
     # Buscar IDs dos hábitos do objetivo
-    habitos_ids = db.query(Habito.id).filter(
+    habitos_ids = select(Habito.id).where(
         and_(
             Habito.objetivo_id == objetivo_id,
             Habito.usuario_id == current_user["sub"]
         )
-    ).subquery()
+    )
     
     # Query para buscar tarefas através dos hábitos do objetivo
-    query = db.query(Tarefa).filter(
+    query = select(Tarefa).where(
         and_(
             Tarefa.habito_id.in_(habitos_ids),
             Tarefa.usuario_id == current_user["sub"]
         )
     )
     
-    # Total de registros
-    total = query.count()
-    
-    # Paginação
-    offset = (page - 1) * limit
-    tarefas = query.order_by(desc(Tarefa.created_at)).offset(offset).limit(limit).all()
-    
-    # Cálculo da paginação
-    total_pages = (total + limit - 1) // limit
-    
-    pagination = PaginationResponse(
+    # Paginação (offset ou cursor)
+    tarefas, pagination = await paginar(
+        db, query,
+        coluna=Tarefa.created_at,
+        coluna_id=Tarefa.id,
+        order_dir="desc",
         page=page,
         limit=limit,
-        total=total,
-        total_pages=total_pages,
-        has_next=page < total_pages,
-        has_prev=page > 1
+        cursor=cursor,
+        with_total=with_total,
+        usuario_id=current_user["sub"]
     )
     
     tarefas_data = serialize_models(tarefas)
-    return DataResponse(data=tarefas_data, pagination=pagination)
\ No newline at end of file
+    return resposta_lista(tarefas_data, pagination)
\ No newline at end of file
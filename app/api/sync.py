@@ -0,0 +1,27 @@
+"""
+Rotas da API - Sincronização
+Alterações incrementais (desde um cursor) de objetivos, hábitos, tarefas e realizações
+"""
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from app.services.auth import get_current_user
+from app.services.sincronizacao import gerar_sincronizacao, decodificar_cursor
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+@router.get("", response_class=StreamingResponse)
+async def sincronizar(
+    since: Optional[str] = Query(None, description="Cursor da última sincronização (linha 'fim'); vazio = carga completa"),
+    current_user = Depends(get_current_user)
+):
+    """
+    Stream NDJSON (application/x-ndjson) com os registros criados, alterados
+    ou excluídos desde o cursor. A última linha traz o cursor da próxima chamada.
+    """
+    
+    desde = decodificar_cursor(since) if since else None
+    return StreamingResponse(
+        gerar_sincronizacao(current_user["sub"], desde),
+        media_type="application/x-ndjson"
+    )
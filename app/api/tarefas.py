@@ -2,26 +2,48 @@
 Rotas da API - Tarefas
 Implementa todas as operações CRUD para tarefas
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc, asc, func, text
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, desc, asc, func, text, select, update
 from typing import List, Optional
 from datetime import date, datetime
 import logging
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.models import Tarefa
 from app.schemas import (
-    TarefaCreate, TarefaUpdate, TarefaResponse, TarefaFilters,
+    TarefaCreate, TarefaUpdate, TarefaResponse, TarefaFilters, TarefaBulkCreate, TarefaBulkUpdate, TarefaMove,
     PaginationParams, PaginationResponse, DataResponse
 )
 from app.services.auth import get_current_user
-from app.services.progress import recalcular_progresso_habito
+from app.services.progress import aplicar_progresso_objetivo
+from app.services.fila_progresso import fila_progresso
+from app.services.estatisticas import (
+    objetivo_do_habito, registrar_tarefa, registrar_alteracao_tarefa, conclusao_alterada
+)
+from app.services.tarefas_lote import criar_tarefas_em_lote, atualizar_tarefas_em_lote
+from app.services.sincronizacao import registrar_exclusoes
+from app.services.kanban import (
+    COLUNAS_KANBAN, ORDEM_KANBAN, coluna_kanban,
+    rank_adjacente, rank_no_fim, rebalancear_coluna, rebalancear_em_segundo_plano
+)
+from app.utils.rank import rank_entre, TAMANHO_MAXIMO_RANK, TAMANHO_COLUNA_RANK
 from app.utils.serialization import serialize_model, serialize_models
+from app.utils.pagination import paginar, coluna_ordenacao, invalidar_totais, WITH_TOTAL_PATTERN
+from app.services.dashboard import invalidar_dashboard
+from app.utils.responses import resposta_lista
+from app.utils.busca import condicao_busca
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/tarefas", tags=["tarefas"])
 
+# Status kanban aceitos em PATCH /{id}/status -> valor da coluna status
+STATUS_KANBAN_PARA_TAREFA = {
+    "backlog": "backlog",
+    "fazendo": "fazendo",
+    "feito": "concluida",
+}
+
 @router.get("", response_model=DataResponse)
 async def listar_tarefas(
     habito_id: Optional[str] = Query(None, description="Filtro por hábito"),
@@ -30,85 +52,84 @@ async def listar_tarefas(
     prioridade: Optional[List[str]] = Query(None, description="Filtro por prioridade"),
     data_limite_inicio: Optional[date] = Query(None, description="Data limite início"),
     data_limite_fim: Optional[date] = Query(None, description="Data limite fim"),
-    order_by: str = Query("created_at", description="Campo para ordenação"),
+    order_by: str = Query("created_at", description="Campo para ordenação (relevancia com busca)"),
     order_dir: str = Query("desc", pattern=r"^(asc|desc)$", description="Direção da ordenação"),
     page: int = Query(1, ge=1, description="Página"),
     limit: int = Query(50, ge=1, le=100, description="Itens por página"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (next_cursor)"),
+    with_total: str = Query("exact", pattern=WITH_TOTAL_PATTERN, description="Total: exact, estimate (cache) ou false"),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Lista tarefas do usuário com filtros e paginação"""
     
     # Query base
-    query = db.query(Tarefa).filter(Tarefa.usuario_id == current_user["sub"])
+    query = select(Tarefa).where(Tarefa.usuario_id == current_user["sub"])
     
     # Aplicar filtros
     if habito_id:
-        query = query.filter(Tarefa.habito_id == habito_id)
+        query = query.where(Tarefa.habito_id == habito_id)
     
+    relevancia = None
     if busca:
-        query = query.filter(
-            or_(
-                Tarefa.titulo.contains(busca),
-                Tarefa.descricao.contains(busca)
-            )
-        )
+        condicao, relevancia = condicao_busca(Tarefa, busca)
+        query = query.where(condicao)
     
     if status_kanban:
-        query = query.filter(Tarefa.status_kanban.in_(status_kanban))
+        status_filtro = [valor for coluna in status_kanban for valor in COLUNAS_KANBAN.get(coluna, (coluna,))]
+        query = query.where(Tarefa.status.in_(status_filtro))
     
     if prioridade:
-        query = query.filter(Tarefa.prioridade.in_(prioridade))
+        query = query.where(Tarefa.prioridade.in_(prioridade))
     
     if data_limite_inicio:
-        query = query.filter(Tarefa.data_limite >= data_limite_inicio)
+        query = query.where(Tarefa.prazo >= data_limite_inicio)
     
     if data_limite_fim:
-        query = query.filter(Tarefa.data_limite <= data_limite_fim)
-    
-    # Total de registros
-    total = query.count()
-    
-    # Ordenação
-    order_column = getattr(Tarefa, order_by, Tarefa.created_at)
-    if order_dir == "desc":
-        query = query.order_by(desc(order_column))
-    else:
-        query = query.order_by(asc(order_column))
-    
-    # Paginação
-    offset = (page - 1) * limit
-    tarefas = query.offset(offset).limit(limit).all()
-    
-    # Cálculo da paginação
-    total_pages = (total + limit - 1) // limit
-    
-    pagination = PaginationResponse(
+        query = query.where(Tarefa.prazo <= data_limite_fim)
+    
+    # Ordenação e paginação (offset ou cursor); por relevância a coluna
+    # acompanha as linhas para que o cursor seja lido delas
+    coluna = coluna_ordenacao(Tarefa, order_by, relevancia)
+    por_relevancia = coluna is relevancia
+    if por_relevancia:
+        query = query.add_columns(relevancia)
+    
+    tarefas, pagination = await paginar(
+        db, query,
+        coluna=coluna,
+        coluna_id=Tarefa.id,
+        order_dir=order_dir,
         page=page,
         limit=limit,
-        total=total,
-        total_pages=total_pages,
-        has_next=page < total_pages,
-        has_prev=page > 1
+        cursor=cursor,
+        entidade=not por_relevancia,
+        with_total=with_total,
+        usuario_id=current_user["sub"]
     )
+    if por_relevancia:
+        tarefas = [linha[0] for linha in tarefas]
     
     tarefas_data = serialize_models(tarefas)
-    return DataResponse(data=tarefas_data, pagination=pagination)
+    return resposta_lista(tarefas_data, pagination)
 
 @router.get("/{tarefa_id}", response_model=DataResponse)
 async def obter_tarefa(
     tarefa_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Obtém uma tarefa específica"""
     
-    tarefa = db.query(Tarefa).filter(
-        and_(
-            Tarefa.id == tarefa_id,
-            Tarefa.usuario_id == current_user["sub"]
+    result = await db.execute(
+        select(Tarefa).where(
+            and_(
+                Tarefa.id == tarefa_id,
+                Tarefa.usuario_id == current_user["sub"]
+            )
         )
-    ).first()
+    )
+    tarefa = result.scalar_one_or_none()
     
     if not tarefa:
         raise HTTPException(
@@ -121,7 +142,7 @@ async def obter_tarefa(
 @router.post("", response_model=DataResponse, status_code=status.HTTP_201_CREATED)
 async def criar_tarefa(
     tarefa_data: TarefaCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Cria uma nova tarefa"""
@@ -131,28 +152,92 @@ async def criar_tarefa(
         usuario_id=current_user["sub"],
         **tarefa_data.model_dump()
     )
+    if nova_tarefa.status == "concluida":
+        nova_tarefa.concluida_em = func.now()
+    
+    # O cartão novo entra no fim da sua coluna do kanban
+    nova_tarefa.rank_kanban = await db.run_sync(
+        rank_no_fim, tarefa_data.habito_id, tarefa_data.status, current_user["sub"]
+    )
     
     db.add(nova_tarefa)
-    db.commit()
-    db.refresh(nova_tarefa)
+    objetivo_id = await db.run_sync(objetivo_do_habito, nova_tarefa.habito_id, current_user["sub"])
+    await db.run_sync(registrar_tarefa, objetivo_id, nova_tarefa.status, nova_tarefa.progresso)
+    await db.commit()
+    invalidar_totais(current_user["sub"])
+    invalidar_dashboard(current_user["sub"])
+    await db.refresh(nova_tarefa)
     
     return DataResponse(data=serialize_model(nova_tarefa))
 
+@router.post("/bulk", response_model=DataResponse)
+async def criar_tarefas_lote(
+    lote: TarefaBulkCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Cria várias tarefas em uma transação (INSERT de várias linhas).
+    O resultado de cada item traz status 201 ou o erro (ex.: hábito inexistente).
+    """
+    
+    resultados, objetivos = await db.run_sync(criar_tarefas_em_lote, current_user["sub"], lote.tarefas)
+    return await _concluir_lote(db, current_user["sub"], resultados, objetivos)
+
+@router.patch("/bulk", response_model=DataResponse)
+async def atualizar_tarefas_lote(
+    lote: TarefaBulkUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Atualiza várias tarefas em uma transação (ex.: mover cartões no kanban).
+    O resultado de cada item traz status 200 ou o erro (404 inexistente, 409 repetida).
+    """
+    
+    resultados, objetivos = await db.run_sync(atualizar_tarefas_em_lote, current_user["sub"], lote.tarefas)
+    return await _concluir_lote(db, current_user["sub"], resultados, objetivos)
+
+async def _concluir_lote(db: AsyncSession, usuario_id: str, resultados: list, objetivos: set) -> DataResponse:
+    """Recalcula cada objetivo afetado uma única vez, faz o commit e monta a resposta"""
+    
+    # A tarefa não altera o progresso do hábito: só os objetivos são recalculados
+    if not fila_progresso.ativa:
+        for objetivo_id in objetivos:
+            await db.run_sync(aplicar_progresso_objetivo, objetivo_id)
+    
+    await db.commit()
+    invalidar_totais(usuario_id)
+    invalidar_dashboard(usuario_id)
+    for objetivo_id in objetivos:
+        fila_progresso.marcar_objetivo(objetivo_id, usuario_id)
+    
+    falhas = sum(1 for resultado in resultados if resultado["erro"] is not None)
+    return DataResponse(data={
+        "resultados": resultados,
+        "total": len(resultados),
+        "sucesso": len(resultados) - falhas,
+        "falhas": falhas,
+    })
+
 @router.put("/{tarefa_id}", response_model=DataResponse)
 async def atualizar_tarefa(
     tarefa_id: str,
     tarefa_data: TarefaUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Atualiza uma tarefa existente"""
     
-    tarefa = db.query(Tarefa).filter(
-        and_(
-            Tarefa.id == tarefa_id,
-            Tarefa.usuario_id == current_user["sub"]
+    result = await db.execute(
+        select(Tarefa).where(
+            and_(
+                Tarefa.id == tarefa_id,
+                Tarefa.usuario_id == current_user["sub"]
+            )
         )
-    ).first()
+    )
+    tarefa = result.scalar_one_or_none()
     
     if not tarefa:
         raise HTTPException(
@@ -176,9 +261,15 @@ async def atualizar_tarefa(
     
     # Se não há campos válidos para atualizar, retornar sem fazer nada
     if not filtered_data:
-        db.refresh(tarefa)
+        await db.refresh(tarefa)
         return DataResponse(data=serialize_model(tarefa))
     
+    # Mudou de coluna no kanban: o cartão entra no fim da coluna nova
+    if filtered_data.get('status') is not None and coluna_kanban(filtered_data['status']) != coluna_kanban(tarefa.status):
+        filtered_data['rank_kanban'] = await db.run_sync(
+            rank_no_fim, tarefa.habito_id, filtered_data['status'], current_user["sub"], tarefa_id
+        )
+    
     # Fazer UPDATE usando SQL direto para evitar problemas com metadata/cache
     try:
         # Construir SET clause dinamicamente
@@ -190,8 +281,11 @@ async def atualizar_tarefa(
             set_clauses.append(f"{field} = :{param_name}")
             params[param_name] = value
         
-        # Adicionar updated_at
+        # Adicionar updated_at (e concluida_em, se a tarefa foi concluída ou reaberta)
         set_clauses.append("updated_at = NOW()")
+        conclusao = conclusao_alterada(tarefa.status, filtered_data.get('status', tarefa.status))
+        if conclusao is not None:
+            set_clauses.append("concluida_em = NOW()" if conclusao else "concluida_em = NULL")
         
         set_clause = ", ".join(set_clauses)
         
@@ -214,18 +308,35 @@ async def atualizar_tarefa(
         logger.debug(f"Parâmetros: {params}")
         
         try:
-            result = db.execute(query_text, params)
+            result = await db.execute(query_text, params)
             
             if result.rowcount == 0:
-                db.rollback()
+                await db.rollback()
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Tarefa não encontrada ou sem permissão"
                 )
             
-            db.commit()
+            # Aplicar a diferença nas estatísticas do objetivo (mesma transação)
+            objetivo_id = await db.run_sync(objetivo_do_habito, tarefa.habito_id, current_user["sub"])
+            await db.run_sync(
+                registrar_alteracao_tarefa, objetivo_id,
+                tarefa.status, tarefa.progresso,
+                filtered_data.get('status', tarefa.status),
+                filtered_data.get('progresso', tarefa.progresso)
+            )
+            
+            # Recalcular progresso do objetivo (a tarefa não altera o progresso do hábito):
+            # na fila em segundo plano, após o commit, ou nesta transação se a fila estiver inativa
+            if objetivo_id and not fila_progresso.ativa:
+                await db.run_sync(aplicar_progresso_objetivo, objetivo_id)
+            
+            await db.commit()
+            invalidar_totais(current_user["sub"])
+            invalidar_dashboard(current_user["sub"])
+            fila_progresso.marcar_objetivo(objetivo_id, current_user["sub"])
         except Exception as sql_error:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Erro SQL ao atualizar tarefa: {sql_error}")
             logger.error(f"SQL executado: {query_sql}")
             logger.error(f"Parâmetros: {params}")
@@ -236,15 +347,15 @@ async def atualizar_tarefa(
         select_query = text("""
             SELECT id, usuario_id, habito_id, titulo, descricao, prioridade, status,
                    estimativa_horas, horas_gastas, prazo, progresso, posicao, 
-                   tags, anexos, created_at, updated_at
+                   tags, anexos, created_at, updated_at, rank_kanban, concluida_em
             FROM tarefas
             WHERE id = :tarefa_id AND usuario_id = :usuario_id
         """)
         
-        result_row = db.execute(select_query, {
+        result_row = (await db.execute(select_query, {
             'tarefa_id': tarefa_id,
             'usuario_id': current_user["sub"]
-        }).fetchone()
+        })).fetchone()
         
         if not result_row:
             raise HTTPException(
@@ -270,37 +381,38 @@ async def atualizar_tarefa(
             tags=result_row[12],
             anexos=result_row[13],
             created_at=result_row[14],
-            updated_at=result_row[15]
+            updated_at=result_row[15],
+            rank_kanban=result_row[16],
+            concluida_em=result_row[17]
         )
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Erro ao atualizar tarefa: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erro ao atualizar tarefa: {str(e)}"
         )
     
-    # Recalcular progresso do hábito pai se necessário
-    if tarefa.habito_id:
-        recalcular_progresso_habito(db, tarefa.habito_id)
-    
     return DataResponse(data=serialize_model(tarefa))
 
 @router.delete("/{tarefa_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def deletar_tarefa(
     tarefa_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Remove uma tarefa"""
     
-    tarefa = db.query(Tarefa).filter(
-        and_(
-            Tarefa.id == tarefa_id,
-            Tarefa.usuario_id == current_user["sub"]
+    result = await db.execute(
+        select(Tarefa).where(
+            and_(
+                Tarefa.id == tarefa_id,
+                Tarefa.usuario_id == current_user["sub"]
+            )
         )
-    ).first()
+    )
+    tarefa = result.scalar_one_or_none()
     
     if not tarefa:
         raise HTTPException(
@@ -311,29 +423,40 @@ async def deletar_tarefa(
     # Armazenar habito_id para recálculo
     habito_id = tarefa.habito_id
     
-    # Remover tarefa
-    db.delete(tarefa)
-    db.commit()
-    
-    # Recalcular progresso do hábito pai se necessário
-    if habito_id:
-        recalcular_progresso_habito(db, habito_id)
+    # Remover tarefa (descontando-a das estatísticas do objetivo)
+    objetivo_id = await db.run_sync(objetivo_do_habito, habito_id, current_user["sub"])
+    await db.run_sync(registrar_tarefa, objetivo_id, tarefa.status, tarefa.progresso, -1)
+    await db.run_sync(registrar_exclusoes, current_user["sub"], Tarefa.__tablename__, [tarefa_id])
+    await db.delete(tarefa)
+    
+    # Recalcular progresso do objetivo (a tarefa não altera o progresso do hábito):
+    # na fila em segundo plano, após o commit, ou nesta transação se a fila estiver inativa
+    if objetivo_id and not fila_progresso.ativa:
+        await db.run_sync(aplicar_progresso_objetivo, objetivo_id)
+    
+    await db.commit()
+    invalidar_totais(current_user["sub"])
+    invalidar_dashboard(current_user["sub"])
+    fila_progresso.marcar_objetivo(objetivo_id, current_user["sub"])
 
 @router.patch("/{tarefa_id}/status", response_model=DataResponse)
 async def atualizar_status_tarefa(
     tarefa_id: str,
     status_kanban: str = Query(..., pattern=r"^(backlog|fazendo|feito)$"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
-    """Atualiza apenas o status kanban de uma tarefa"""
+    """Atualiza apenas o status kanban de uma tarefa (feito = concluida)"""
     
-    tarefa = db.query(Tarefa).filter(
-        and_(
-            Tarefa.id == tarefa_id,
-            Tarefa.usuario_id == current_user["sub"]
+    result = await db.execute(
+        select(Tarefa).where(
+            and_(
+                Tarefa.id == tarefa_id,
+                Tarefa.usuario_id == current_user["sub"]
+            )
         )
-    ).first()
+    )
+    tarefa = result.scalar_one_or_none()
     
     if not tarefa:
         raise HTTPException(
@@ -341,86 +464,228 @@ async def atualizar_status_tarefa(
             detail="Tarefa não encontrada"
         )
     
-    # Atualizar status e data_conclusao se necessário
-    old_status = tarefa.status_kanban
-    tarefa.status_kanban = status_kanban
+    # Atualizar status (coluna status do modelo; a coluna de kanban não existe)
+    old_status = tarefa.status
+    tarefa.status = STATUS_KANBAN_PARA_TAREFA[status_kanban]
+    if status_kanban != coluna_kanban(old_status):
+        # O cartão entra no fim da coluna nova
+        tarefa.rank_kanban = await db.run_sync(
+            rank_no_fim, tarefa.habito_id, tarefa.status, current_user["sub"], tarefa_id
+        )
+    conclusao = conclusao_alterada(old_status, tarefa.status)
+    if conclusao is not None:
+        tarefa.concluida_em = func.now() if conclusao else None
+    
+    objetivo_id = await db.run_sync(objetivo_do_habito, tarefa.habito_id, current_user["sub"])
+    await db.run_sync(
+        registrar_alteracao_tarefa, objetivo_id,
+        old_status, tarefa.progresso, tarefa.status, tarefa.progresso
+    )
+    
+    # Recalcular progresso do objetivo (a tarefa não altera o progresso do hábito):
+    # na fila em segundo plano, após o commit, ou nesta transação se a fila estiver inativa
+    if objetivo_id and not fila_progresso.ativa:
+        await db.run_sync(aplicar_progresso_objetivo, objetivo_id)
+    
+    await db.commit()
+    invalidar_totais(current_user["sub"])
+    invalidar_dashboard(current_user["sub"])
+    fila_progresso.marcar_objetivo(objetivo_id, current_user["sub"])
+    await db.refresh(tarefa)
+    
+    return DataResponse(data=serialize_model(tarefa))
+
+@router.post("/{tarefa_id}/move", response_model=DataResponse)
+async def mover_tarefa(
+    tarefa_id: str,
+    dados: TarefaMove,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Move um cartão do kanban para a coluna de destino, entre anterior_id e
+    proximo_id (sem vizinhos: fim da coluna). Só a tarefa movida é gravada.
+    """
+    
+    result = await db.execute(
+        select(Tarefa).where(
+            and_(
+                Tarefa.id == tarefa_id,
+                Tarefa.usuario_id == current_user["sub"]
+            )
+        )
+    )
+    tarefa = result.scalar_one_or_none()
     
-    if status_kanban == 'feito' and old_status != 'feito':
-        tarefa.data_conclusao = datetime.utcnow()
-    elif status_kanban != 'feito' and old_status == 'feito':
-        tarefa.data_conclusao = None
+    if not tarefa:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tarefa não encontrada"
+        )
     
-    db.commit()
-    db.refresh(tarefa)
+    if tarefa_id in (dados.anterior_id, dados.proximo_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A tarefa não pode ser vizinha de si mesma"
+        )
     
-    # Recalcular progresso do hábito pai se necessário
-    if tarefa.habito_id:
-        recalcular_progresso_habito(db, tarefa.habito_id)
+    # Na mesma coluna do quadro o status é mantido (ex.: a_fazer continua a_fazer em backlog)
+    status_anterior = tarefa.status
+    status_novo = status_anterior
+    if dados.status_kanban and dados.status_kanban != coluna_kanban(status_anterior):
+        status_novo = STATUS_KANBAN_PARA_TAREFA[dados.status_kanban]
+    coluna = (tarefa.habito_id, status_novo, current_user["sub"])
+    
+    novo_rank = await _rank_entre_vizinhos(db, tarefa_id, coluna, dados)
+    if len(novo_rank) > TAMANHO_COLUNA_RANK:
+        # Chaves no limite da coluna: redistribui agora, nesta transação
+        await db.run_sync(rebalancear_coluna, *coluna)
+        novo_rank = await _rank_entre_vizinhos(db, tarefa_id, coluna, dados)
+    
+    # Escrita de uma linha; updated_at avança (onupdate) para que GET /sync envie a nova ordem
+    valores = {"rank_kanban": novo_rank}
+    if status_novo != status_anterior:
+        valores["status"] = status_novo
+    conclusao = conclusao_alterada(status_anterior, status_novo)
+    if conclusao is not None:
+        valores["concluida_em"] = func.now() if conclusao else None
+    await db.execute(
+        update(Tarefa)
+        .where(Tarefa.id == tarefa_id)
+        .values(**valores)
+        .execution_options(synchronize_session=False)
+    )
     
+    objetivo_id = None
+    if status_novo != status_anterior:
+        objetivo_id = await db.run_sync(objetivo_do_habito, tarefa.habito_id, current_user["sub"])
+        await db.run_sync(
+            registrar_alteracao_tarefa, objetivo_id,
+            status_anterior, tarefa.progresso, status_novo, tarefa.progresso
+        )
+        if objetivo_id and not fila_progresso.ativa:
+            await db.run_sync(aplicar_progresso_objetivo, objetivo_id)
+    
+    await db.commit()
+    if status_novo != status_anterior:
+        invalidar_totais(current_user["sub"])
+        invalidar_dashboard(current_user["sub"])
+        fila_progresso.marcar_objetivo(objetivo_id, current_user["sub"])
+    
+    if len(novo_rank) > TAMANHO_MAXIMO_RANK:
+        background_tasks.add_task(rebalancear_em_segundo_plano, *coluna)
+    
+    await db.refresh(tarefa)
     return DataResponse(data=serialize_model(tarefa))
 
+async def _rank_entre_vizinhos(db: AsyncSession, tarefa_id: str, coluna: tuple, dados: TarefaMove) -> str:
+    """
+    Chave nova do cartão movido. Com um só vizinho informado, o outro é o
+    adjacente atual na coluna; sem vizinhos, o cartão vai para o fim.
+    """
+    
+    habito_id, status_coluna, usuario_id = coluna
+    vizinho_ids = [vizinho_id for vizinho_id in (dados.anterior_id, dados.proximo_id) if vizinho_id]
+    ranks = {}
+    if vizinho_ids:
+        result = await db.execute(
+            select(Tarefa.id, Tarefa.habito_id, Tarefa.status, Tarefa.rank_kanban)
+            .where(Tarefa.id.in_(vizinho_ids), Tarefa.usuario_id == usuario_id)
+        )
+        linhas = {linha.id: linha for linha in result}
+        
+        for vizinho_id in vizinho_ids:
+            linha = linhas.get(vizinho_id)
+            if linha is None or linha.habito_id != habito_id or coluna_kanban(linha.status) != coluna_kanban(status_coluna):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Tarefa vizinha {vizinho_id} não está na coluna de destino"
+                )
+        
+        # Vizinhos sem chave (tarefas anteriores ao rank_kanban): chaveia a coluna antes
+        if any(linhas[vizinho_id].rank_kanban is None for vizinho_id in vizinho_ids):
+            await db.run_sync(rebalancear_coluna, *coluna)
+            result = await db.execute(select(Tarefa.id, Tarefa.rank_kanban).where(Tarefa.id.in_(vizinho_ids)))
+            ranks = {linha.id: linha.rank_kanban for linha in result}
+        else:
+            ranks = {vizinho_id: linhas[vizinho_id].rank_kanban for vizinho_id in vizinho_ids}
+    
+    anterior = ranks.get(dados.anterior_id)
+    proximo = ranks.get(dados.proximo_id)
+    if dados.anterior_id and not dados.proximo_id:
+        proximo = await db.run_sync(rank_adjacente, *coluna, tarefa_id, None, anterior)
+    elif dados.proximo_id and not dados.anterior_id:
+        anterior = await db.run_sync(rank_adjacente, *coluna, tarefa_id, proximo)
+    elif not vizinho_ids:
+        anterior = await db.run_sync(rank_adjacente, *coluna, tarefa_id)
+    
+    try:
+        return rank_entre(anterior, proximo)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="anterior_id deve vir antes de proximo_id na coluna"
+        )
+
 # Rota para listar tarefas por hábito
 @router.get("/habito/{habito_id}", response_model=DataResponse)
 async def listar_tarefas_por_habito(
     habito_id: str,
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=100),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (next_cursor)"),
+    with_total: str = Query("exact", pattern=WITH_TOTAL_PATTERN, description="Total: exact, estimate (cache) ou false"),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Lista tarefas de um hábito específico"""
     
-    query = db.query(Tarefa).filter(
+    query = select(Tarefa).where(
         and_(
             Tarefa.habito_id == habito_id,
             Tarefa.usuario_id == current_user["sub"]
         )
     )
     
-    total = query.count()
-    offset = (page - 1) * limit
-    tarefas = query.offset(offset).limit(limit).all()
-    
-    total_pages = (total + limit - 1) // limit
-    
-    pagination = PaginationResponse(
+    tarefas, pagination = await paginar(
+        db, query,
+        coluna=Tarefa.created_at,
+        coluna_id=Tarefa.id,
+        order_dir="desc",
         page=page,
         limit=limit,
-        total=total,
-        total_pages=total_pages,
-        has_next=page < total_pages,
-        has_prev=page > 1
+        cursor=cursor,
+        with_total=with_total,
+        usuario_id=current_user["sub"]
     )
     
     tarefas_data = serialize_models(tarefas)
-    return DataResponse(data=tarefas_data, pagination=pagination)
+    return resposta_lista(tarefas_data, pagination)
 
 # Rota para kanban - listar tarefas agrupadas por status
 @router.get("/kanban/habito/{habito_id}", response_model=DataResponse)
 async def listar_tarefas_kanban(
     habito_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Lista tarefas organizadas por status kanban (para visualização kanban)"""
     
-    tarefas = db.query(Tarefa).filter(
-        and_(
-            Tarefa.habito_id == habito_id,
-            Tarefa.usuario_id == current_user["sub"]
-        )
-    ).order_by(asc(Tarefa.posicao_kanban), desc(Tarefa.created_at)).all()
+    # Cartões do hábito em ordem de rank_kanban, agrupados por coluna abaixo
+    tarefas = (await db.execute(
+        select(Tarefa).where(
+            and_(
+                Tarefa.habito_id == habito_id,
+                Tarefa.usuario_id == current_user["sub"]
+            )
+        ).order_by(*ORDEM_KANBAN)
+    )).scalars().all()
     
-    # Agrupar por status
-    kanban_data = {
-        "backlog": [],
-        "fazendo": [],
-        "feito": []
-    }
+    # Agrupar por coluna do quadro
+    kanban_data = {coluna: [] for coluna in COLUNAS_KANBAN}
     
     for tarefa in tarefas:
-        status = tarefa.status_kanban or "backlog"
-        if status in kanban_data:
-            kanban_data[status].append(serialize_model(tarefa))
+        kanban_data[coluna_kanban(tarefa.status)].append(serialize_model(tarefa))
     
-    return DataResponse(data=kanban_data)
\ No newline at end of file
+    return resposta_lista(kanban_data)
\ No newline at end of file
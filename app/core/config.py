@@ -28,6 +28,15 @@ class Settings(BaseSettings):
     def database_url(self) -> str:
         return f"mysql+pymysql://{self.mysql_user}:{self.mysql_password}@{self.mysql_host}:{self.mysql_port}/{self.mysql_database}"
     
+    @property
+    def async_database_url(self) -> str:
+        """URL do driver assíncrono (aiomysql), usada pelas rotas da API"""
+        return f"mysql+aiomysql://{self.mysql_user}:{self.mysql_password}@{self.mysql_host}:{self.mysql_port}/{self.mysql_database}"
+    
+    # Pool de conexões
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    
     # Configurações JWT
     jwt_secret_key: str = "goalmanager_super_secret_key_change_in_production_123456789"
     jwt_algorithm: str = "HS256"
@@ -48,6 +57,32 @@ class Settings(BaseSettings):
     # Configurações de paginação
     default_page_size: int = 50
     max_page_size: int = 100
+    fast_json_responses: bool = False  # listagens com orjson, sem revalidar pelo response_model
+    fulltext_search: bool = False  # `busca` via índices FULLTEXT (requer alembic upgrade head)
+    total_estimate_ttl: int = 60  # segundos - validade dos totais em with_total=estimate
+    total_estimate_cache_size: int = 10000  # totais (usuário + consulta) em cache
+    
+    # Caches em memória
+    cache_expiry_interval: float = 60.0  # segundos entre varreduras de itens expirados (0 = desligado)
+    
+    # Métricas internas (GET /metrics, exige usuário autenticado)
+    metrics_enabled: bool = False
+    
+    # Cache do dashboard por usuário (invalidado nas escritas)
+    dashboard_cache_ttl: int = 300  # segundos - limite de idade de um snapshot (0 = sem cache)
+    dashboard_cache_size: int = 10000  # usuários com snapshot em memória
+    
+    # Exclusão em cascata de objetivos (hábitos, tarefas, realizações)
+    delete_chunk_size: int = 5000  # linhas por DELETE (e por commit)
+    
+    # Sincronização incremental (GET /sync?since=...)
+    sync_chunk_size: int = 500  # linhas por consulta/bloco do stream NDJSON
+    sync_cursor_margin: int = 5  # segundos reenviados a cada sync (transações em andamento)
+    sync_tombstone_retention_days: int = 90  # cursores mais antigos recebem a carga completa
+    
+    # Recálculo de progresso em segundo plano
+    progress_recalc_debounce: float = 0.5  # segundos agrupando IDs antes de recalcular (0 = síncrono)
+    progress_recalc_max_tentativas: int = 3  # tentativas por ID antes de descartá-lo (lote com erro)
     
     # Configurações de rate limiting
     rate_limit_requests: int = 1000
@@ -5,6 +5,7 @@ from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import QueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from app.core.config import settings
 import logging
 
@@ -16,13 +17,24 @@ logger = logging.getLogger(__name__)
 engine = create_engine(
     settings.database_url,
     poolclass=QueuePool,
-    pool_size=10,
-    max_overflow=20,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
     pool_pre_ping=True,
     echo=settings.debug,  # Log SQL queries em modo debug
     echo_pool=False  # Não logar pool de conexões
 )
 
+# Engine assíncrona (aiomysql) usada pelas rotas da API.
+# A engine síncrona acima continua disponível para scripts e inicialização.
+async_engine = create_async_engine(
+    settings.async_database_url,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_pre_ping=True,
+    pool_recycle=3600,
+    echo=settings.debug
+)
+
 # Habilitar logging detalhado de SQL para debug
 if settings.debug:
     logging.getLogger('sqlalchemy.engine').setLevel(logging.INFO)
@@ -30,6 +42,15 @@ if settings.debug:
 # Configurar sessão
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Sessão assíncrona: expire_on_commit=False evita lazy loads (I/O implícito)
+# ao acessar atributos depois do commit
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Base para modelos
 Base = declarative_base()
 
@@ -48,6 +69,20 @@ def get_db():
     finally:
         db.close()
 
+# Dependency assíncrona usada pelas rotas
+async def get_async_db():
+    """
+    Dependency que fornece sessão assíncrona do banco de dados.
+    As consultas não bloqueiam o event loop do uvicorn.
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception as e:
+            logger.error(f"Erro na sessão do banco: {e}")
+            await db.rollback()
+            raise
+
 # Função para recarregar metadata do banco (resolve problemas de cache)
 def refresh_metadata():
     """
@@ -59,7 +94,7 @@ def refresh_metadata():
         Base.metadata.clear()
         
         # Recarregar todos os modelos para registrar novamente
-        from app.models import usuario, objetivo, habito, tarefa, audit_log
+        from app.models import usuario, objetivo, habito, tarefa, audit_log, registro_excluido
         
         # Reflect das tabelas existentes no banco
         Base.metadata.reflect(bind=engine)
@@ -75,7 +110,7 @@ def init_db():
     """
     try:
         # Import todos os modelos aqui para registrá-los
-        from app.models import usuario, objetivo, habito, tarefa, audit_log
+        from app.models import usuario, objetivo, habito, tarefa, audit_log, registro_excluido
         
         # Recarregar metadata do banco primeiro (resolve cache desatualizado)
         try:
@@ -0,0 +1,131 @@
+"""
+Pipeline de logging não bloqueante
+
+Os handlers do logger raiz (stdout, arquivo...) passam a ser chamados por
+uma thread de fundo (QueueListener). No event loop, emitir um log apenas
+coloca o LogRecord em uma fila limitada: a formatação da mensagem e o I/O
+acontecem na thread, então lentidão do terminal/disco não vira latência
+de requisição.
+
+Fila cheia:
+  - "descartar": o registro é descartado e contado (padrão, nunca bloqueia)
+  - "bloquear": espera até LOG_QUEUE_BLOCK_TIMEOUT segundos por espaço e
+    só então descarta
+"""
+import logging
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener
+from typing import Callable, List, Optional
+
+from app.core.logging_config import logging_settings
+
+POLITICA_DESCARTAR = "descartar"
+POLITICA_BLOQUEAR = "bloquear"
+
+class FormatacaoAdiada:
+    """
+    Argumento de log formatado apenas quando a mensagem é montada (na thread
+    do listener). Os argumentos não devem ser alterados depois do log.
+    """
+
+    __slots__ = ("funcao", "args")
+
+    def __init__(self, funcao: Callable[..., str], *args):
+        self.funcao = funcao
+        self.args = args
+
+    def __str__(self) -> str:
+        return self.funcao(*self.args)
+
+class FilaLogHandler(QueueHandler):
+    """QueueHandler com fila limitada, política de fila cheia e contadores"""
+
+    def __init__(self, tamanho_max: int, politica: str = POLITICA_DESCARTAR, timeout_bloqueio: float = 0.05):
+        super().__init__(queue.Queue(maxsize=tamanho_max))
+        self.politica = politica
+        self.timeout_bloqueio = timeout_bloqueio
+        self.enfileirados = 0
+        self.descartados = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # O QueueHandler padrão formata a mensagem aqui (no event loop);
+        # a formatação fica para os handlers do listener.
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        # Chamado com o lock do handler, contadores não precisam de lock próprio
+        try:
+            if self.politica == POLITICA_BLOQUEAR:
+                self.queue.put(record, timeout=self.timeout_bloqueio)
+            else:
+                self.queue.put_nowait(record)
+            self.enfileirados += 1
+        except queue.Full:
+            self.descartados += 1
+
+class _FilaLogListener(QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # Com a fila cheia, put_nowait falharia; a thread está drenando
+        self.queue.put(self._sentinel)
+
+class PipelineLogs:
+    """Liga/desliga o pipeline no logger raiz e expõe suas métricas"""
+
+    def __init__(self):
+        self.handler: Optional[FilaLogHandler] = None
+        self._listener: Optional[QueueListener] = None
+        self._handlers_originais: List[logging.Handler] = []
+        self.nao_amostrados = 0
+
+    @property
+    def ativo(self) -> bool:
+        return self._listener is not None
+
+    def iniciar(self) -> None:
+        """Move os handlers atuais do logger raiz para a thread de fundo"""
+        if self.ativo or not logging_settings.LOG_QUEUE_ENABLED:
+            return
+
+        raiz = logging.getLogger()
+        self._handlers_originais = raiz.handlers[:]
+        self.handler = FilaLogHandler(
+            logging_settings.LOG_QUEUE_MAX_SIZE,
+            logging_settings.LOG_QUEUE_POLICY,
+            logging_settings.LOG_QUEUE_BLOCK_TIMEOUT
+        )
+        self._listener = _FilaLogListener(self.handler.queue, *self._handlers_originais, respect_handler_level=True)
+        raiz.handlers = [self.handler]
+        self._listener.start()
+
+    def parar(self) -> None:
+        """Escreve o que estiver na fila e restaura os handlers originais"""
+        if not self.ativo:
+            return
+
+        self._listener.stop()
+        logging.getLogger().handlers = self._handlers_originais
+        self._listener = None
+
+    def amostrar(self) -> bool:
+        """Decide se uma requisição rápida e bem-sucedida deve ser logada"""
+        taxa = logging_settings.LOG_SAMPLE_RATE_SUCCESS
+        if taxa >= 1 or random.random() < taxa:
+            return True
+        self.nao_amostrados += 1
+        return False
+
+    def metricas(self) -> dict:
+        return {
+            "ativo": self.ativo,
+            "politica": self.handler.politica if self.handler else logging_settings.LOG_QUEUE_POLICY,
+            "profundidade": self.handler.queue.qsize() if self.handler else 0,
+            "capacidade": logging_settings.LOG_QUEUE_MAX_SIZE,
+            "enfileirados": self.handler.enfileirados if self.handler else 0,
+            "descartados": self.handler.descartados if self.handler else 0,
+            "taxa_amostragem": logging_settings.LOG_SAMPLE_RATE_SUCCESS,
+            "nao_amostrados": self.nao_amostrados,
+        }
+
+# Instância global (iniciada no lifespan da aplicação)
+pipeline_logs = PipelineLogs()
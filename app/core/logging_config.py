@@ -6,18 +6,22 @@ from datetime import timedelta
 class LoggingSettings:
     """Configurações do middleware de logging"""
     
-    # Cache de informações do usuário
-    USER_CACHE_TTL = timedelta(minutes=5)
+    # Cache de informações do usuário (autenticação). O TTL é o atraso máximo
+    # para que um usuário desativado ou removido fora deste worker (outro
+    # worker, SQL ou scripts administrativos) deixe de ser autenticado
+    USER_CACHE_TTL = timedelta(seconds=30)
     USER_CACHE_MAX_SIZE = 1000  # Máximo de usuários no cache
     
     # Controle de logging
     LOG_REQUEST_BODY = True  # Se deve logar o corpo das requisições
     LOG_RESPONSE_BODY = False  # Se deve logar o corpo das respostas
     MAX_BODY_SIZE_LOG = 2000  # Tamanho máximo do body para log (caracteres) - aumentado para debug
+    MAX_BODY_CAPTURE = 64 * 1024  # Bytes copiados do corpo para o log; acima disso só o tamanho é registrado
     
     # Rotas excluídas do logging (para reduzir verbosidade)
     EXCLUDED_PATHS = {
         "/health",
+        "/metrics",
         "/api/v1/dashboard/health",
         "/favicon.ico",
         "/robots.txt"
@@ -60,6 +64,16 @@ class LoggingSettings:
     ENABLE_PERFORMANCE_LOGS = True  # Se deve logar tempo de resposta
     SLOW_REQUEST_THRESHOLD = 1.0  # Segundos - requisições mais lentas que isso são destacadas
     
+    # Pipeline assíncrono (fila + thread de escrita, ver app/core/log_pipeline.py)
+    LOG_QUEUE_ENABLED = True
+    LOG_QUEUE_MAX_SIZE = 10000  # Registros aguardando escrita
+    LOG_QUEUE_POLICY = "descartar"  # "descartar" ou "bloquear" quando a fila está cheia
+    LOG_QUEUE_BLOCK_TIMEOUT = 0.05  # Segundos de espera na política "bloquear" antes de descartar
+    
+    # Fração das requisições rápidas (abaixo de SLOW_REQUEST_THRESHOLD) e com
+    # status 2xx/3xx que são logadas; erros e requisições lentas sempre são
+    LOG_SAMPLE_RATE_SUCCESS = 1.0
+    
     # Níveis de detalhamento
     class LogLevel:
         MINIMAL = "minimal"      # Apenas método, URL e usuário
@@ -0,0 +1,49 @@
+"""
+Métricas de banco de dados por requisição
+
+Os contadores ficam em um ContextVar iniciado pelo middleware no início da
+requisição. Como o objeto é mutável, os incrementos feitos na task da rota
+(e nas chamadas run_sync) são vistos pelo middleware ao final.
+"""
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+HEADER_COMMITS = "X-DB-Commits"
+HEADER_CONSULTAS = "X-DB-Queries"
+
+@dataclass
+class MetricasRequisicao:
+    """Contadores de uma requisição"""
+    commits: int = 0
+    consultas: int = 0  # instruções enviadas ao banco (idas e voltas)
+
+_metricas: ContextVar[Optional[MetricasRequisicao]] = ContextVar("metricas_requisicao", default=None)
+
+def iniciar_metricas() -> Token:
+    """Inicia os contadores da requisição atual (retorna o token para encerrar)"""
+    return _metricas.set(MetricasRequisicao())
+
+def encerrar_metricas(token: Token) -> None:
+    _metricas.reset(token)
+
+def metricas_atuais() -> Optional[MetricasRequisicao]:
+    """Contadores da requisição atual (None fora de uma requisição)"""
+    return _metricas.get()
+
+@event.listens_for(Session, "after_commit")
+def _contar_commit(session) -> None:
+    metricas = _metricas.get()
+    if metricas is not None:
+        metricas.commits += 1
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _contar_consulta(conn, cursor, statement, parameters, context, executemany) -> None:
+    metricas = _metricas.get()
+    if metricas is not None:
+        metricas.consultas += 1
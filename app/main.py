@@ -1,18 +1,25 @@
 """
 Aplicação principal FastAPI - GoalManager Backend
 """
-from fastapi import FastAPI, HTTPException, status
+from fastapi import Depends, FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 import warnings
 from app.core.config import settings
-from app.core.database import init_db, test_connection
+from app.core.database import init_db, test_connection, async_engine
 from app.api import objetivos
-from app.api import habitos, tarefas, auth
+from app.api import habitos, tarefas, auth, sync
 from app.middleware import RequestLoggingMiddleware
+from app.core.metrics import HEADER_COMMITS, HEADER_CONSULTAS
+from app.core.log_pipeline import pipeline_logs
+from app.services.fila_progresso import fila_progresso
+from app.services.dashboard import cache_dashboard
+from app.services.auth import get_current_user
+from app.utils.cache import expirar_caches_periodicamente, metricas_caches
 
 # Suprimir avisos do Pydantic sobre aliases (são apenas warnings, não afetam funcionalidade)
 warnings.filterwarnings(
@@ -41,6 +48,8 @@ request_logger.setLevel(logging.INFO)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    # Logs passam a ser escritos por uma thread de fundo (fila limitada)
+    pipeline_logs.iniciar()
     logger.info("Inicializando GoalManager API...")
     
     # Testar conexão com banco de dados
@@ -64,11 +73,27 @@ async def lifespan(app: FastAPI):
         logger.error(f"Erro ao inicializar banco de dados: {e}")
         raise
     
+    # Fila de recálculo de progresso em segundo plano
+    await fila_progresso.iniciar()
+    
+    # Remoção periódica de itens expirados dos caches em memória
+    expiracao_caches = None
+    if settings.cache_expiry_interval > 0:
+        expiracao_caches = asyncio.create_task(
+            expirar_caches_periodicamente(settings.cache_expiry_interval),
+            name="expiracao-caches"
+        )
+    
     logger.info("API inicializada com sucesso!")
     yield
     
     # Shutdown
     logger.info("Finalizando GoalManager API...")
+    if expiracao_caches:
+        expiracao_caches.cancel()
+    await fila_progresso.parar()
+    await async_engine.dispose()
+    pipeline_logs.parar()
 
 # Criar aplicação FastAPI
 app = FastAPI(
@@ -90,6 +115,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[HEADER_COMMITS, HEADER_CONSULTAS],
 )
 
 # Manipulador de exceções global
@@ -176,6 +202,18 @@ async def health_check():
         "version": settings.version
     }
 
+@app.get("/metrics")
+async def metrics(current_user = Depends(get_current_user)):
+    """Métricas internas da API (JSON); desligadas por padrão (settings.metrics_enabled)"""
+    if not settings.metrics_enabled:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    return {
+        "fila_progresso": fila_progresso.metricas(),
+        "logs": pipeline_logs.metricas(),
+        "dashboard": cache_dashboard.metricas(),
+        "caches": metricas_caches()
+    }
+
 # Incluir routers das APIs
 app.include_router(objetivos.router, prefix="/api/v1")
 app.include_router(habitos.router, prefix="/api/v1")
@@ -183,6 +221,7 @@ app.include_router(tarefas.router, prefix="/api/v1")
 app.include_router(auth.auth_router, prefix="/api/v1")
 app.include_router(auth.user_router, prefix="/api/v1")
 app.include_router(auth.dashboard_router, prefix="/api/v1")
+app.include_router(sync.router, prefix="/api/v1")
 
 if __name__ == "__main__":
     import uvicorn
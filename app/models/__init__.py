@@ -2,17 +2,20 @@
 Inicialização dos modelos
 """
 from .usuario import Usuario, TokenAuth
-from .objetivo import Objetivo
+from .objetivo import Objetivo, ObjetivoStats
 from .habito import Habito, HabitoRealizacao
 from .tarefa import Tarefa
 from .audit_log import AuditLog
+from .registro_excluido import RegistroExcluido
 
 __all__ = [
     "Usuario",
     "TokenAuth", 
     "Objetivo",
+    "ObjetivoStats",
     "Habito",
     "HabitoRealizacao",
     "Tarefa",
-    "AuditLog"
+    "AuditLog",
+    "RegistroExcluido"
 ]
\ No newline at end of file
@@ -1,13 +1,17 @@
 """
 Modelos SQLAlchemy - Auditoria
 """
-from sqlalchemy import Column, String, DateTime, JSON
+from sqlalchemy import Column, String, DateTime, JSON, Index
 from sqlalchemy.sql import func
 from app.core.database import Base
 import uuid
 
 class AuditLog(Base):
     __tablename__ = "audit_log"
+    __table_args__ = (
+        # Feed de atividades: registros de uma tabela do usuário por data
+        Index("ix_audit_log_usuario_tabela_created_at_id", "usuario_id", "tabela", "created_at", "id"),
+    )
     
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     usuario_id = Column(String(36), nullable=False, index=True)
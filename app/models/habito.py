@@ -1,36 +1,53 @@
 """
 Modelos SQLAlchemy - Hábitos
 """
-from sqlalchemy import Column, String, Text, Integer, Numeric, Enum, DateTime, Date
+from sqlalchemy import Column, String, Text, Integer, Numeric, Enum, DateTime, Date, Index
 from sqlalchemy.sql import func
 from app.core.database import Base
 import uuid
 
 class Habito(Base):
     __tablename__ = "habitos"
+    __table_args__ = (
+        # Índices compostos para paginação keyset: (usuario_id, coluna de ordenação, id)
+        Index("ix_habitos_usuario_created_at_id", "usuario_id", "created_at", "id"),
+        Index("ix_habitos_usuario_updated_at_id", "usuario_id", "updated_at", "id"),
+        Index("ix_habitos_usuario_titulo_id", "usuario_id", "titulo", "id"),
+        Index("ix_habitos_usuario_progresso_id", "usuario_id", "progresso", "id"),
+        # Listagem de hábitos de um objetivo
+        Index("ix_habitos_usuario_objetivo_created_at_id", "usuario_id", "objetivo_id", "created_at", "id"),
+        # Listagem filtrada por status
+        Index("ix_habitos_usuario_status_created_at_id", "usuario_id", "status", "created_at", "id"),
+        # Estatísticas e remoção em cascata por objetivo
+        Index("ix_habitos_objetivo_usuario", "objetivo_id", "usuario_id"),
+    )
     
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    usuario_id = Column(String(36), nullable=False, index=True)
-    objetivo_id = Column(String(36), nullable=False, index=True)
+    usuario_id = Column(String(36), nullable=False)
+    objetivo_id = Column(String(36), nullable=False)
     titulo = Column(String(255), nullable=False)
     descricao = Column(Text, nullable=True)
-    frequencia = Column(String(20), nullable=False, index=True)  # diario, semanal, mensal
+    frequencia = Column(String(20), nullable=False)  # diario, semanal, mensal
     alvo_por_periodo = Column(Integer, nullable=False)
     realizados_no_periodo = Column(Integer, default=0, nullable=False)
-    status = Column(String(20), nullable=False, default='ativo', index=True)  # ativo, pausado, concluido
-    progresso = Column(Numeric(5, 2), default=0.00, nullable=False, index=True)
+    status = Column(String(20), nullable=False, default='ativo')  # ativo, pausado, concluido
+    progresso = Column(Numeric(5, 2), default=0.00, nullable=False)
     periodo_inicio = Column(Date, nullable=True)  # Início do período atual de contagem
     cor = Column(String(7), nullable=True)
     icone = Column(String(50), nullable=True)
-    created_at = Column(DateTime, default=func.now(), nullable=False, index=True)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
 
 class HabitoRealizacao(Base):
     __tablename__ = "habito_realizacoes"
+    __table_args__ = (
+        # Feed de atividades e realizações da semana
+        Index("ix_habito_realizacoes_usuario_created_at_id", "usuario_id", "created_at", "id"),
+    )
     
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     habito_id = Column(String(36), nullable=False, index=True)
-    usuario_id = Column(String(36), nullable=False, index=True)
+    usuario_id = Column(String(36), nullable=False)
     data_realizacao = Column(Date, nullable=False, index=True)
     quantidade = Column(Integer, default=1, nullable=False)
     observacoes = Column(Text, nullable=True)
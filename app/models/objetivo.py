@@ -1,23 +1,51 @@
 """
 Modelos SQLAlchemy - Objetivos
 """
-from sqlalchemy import Column, String, Text, Date, DateTime, Numeric
+from sqlalchemy import Column, String, Text, Date, DateTime, Numeric, Integer, Index
 from sqlalchemy.sql import func
 from app.core.database import Base
 import uuid
 
 class Objetivo(Base):
     __tablename__ = "objetivos"
+    __table_args__ = (
+        # Índices compostos para paginação keyset: (usuario_id, coluna de ordenação, id)
+        Index("ix_objetivos_usuario_created_at_id", "usuario_id", "created_at", "id"),
+        Index("ix_objetivos_usuario_updated_at_id", "usuario_id", "updated_at", "id"),
+        Index("ix_objetivos_usuario_titulo_id", "usuario_id", "titulo", "id"),
+        Index("ix_objetivos_usuario_progresso_id", "usuario_id", "progresso", "id"),
+        Index("ix_objetivos_usuario_inicio_id", "usuario_id", "inicio", "id"),
+        Index("ix_objetivos_usuario_fim_id", "usuario_id", "fim", "id"),
+        # Listagem filtrada por status
+        Index("ix_objetivos_usuario_status_created_at_id", "usuario_id", "status", "created_at", "id"),
+    )
     
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    usuario_id = Column(String(36), nullable=False, index=True)
+    usuario_id = Column(String(36), nullable=False)
     titulo = Column(String(255), nullable=False)
     descricao = Column(Text, nullable=True)
     inicio = Column(Date, nullable=True)
     fim = Column(Date, nullable=True)
-    status = Column(String(20), nullable=False, default='planejado', index=True)  # planejado, em_andamento, concluido, arquivado
-    progresso = Column(Numeric(5, 2), default=0.00, nullable=False, index=True)
+    status = Column(String(20), nullable=False, default='planejado')  # planejado, em_andamento, concluido, arquivado
+    progresso = Column(Numeric(5, 2), default=0.00, nullable=False)
     cor = Column(String(7), nullable=True)  # Cor em hexadecimal (#RRGGBB)
     icone = Column(String(50), nullable=True)  # Nome do ícone
-    created_at = Column(DateTime, default=func.now(), nullable=False, index=True)
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
\ No newline at end of file
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+
+class ObjetivoStats(Base):
+    """
+    Estatísticas agregadas por objetivo, mantidas incrementalmente a cada
+    escrita em hábitos e tarefas (ver app/services/estatisticas.py)
+    """
+    __tablename__ = "objetivo_stats"
+    
+    objetivo_id = Column(String(36), primary_key=True)
+    usuario_id = Column(String(36), nullable=False, index=True)
+    total_habitos = Column(Integer, default=0, nullable=False)
+    habitos_ativos = Column(Integer, default=0, nullable=False)
+    soma_progresso_habitos = Column(Numeric(14, 2), default=0.00, nullable=False)
+    total_tarefas = Column(Integer, default=0, nullable=False)
+    tarefas_concluidas = Column(Integer, default=0, nullable=False)
+    soma_progresso_tarefas = Column(Numeric(14, 2), default=0.00, nullable=False)  # concluída conta como 100
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
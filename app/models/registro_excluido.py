@@ -0,0 +1,20 @@
+"""
+Modelos SQLAlchemy - Registros excluídos (tombstones da sincronização)
+"""
+from sqlalchemy import Column, String, DateTime, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+import uuid
+
+class RegistroExcluido(Base):
+    __tablename__ = "registros_excluidos"
+    __table_args__ = (
+        # GET /sync?since=...: exclusões do usuário a partir do cursor
+        Index("ix_registros_excluidos_usuario_excluido_em_id", "usuario_id", "excluido_em", "id"),
+    )
+    
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    usuario_id = Column(String(36), nullable=False)
+    tabela = Column(String(50), nullable=False)  # objetivos, habitos, tarefas, habito_realizacoes
+    registro_id = Column(String(36), nullable=False)
+    excluido_em = Column(DateTime, default=func.now(), nullable=False)
@@ -1,28 +1,51 @@
 """
 Modelos SQLAlchemy - Tarefas
 """
-from sqlalchemy import Column, String, Text, Numeric, DateTime, Date, Integer, JSON
+from sqlalchemy import Column, String, Text, Numeric, DateTime, Date, Integer, JSON, Index
 from sqlalchemy.sql import func
 from app.core.database import Base
+from app.utils.rank import TAMANHO_COLUNA_RANK
 import uuid
 
 class Tarefa(Base):
     __tablename__ = "tarefas"
+    __table_args__ = (
+        # Índices compostos para paginação keyset: (usuario_id, coluna de ordenação, id)
+        Index("ix_tarefas_usuario_created_at_id", "usuario_id", "created_at", "id"),
+        Index("ix_tarefas_usuario_updated_at_id", "usuario_id", "updated_at", "id"),
+        Index("ix_tarefas_usuario_titulo_id", "usuario_id", "titulo", "id"),
+        Index("ix_tarefas_usuario_prioridade_id", "usuario_id", "prioridade", "id"),
+        Index("ix_tarefas_usuario_progresso_id", "usuario_id", "progresso", "id"),
+        Index("ix_tarefas_usuario_prazo_id", "usuario_id", "prazo", "id"),
+        Index("ix_tarefas_usuario_posicao_id", "usuario_id", "posicao", "id"),
+        # Feed de atividades (tarefas concluídas pela data de conclusão)
+        Index("ix_tarefas_usuario_status_concluida_em_id", "usuario_id", "status", "concluida_em", "id"),
+        # Listagem de tarefas de um hábito
+        Index("ix_tarefas_usuario_habito_created_at_id", "usuario_id", "habito_id", "created_at", "id"),
+        # Listagem filtrada por status
+        Index("ix_tarefas_usuario_status_created_at_id", "usuario_id", "status", "created_at", "id"),
+        # Estatísticas por hábito (JOIN habitos) e remoção em cascata
+        Index("ix_tarefas_habito_usuario", "habito_id", "usuario_id"),
+        # Quadro kanban de um hábito: colunas (status) ordenadas por rank_kanban
+        Index("ix_tarefas_habito_status_rank_kanban", "habito_id", "status", "rank_kanban", "id"),
+    )
     
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    usuario_id = Column(String(36), nullable=False, index=True)
+    usuario_id = Column(String(36), nullable=False)
     # objetivo_id removido - tarefas agora são ligadas apenas a hábitos
-    habito_id = Column(String(36), nullable=False, index=True)
+    habito_id = Column(String(36), nullable=False)
     titulo = Column(String(255), nullable=False)
     descricao = Column(Text, nullable=True)
-    prioridade = Column(String(10), nullable=True, index=True)  # baixa, media, alta
-    status = Column(String(20), nullable=False, default='backlog', index=True)  # backlog, a_fazer, fazendo, bloqueada, concluida
+    prioridade = Column(String(10), nullable=True)  # baixa, media, alta
+    status = Column(String(20), nullable=False, default='backlog')  # backlog, a_fazer, fazendo, bloqueada, concluida
     estimativa_horas = Column(Numeric(6, 2), nullable=True)
     horas_gastas = Column(Numeric(6, 2), default=0.00, nullable=False)
-    prazo = Column(Date, nullable=True, index=True)
-    progresso = Column(Numeric(5, 2), default=0.00, nullable=False, index=True)
-    posicao = Column(Integer, nullable=True, index=True)  # Posição para ordenação personalizada
+    prazo = Column(Date, nullable=True)
+    progresso = Column(Numeric(5, 2), default=0.00, nullable=False)
+    posicao = Column(Integer, nullable=True)  # Posição para ordenação personalizada
+    rank_kanban = Column(String(TAMANHO_COLUNA_RANK), nullable=True)  # Chave fracionária da ordem no kanban (app/utils/rank.py)
     tags = Column(JSON, nullable=True)  # Array de tags para categorização
     anexos = Column(JSON, nullable=True)  # Array de URLs de anexos
-    created_at = Column(DateTime, default=func.now(), nullable=False, index=True)
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
\ No newline at end of file
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+    concluida_em = Column(DateTime, nullable=True)  # Quando passou a concluida (NULL fora de concluida)
\ No newline at end of file
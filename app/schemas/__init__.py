@@ -2,10 +2,10 @@
 Inicialização dos schemas
 """
 from .base import PaginationParams, PaginationResponse, BaseResponse, DataResponse
-from .auth import UserLogin, UserRegister, TokenResponse, UserResponse, UserUpdate, DashboardResponse
+from .auth import UserLogin, UserRegister, TokenResponse, UserResponse, UserUpdate, DashboardResponse, TipoAtividade, AtividadeResponse
 from .objetivo import ObjetivoCreate, ObjetivoUpdate, ObjetivoResponse, ObjetivoComEstatisticas, ObjetivoFilters, StatusObjetivo
-from .habito import HabitoCreate, HabitoUpdate, HabitoResponse, MarcarHabitoFeito, HabitoFilters, StatusHabito, FrequenciaHabito
-from .tarefa import TarefaCreate, TarefaUpdate, TarefaResponse, TarefaCompleta, TarefaFilters, TarefaDeleteBatch, StatusTarefa, PrioridadeTarefa
+from .habito import HabitoCreate, HabitoUpdate, HabitoResponse, MarcarHabitoFeito, MarcarHabitoFeitoItem, MarcarHabitosFeitosLote, HabitoFilters, StatusHabito, FrequenciaHabito
+from .tarefa import TarefaCreate, TarefaUpdate, TarefaResponse, TarefaCompleta, TarefaFilters, TarefaDeleteBatch, TarefaBulkCreate, TarefaBulkUpdate, TarefaBulkUpdateItem, TarefaMove, StatusTarefa, PrioridadeTarefa
 
 __all__ = [
     # Base
@@ -20,6 +20,8 @@ __all__ = [
     "UserResponse",
     "UserUpdate",
     "DashboardResponse",
+    "TipoAtividade",
+    "AtividadeResponse",
     # Objetivo
     "ObjetivoCreate",
     "ObjetivoUpdate",
@@ -32,6 +34,8 @@ __all__ = [
     "HabitoUpdate",
     "HabitoResponse",
     "MarcarHabitoFeito",
+    "MarcarHabitoFeitoItem",
+    "MarcarHabitosFeitosLote",
     "HabitoFilters",
     "StatusHabito",
     "FrequenciaHabito",
@@ -42,6 +46,10 @@ __all__ = [
     "TarefaCompleta",
     "TarefaFilters",
     "TarefaDeleteBatch",
+    "TarefaBulkCreate",
+    "TarefaBulkUpdate",
+    "TarefaBulkUpdateItem",
+    "TarefaMove",
     "StatusTarefa",
     "PrioridadeTarefa"
 ]
\ No newline at end of file
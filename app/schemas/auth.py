@@ -4,6 +4,7 @@ Schemas Pydantic - Usuários e Autenticação
 from pydantic import BaseModel, ConfigDict, Field, EmailStr
 from typing import Optional, Dict, Any
 from datetime import datetime
+from enum import Enum
 
 # Schemas para autenticação
 class UserLogin(BaseModel):
@@ -50,4 +51,24 @@ class DashboardResponse(BaseModel):
     total_tarefas: int = 0
     tarefas_concluidas: int = 0
     progresso_medio_objetivos: float = 0.0
-    tarefas_atrasadas: int = 0
\ No newline at end of file
+    tarefas_atrasadas: int = 0
+
+# Schemas do feed de atividades recentes
+class TipoAtividade(str, Enum):
+    HABITO_REALIZADO = "habito_realizado"
+    TAREFA_CONCLUIDA = "tarefa_concluida"
+    OBJETIVO_STATUS = "objetivo_status"
+
+class EntidadeAtividade(BaseModel):
+    id: str
+    titulo: str
+    tipo: str
+
+class AtividadeResponse(BaseModel):
+    id: str
+    tipo: TipoAtividade
+    data: datetime
+    descricao: str
+    entidade: EntidadeAtividade
+    status_anterior: Optional[str] = None  # Apenas objetivo_status
+    status_novo: Optional[str] = None
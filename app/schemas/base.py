@@ -14,10 +14,12 @@ class PaginationParams(BaseModel):
 class PaginationResponse(BaseModel):
     page: int
     limit: int
-    total: int
-    total_pages: int
+    total: Optional[int] = None  # None quando with_total=false
+    total_pages: Optional[int] = None
+    total_estimated: bool = False  # True quando o total vem do cache (with_total=estimate)
     has_next: bool
     has_prev: bool
+    next_cursor: Optional[str] = None  # Cursor opaco para a próxima página (keyset)
 
 # Esquema base para resposta da API
 class BaseResponse(BaseModel):
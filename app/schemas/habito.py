@@ -2,7 +2,7 @@
 Schemas Pydantic - Hábitos
 """
 from pydantic import BaseModel, ConfigDict, Field
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime, date
 from decimal import Decimal
 from enum import Enum
@@ -91,6 +91,17 @@ class MarcarHabitoFeito(BaseModel):
     quantidade: int = Field(1, ge=1, description="Quantidade de realizações")
     observacoes: Optional[str] = Field(None, description="Observações sobre a realização")
 
+# Check-ins em lote (ex.: realizações registradas offline e reenviadas)
+MAX_REALIZACOES_LOTE = 500
+
+class MarcarHabitoFeitoItem(MarcarHabitoFeito):
+    habito_id: str = Field(..., description="ID do hábito")
+
+class MarcarHabitosFeitosLote(BaseModel):
+    realizacoes: List[MarcarHabitoFeitoItem] = Field(
+        ..., min_length=1, max_length=MAX_REALIZACOES_LOTE, description="Realizações a registrar"
+    )
+
 # Schema para filtros
 class HabitoFilters(BaseModel):
     objetivo_id: Optional[str] = Field(None, description="Filtro por objetivo")
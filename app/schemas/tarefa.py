@@ -82,10 +82,12 @@ class TarefaResponse(BaseModel):
     prazo: Optional[date]
     progresso: Decimal
     posicao: Optional[int]
+    rank_kanban: Optional[str] = None
     tags: Optional[List[str]]
     anexos: Optional[List[str]]
     created_at: datetime
     updated_at: datetime
+    concluida_em: Optional[datetime] = None
 
 # Schema para listagem com informações relacionadas (usando view)
 class TarefaCompleta(TarefaResponse):
@@ -106,4 +108,30 @@ class TarefaFilters(BaseModel):
 
 # Schema para exclusão em lote
 class TarefaDeleteBatch(BaseModel):
-    ids: List[str] = Field(..., min_length=1, description="Lista de IDs para exclusão")
\ No newline at end of file
+    ids: List[str] = Field(..., min_length=1, description="Lista de IDs para exclusão")
+
+# Schema para mover um cartão no kanban (POST /tarefas/{id}/move)
+class TarefaMove(BaseModel):
+    model_config = ConfigDict(
+        populate_by_name=True,
+        alias_generator=to_camel,
+        extra='ignore'
+    )
+    
+    status_kanban: Optional[str] = Field(
+        None, pattern=r"^(backlog|fazendo|feito)$", description="Coluna de destino (padrão: a coluna atual)"
+    )
+    anterior_id: Optional[str] = Field(None, description="Tarefa que fica imediatamente antes (acima) do cartão")
+    proximo_id: Optional[str] = Field(None, description="Tarefa que fica imediatamente depois (abaixo) do cartão")
+
+# Schemas para criação/atualização em lote (POST e PATCH /tarefas/bulk)
+MAX_ITENS_LOTE = 500
+
+class TarefaBulkCreate(BaseModel):
+    tarefas: List[TarefaCreate] = Field(..., min_length=1, max_length=MAX_ITENS_LOTE, description="Tarefas a criar")
+
+class TarefaBulkUpdateItem(TarefaUpdate):
+    id: str = Field(..., description="ID da tarefa")
+
+class TarefaBulkUpdate(BaseModel):
+    tarefas: List[TarefaBulkUpdateItem] = Field(..., min_length=1, max_length=MAX_ITENS_LOTE, description="Alterações por tarefa")
@@ -0,0 +1,166 @@
+"""
+Serviço do feed de atividades recentes do dashboard
+
+O feed junta três fontes em uma única consulta (UNION ALL):
+  - realizações de hábitos (habito_realizacoes JOIN habitos)
+  - tarefas concluídas (tarefas com status concluida, pela data de conclusão)
+  - mudanças de status de objetivos (audit_log JOIN objetivos)
+
+Cada ramo já aplica o cursor (data, id) e o limite da página, apoiado nos
+índices compostos (usuario_id, ..., data, id); a consulta externa apenas
+intercala os ramos por data. O número de consultas é sempre um,
+independente do limit.
+"""
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import String, literal, null, select, true, type_coerce, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import AuditLog, Habito, HabitoRealizacao, Objetivo, Tarefa
+from app.schemas.auth import AtividadeResponse, EntidadeAtividade, TipoAtividade
+from app.schemas.base import PaginationResponse
+from app.utils.pagination import condicao_keyset, decode_cursor, encode_cursor
+
+ORDEM = "desc"
+
+# Coluna de referência do cursor do feed (todas as datas do feed são DATETIME)
+COLUNA_CURSOR = HabitoRealizacao.created_at
+
+def _texto(valor: Optional[str] = None):
+    """Coluna constante (ou NULL) tipada como texto para o UNION ALL"""
+    if valor is None:
+        return type_coerce(null(), String)
+    return literal(valor, String)
+
+def _ramo(colunas, coluna_data, coluna_id, condicoes, posicao, limit: int):
+    """SELECT de uma fonte do feed já filtrado pelo cursor e limitado"""
+    apos = condicao_keyset(coluna_data, coluna_id, ORDEM, *posicao) if posicao else true()
+    return select(
+        select(*colunas)
+        .where(*condicoes, apos)
+        .order_by(coluna_data.desc(), coluna_id.desc())
+        .limit(limit)
+        .subquery()
+    )
+
+def consulta_atividades(usuario_id: str, limit: int, posicao: Optional[Tuple[datetime, str]] = None):
+    """SELECT único do feed: as `limit` atividades mais recentes após `posicao`"""
+    realizacoes = _ramo(
+        (
+            _texto(TipoAtividade.HABITO_REALIZADO.value).label("tipo"),
+            HabitoRealizacao.created_at.label("data"),
+            HabitoRealizacao.id.label("id"),
+            Habito.id.label("entidade_id"),
+            Habito.titulo.label("titulo"),
+            _texto().label("status_anterior"),
+            _texto().label("status_novo"),
+        ),
+        HabitoRealizacao.created_at, HabitoRealizacao.id,
+        (
+            HabitoRealizacao.usuario_id == usuario_id,
+            HabitoRealizacao.habito_id == Habito.id,
+        ),
+        posicao, limit
+    )
+
+    tarefas = _ramo(
+        (
+            _texto(TipoAtividade.TAREFA_CONCLUIDA.value).label("tipo"),
+            Tarefa.concluida_em.label("data"),
+            Tarefa.id.label("id"),
+            Tarefa.id.label("entidade_id"),
+            Tarefa.titulo.label("titulo"),
+            _texto().label("status_anterior"),
+            _texto().label("status_novo"),
+        ),
+        Tarefa.concluida_em, Tarefa.id,
+        (
+            Tarefa.usuario_id == usuario_id,
+            Tarefa.status == "concluida",
+            Tarefa.concluida_em.isnot(None),
+        ),
+        posicao, limit
+    )
+
+    status_novo = AuditLog.dados_novos["status"].as_string()
+    objetivos = _ramo(
+        (
+            _texto(TipoAtividade.OBJETIVO_STATUS.value).label("tipo"),
+            AuditLog.created_at.label("data"),
+            AuditLog.id.label("id"),
+            Objetivo.id.label("entidade_id"),
+            Objetivo.titulo.label("titulo"),
+            AuditLog.dados_antigos["status"].as_string().label("status_anterior"),
+            status_novo.label("status_novo"),
+        ),
+        AuditLog.created_at, AuditLog.id,
+        (
+            AuditLog.usuario_id == usuario_id,
+            AuditLog.tabela == "objetivos",
+            AuditLog.acao == "UPDATE",
+            AuditLog.registro_id == Objetivo.id,
+            status_novo.isnot(None),
+        ),
+        posicao, limit
+    )
+
+    feed = union_all(realizacoes, tarefas, objetivos).subquery("atividades")
+    return (
+        select(feed)
+        .order_by(feed.c.data.desc(), feed.c.id.desc())
+        .limit(limit)
+    )
+
+def _descricao(linha) -> str:
+    if linha.tipo == TipoAtividade.HABITO_REALIZADO:
+        return f"Completou hábito: {linha.titulo}"
+    if linha.tipo == TipoAtividade.TAREFA_CONCLUIDA:
+        return f"Concluiu tarefa: {linha.titulo}"
+    return f"Objetivo {linha.titulo}: {linha.status_anterior} → {linha.status_novo}"
+
+_TIPO_ENTIDADE = {
+    TipoAtividade.HABITO_REALIZADO: "habito",
+    TipoAtividade.TAREFA_CONCLUIDA: "tarefa",
+    TipoAtividade.OBJETIVO_STATUS: "objetivo",
+}
+
+def _atividade(linha) -> AtividadeResponse:
+    tipo = TipoAtividade(linha.tipo)
+    return AtividadeResponse(
+        id=linha.id,
+        tipo=tipo,
+        data=linha.data,
+        descricao=_descricao(linha),
+        entidade=EntidadeAtividade(id=linha.entidade_id, titulo=linha.titulo, tipo=_TIPO_ENTIDADE[tipo]),
+        status_anterior=linha.status_anterior,
+        status_novo=linha.status_novo,
+    )
+
+async def listar_atividades(
+    db: AsyncSession,
+    usuario_id: str,
+    limit: int,
+    cursor: Optional[str] = None
+) -> Tuple[List[AtividadeResponse], PaginationResponse]:
+    """Página do feed de atividades (mais recentes primeiro) com cursor (data, id)"""
+    posicao = decode_cursor(cursor, COLUNA_CURSOR, ORDEM) if cursor else None
+
+    # limit + 1 indica se existe próxima página sem COUNT
+    linhas = (await db.execute(consulta_atividades(usuario_id, limit + 1, posicao))).all()
+    has_next = len(linhas) > limit
+    linhas = linhas[:limit]
+
+    next_cursor = None
+    if has_next:
+        ultima = linhas[-1]
+        next_cursor = encode_cursor(COLUNA_CURSOR, ORDEM, ultima.data, ultima.id)
+
+    pagination = PaginationResponse(
+        page=1,
+        limit=limit,
+        has_next=has_next,
+        has_prev=cursor is not None,
+        next_cursor=next_cursor
+    )
+    return [_atividade(linha) for linha in linhas], pagination
@@ -1,71 +1,130 @@
 """
 Serviço de autenticação - Middleware e dependências
 """
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
-from app.core.database import get_db
+from app.core import database
 from app.core.config import settings
+from app.core.logging_config import logging_settings
 from app.models import Usuario
-from typing import Dict, Optional
+from app.utils.cache import TTLCache
+from typing import Any, Dict, Optional, Tuple
 
 security = HTTPBearer(auto_error=False)
 
-async def get_current_user(
-    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: Session = Depends(get_db)
-) -> Dict[str, str]:
+# Cache dos usuários ativos (evita SELECT usuarios a cada requisição autenticada).
+# Toda rota que altera o usuário chama invalidar_usuario() após o commit, mas
+# cada worker tem o próprio cache: alterações feitas em outro processo
+# (desativação por SQL ou script, outro worker) valem em até USER_CACHE_TTL,
+# o atraso máximo de revogação.
+_usuarios_cache = TTLCache(
+    max_size=logging_settings.USER_CACHE_MAX_SIZE,
+    ttl=logging_settings.USER_CACHE_TTL.total_seconds(),
+    nome="usuarios"
+)
+
+USUARIO_DEMO = {
+    "id": "demo-user-123",
+    "email": "demo@goalmanager.com",
+    "nome": "Usuário Demo",
+    "ativo": True
+}
+
+def invalidar_usuario(user_id: str) -> None:
+    """Remove o usuário do cache de autenticação (chamar após alterá-lo/desativá-lo)"""
+    _usuarios_cache.delete(user_id)
+
+async def buscar_usuario_ativo(user_id: str) -> Optional[Dict[str, Any]]:
+    """Dados do usuário ativo (cache ou banco); None se não existir ou estiver inativo"""
+    usuario = _usuarios_cache.get(user_id)
+    if usuario is not None:
+        return usuario
+    
+    async with database.AsyncSessionLocal() as db:
+        user = (await db.execute(select(Usuario).where(Usuario.id == user_id))).scalar_one_or_none()
+    
+    if not user or not user.ativo:
+        return None
+    
+    usuario = {"id": user.id, "email": user.email, "nome": user.nome, "ativo": user.ativo}
+    _usuarios_cache.set(user_id, usuario)
+    return usuario
+
+async def autenticar_requisicao(request: Request) -> Tuple[Optional[Dict[str, Any]], Optional[HTTPException]]:
     """
-    Dependency que verifica o token JWT e retorna dados do usuário atual
+    Autentica a requisição uma única vez: o resultado (usuário, erro) fica em
+    request.state e é compartilhado pelo middleware de logging e pela
+    dependency get_current_user.
     """
-    from app.core.config import settings
+    if hasattr(request.state, "autenticacao"):
+        return request.state.autenticacao
     
+    resultado = await _autenticar(request.headers.get("authorization"))
+    request.state.autenticacao = resultado
+    return resultado
+
+async def _autenticar(authorization: Optional[str]) -> Tuple[Optional[Dict[str, Any]], Optional[HTTPException]]:
     # Se autenticação estiver desabilitada, retorna usuário mock
     if settings.disable_auth:
-        return {
-            "sub": "demo-user-123", 
-            "email": "demo@goalmanager.com", 
-            "nome": "Usuário Demo"
-        }
+        return USUARIO_DEMO, None
     
-    if not credentials:
-        raise HTTPException(
+    scheme, _, token = (authorization or "").partition(" ")
+    if not token or scheme.lower() != "bearer":
+        return None, HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token de acesso obrigatório"
         )
     
     try:
         # Verificar token
-        payload = verify_token(credentials.credentials, "access")
+        payload = verify_token(token, "access")
         user_id = payload.get("sub")
         
         if user_id is None:
-            raise HTTPException(
+            return None, HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token inválido"
             )
         
         # Verificar se usuário existe e está ativo
-        user = db.query(Usuario).filter(Usuario.id == user_id).first()
-        if not user or not user.ativo:
-            raise HTTPException(
+        usuario = await buscar_usuario_ativo(user_id)
+        if not usuario:
+            return None, HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Usuário não encontrado ou inativo"
             )
         
-        return {"sub": user_id, "email": user.email, "nome": user.nome}
+        return usuario, None
         
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(
+    except HTTPException as e:
+        return None, e
+    except Exception:
+        return None, HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Erro na autenticação"
         )
 
+async def get_current_user(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
+) -> Dict[str, str]:
+    """
+    Dependency que verifica o token JWT e retorna dados do usuário atual
+    (reaproveita a autenticação já feita pelo middleware na mesma requisição)
+    """
+    usuario, erro = await autenticar_requisicao(request)
+    if erro:
+        raise erro
+    
+    return {"sub": usuario["id"], "email": usuario["email"], "nome": usuario["nome"]}
+
 # Contexto de criptografia usando bcrypt diretamente
 try:
     import bcrypt
@@ -169,6 +228,24 @@ def authenticate_user(db: Session, email: str, password: str) -> Optional[Usuari
     
     return user
 
+async def authenticate_user_async(db: AsyncSession, email: str, password: str) -> Optional[Usuario]:
+    """
+    Versão assíncrona de authenticate_user usada pelas rotas.
+    A verificação bcrypt é CPU-bound e roda no threadpool para não travar o event loop.
+    """
+    result = await db.execute(select(Usuario).where(Usuario.email == email))
+    user = result.scalar_one_or_none()
+    if not user:
+        return None
+    if not await run_in_threadpool(verify_password, password, user.senha_hash):
+        return None
+    
+    # Atualizar último login
+    user.ultimo_login = datetime.utcnow()
+    await db.commit()
+    
+    return user
+
 async def get_current_active_user(
     current_user: dict = Depends(get_current_user)
 ) -> dict:
@@ -0,0 +1,243 @@
+"""
+Serviço de estatísticas do dashboard
+
+Cada tabela é agregada uma única vez com agregação condicional
+(COUNT(CASE WHEN ...)); as quatro agregações retornam exatamente uma linha
+cada e são combinadas em um único SELECT, ou seja, uma ida ao banco por
+carregamento do dashboard.
+
+O resultado fica em um cache por usuário (cache_dashboard), invalidado
+pelas rotas de escrita e pelos serviços de progresso logo após o commit
+(invalidar_dashboard). O armazenamento é plugável (BackendDashboard): o
+padrão é em memória, por processo.
+
+As realizações da última semana dependem do relógio (a janela anda sem
+nenhuma escrita), então não são servidas do snapshot: em um acerto de cache
+elas são recontadas, um COUNT pelo índice (usuario_id, created_at, id) de
+habito_realizacoes.
+"""
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import case, func, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models import Objetivo, Habito, Tarefa, HabitoRealizacao
+from app.services.kanban import COLUNAS_KANBAN
+from app.utils.cache import TTLCache
+
+# Contadores de tarefas do dashboard -> coluna do kanban (todos os status
+# da coluna entram no contador; os três somam totais.tarefas)
+COLUNAS_TAREFAS_DASHBOARD = {
+    "backlog": "backlog",
+    "fazendo": "fazendo",
+    "feitas": "feito",
+}
+
+def _contar_se(condicao):
+    return func.count(case((condicao, 1)))
+
+def _inicio_semana() -> datetime:
+    """Início da janela das realizações da semana (últimos 7 dias)"""
+    return datetime.utcnow() - timedelta(days=7)
+
+def consulta_realizacoes_semana(usuario_id: str, desde: datetime):
+    """COUNT das realizações do usuário desde `desde`"""
+    return select(func.count().label("semana")).select_from(HabitoRealizacao).where(
+        HabitoRealizacao.usuario_id == usuario_id,
+        HabitoRealizacao.created_at >= desde
+    )
+
+def consulta_estatisticas_dashboard(usuario_id: str, desde: datetime):
+    """SELECT único com as agregações de objetivos, hábitos, tarefas e realizações"""
+    objetivos = select(
+        func.count().label("total"),
+        _contar_se(Objetivo.status == "ativo").label("ativos"),
+        _contar_se(Objetivo.status == "concluido").label("concluidos"),
+        func.avg(case((Objetivo.status == "ativo", Objetivo.progresso))).label("progresso_medio"),
+    ).where(Objetivo.usuario_id == usuario_id).subquery("objetivos_agg")
+
+    habitos = select(
+        func.count().label("total"),
+        _contar_se(Habito.status == "ativo").label("ativos"),
+        func.avg(case((Habito.status == "ativo", Habito.progresso))).label("progresso_medio"),
+    ).where(Habito.usuario_id == usuario_id).subquery("habitos_agg")
+
+    tarefas = select(
+        func.count().label("total"),
+        *[
+            _contar_se(Tarefa.status.in_(COLUNAS_KANBAN[coluna_kanban])).label(coluna)
+            for coluna, coluna_kanban in COLUNAS_TAREFAS_DASHBOARD.items()
+        ],
+    ).where(Tarefa.usuario_id == usuario_id).subquery("tarefas_agg")
+
+    realizacoes = consulta_realizacoes_semana(usuario_id, desde).subquery("realizacoes_agg")
+
+    return (
+        select(
+            objetivos.c.total.label("objetivos_total"),
+            objetivos.c.ativos.label("objetivos_ativos"),
+            objetivos.c.concluidos.label("objetivos_concluidos"),
+            objetivos.c.progresso_medio.label("objetivos_progresso_medio"),
+            habitos.c.total.label("habitos_total"),
+            habitos.c.ativos.label("habitos_ativos"),
+            habitos.c.progresso_medio.label("habitos_progresso_medio"),
+            tarefas.c.total.label("tarefas_total"),
+            *[tarefas.c[coluna].label(f"tarefas_{coluna}") for coluna in COLUNAS_TAREFAS_DASHBOARD],
+            realizacoes.c.semana.label("realizacoes_semana"),
+        )
+        .select_from(objetivos)
+        .join(habitos, true())
+        .join(tarefas, true())
+        .join(realizacoes, true())
+    )
+
+async def calcular_estatisticas_dashboard(db: AsyncSession, usuario_id: str) -> Dict[str, Any]:
+    """Estatísticas do dashboard do usuário (uma consulta)"""
+    linha = (await db.execute(consulta_estatisticas_dashboard(usuario_id, _inicio_semana()))).one()
+
+    return {
+        "totais": {
+            "objetivos": linha.objetivos_total,
+            "habitos": linha.habitos_total,
+            "tarefas": linha.tarefas_total
+        },
+        "objetivos": {
+            "ativos": linha.objetivos_ativos,
+            "concluidos": linha.objetivos_concluidos,
+            "progresso_medio": float(linha.objetivos_progresso_medio or 0)
+        },
+        "habitos": {
+            "ativos": linha.habitos_ativos,
+            "progresso_medio": float(linha.habitos_progresso_medio or 0)
+        },
+        "tarefas": {
+            coluna: linha._mapping[f"tarefas_{coluna}"]
+            for coluna in COLUNAS_TAREFAS_DASHBOARD
+        },
+        "atividade": {
+            "realizacoes_ultima_semana": linha.realizacoes_semana
+        }
+    }
+
+async def _com_semana_atual(db: AsyncSession, usuario_id: str, dados: Dict[str, Any]) -> Dict[str, Any]:
+    """Snapshot com as realizações da semana recontadas no momento atual"""
+    semana = await db.scalar(consulta_realizacoes_semana(usuario_id, _inicio_semana()))
+    return {**dados, "atividade": {**dados["atividade"], "realizacoes_ultima_semana": semana}}
+
+class BackendDashboard(ABC):
+    """
+    Armazenamento dos snapshots do dashboard por usuário (ex.: memória, Redis).
+    Um backend que não implemente os três métodos falha ao ser instanciado.
+    """
+
+    @abstractmethod
+    def obter(self, usuario_id: str) -> Optional[Dict[str, Any]]:
+        """Snapshot do usuário, ou None se não houver"""
+
+    @abstractmethod
+    def gravar(self, usuario_id: str, snapshot: Dict[str, Any]) -> None:
+        """Armazena o snapshot do usuário"""
+
+    @abstractmethod
+    def remover(self, usuario_id: str) -> None:
+        """Descarta o snapshot do usuário (invalidação)"""
+
+class BackendDashboardMemoria(BackendDashboard):
+    """Snapshots em um TTLCache do processo (LRU limitado)"""
+
+    def __init__(self, max_size: int, ttl: float):
+        self._cache = TTLCache(max_size=max_size, ttl=ttl, nome="dashboard")
+
+    def obter(self, usuario_id: str) -> Optional[Dict[str, Any]]:
+        return self._cache.get(usuario_id)
+
+    def gravar(self, usuario_id: str, snapshot: Dict[str, Any]) -> None:
+        self._cache.set(usuario_id, snapshot)
+
+    def remover(self, usuario_id: str) -> None:
+        self._cache.delete(usuario_id)
+
+class CacheDashboard:
+    """
+    Cache das estatísticas do dashboard por usuário. Uma leitura em cache é
+    uma consulta de dicionário mais o COUNT das realizações da semana; em
+    falha as estatísticas são calculadas e gravadas, a não ser que o usuário
+    tenha sido invalidado durante o cálculo.
+    """
+
+    def __init__(self, backend: Optional[BackendDashboard]):
+        self.backend = backend
+        self._calculando: Dict[str, object] = {}
+
+        # Métricas
+        self.acertos = 0
+        self.falhas = 0
+        self.invalidacoes = 0
+        self.descartados = 0
+        self._idade_total = 0.0
+        self.idade_max = 0.0
+
+    def configurar_backend(self, backend: Optional[BackendDashboard]) -> None:
+        """Troca o armazenamento (None desativa o cache)"""
+        self.backend = backend
+        self._calculando.clear()
+
+    async def obter(self, db: AsyncSession, usuario_id: str) -> Dict[str, Any]:
+        if self.backend is None:
+            return await calcular_estatisticas_dashboard(db, usuario_id)
+
+        snapshot = self.backend.obter(usuario_id)
+        if snapshot is not None:
+            idade = time.time() - snapshot["gerado_em"]
+            self.acertos += 1
+            self._idade_total += idade
+            self.idade_max = max(self.idade_max, idade)
+            return await _com_semana_atual(db, usuario_id, snapshot["dados"])
+
+        self.falhas += 1
+        marcador = self._calculando[usuario_id] = object()
+        dados = await calcular_estatisticas_dashboard(db, usuario_id)
+
+        # Escrita no meio do cálculo: o resultado pode estar desatualizado
+        if self._calculando.get(usuario_id) is marcador:
+            del self._calculando[usuario_id]
+            self.backend.gravar(usuario_id, {"dados": dados, "gerado_em": time.time()})
+        else:
+            self.descartados += 1
+        return dados
+
+    def invalidar(self, usuario_id: Optional[str]) -> None:
+        if not usuario_id or self.backend is None:
+            return
+        self._calculando.pop(usuario_id, None)
+        self.backend.remover(usuario_id)
+        self.invalidacoes += 1
+
+    def metricas(self) -> dict:
+        """Taxa de acerto e idade (staleness) dos snapshots servidos"""
+        consultas = self.acertos + self.falhas
+        return {
+            "ativo": self.backend is not None,
+            "backend": type(self.backend).__name__ if self.backend else None,
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            "taxa_acerto": round(self.acertos / consultas, 4) if consultas else 0.0,
+            "invalidacoes": self.invalidacoes,
+            "descartados": self.descartados,
+            "idade_media_s": round(self._idade_total / self.acertos, 3) if self.acertos else 0.0,
+            "idade_max_s": round(self.idade_max, 3),
+        }
+
+# Instância global (dashboard_cache_ttl <= 0 desativa o cache)
+cache_dashboard = CacheDashboard(
+    BackendDashboardMemoria(settings.dashboard_cache_size, settings.dashboard_cache_ttl)
+    if settings.dashboard_cache_ttl > 0 else None
+)
+
+def invalidar_dashboard(usuario_id: Optional[str]) -> None:
+    """Descarta o snapshot do dashboard do usuário (chamar após o commit das escritas)"""
+    cache_dashboard.invalidar(usuario_id)
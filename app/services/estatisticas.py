@@ -0,0 +1,311 @@
+"""
+Serviço de estatísticas por objetivo (tabela objetivo_stats)
+
+Cada objetivo possui uma linha com os contadores e as somas de progresso dos
+seus hábitos e tarefas. A linha é mantida incrementalmente: toda escrita em
+hábitos/tarefas aplica apenas a diferença (delta) que causou, de modo que a
+listagem de objetivos lê as estatísticas com um JOIN simples por chave
+primária, sem o GROUP BY sobre hábitos x tarefas.
+
+Assim como em progress.py, as funções recebem uma Session síncrona e não
+fazem commit: a escrita faz parte da transação de quem as chama (rotas via
+``await db.run_sync(funcao, *args)`` ou scripts).
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import select, update, delete, insert, func, case, and_
+from app.models import Objetivo, ObjetivoStats, Habito, Tarefa
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Iterable, List, Optional, Sequence
+
+CAMPOS_STATS = (
+    "total_habitos",
+    "habitos_ativos",
+    "soma_progresso_habitos",
+    "total_tarefas",
+    "tarefas_concluidas",
+    "soma_progresso_tarefas",
+)
+
+def _progresso(valor) -> Decimal:
+    """Progresso com 2 casas, arredondado como o MySQL grava em DECIMAL(5,2)"""
+    return Decimal(str(valor or 0)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+def progresso_tarefa(status: Optional[str], progresso) -> Decimal:
+    """Contribuição de uma tarefa para o progresso do objetivo (concluída conta como 100)"""
+    if status == 'concluida':
+        return Decimal('100.00')
+    return _progresso(progresso)
+
+def conclusao_alterada(status_anterior: Optional[str], status_novo: Optional[str]) -> Optional[bool]:
+    """
+    True se a tarefa passou a concluida, False se deixou de estar concluida e
+    None se não mudou (define se concluida_em recebe NOW(), NULL ou nada)
+    """
+    concluida_antes = status_anterior == 'concluida'
+    concluida_depois = status_novo == 'concluida'
+    if concluida_antes == concluida_depois:
+        return None
+    return concluida_depois
+
+def progresso_medio(soma, total) -> Decimal:
+    """Média a partir da soma e do total armazenados (0 quando não há itens)"""
+    if not total:
+        return Decimal('0.000000')
+    return (Decimal(soma) / total).quantize(Decimal('0.000001'))
+
+def objetivo_do_habito(db: Session, habito_id: Optional[str], usuario_id: Optional[str] = None) -> Optional[str]:
+    """Retorna o objetivo_id de um hábito do usuário (None se não existir)"""
+    if not habito_id:
+        return None
+    query = select(Habito.objetivo_id).where(Habito.id == habito_id)
+    if usuario_id:
+        query = query.where(Habito.usuario_id == usuario_id)
+    return db.execute(query).scalar_one_or_none()
+
+def criar_stats_objetivo(db: Session, objetivo: Objetivo) -> None:
+    """Cria a linha zerada de estatísticas de um objetivo recém-criado"""
+    db.flush()
+    db.add(ObjetivoStats(objetivo_id=objetivo.id, usuario_id=objetivo.usuario_id))
+
+def remover_stats_objetivos(db: Session, objetivo_ids: Iterable[str]) -> None:
+    """Remove as estatísticas de objetivos excluídos"""
+    objetivo_ids = list(objetivo_ids)
+    if objetivo_ids:
+        db.execute(
+            delete(ObjetivoStats)
+            .where(ObjetivoStats.objetivo_id.in_(objetivo_ids))
+            .execution_options(synchronize_session=False)
+        )
+
+def aplicar_delta_objetivo(db: Session, objetivo_id: Optional[str], usuario_id: Optional[str] = None, **deltas) -> None:
+    """
+    Soma os deltas informados (ex.: total_tarefas=1) à linha do objetivo.
+    Se a linha ainda não existe (objetivo anterior à tabela) ou pertence a
+    outro usuário, ela é reconstruída a partir das tabelas, já incluindo a
+    escrita atual.
+    """
+    if not objetivo_id:
+        return
+
+    valores = {
+        campo: getattr(ObjetivoStats, campo) + delta
+        for campo, delta in deltas.items()
+        if campo in CAMPOS_STATS and delta
+    }
+    if not valores:
+        return
+    valores["updated_at"] = func.now()
+
+    condicoes = [ObjetivoStats.objetivo_id == objetivo_id]
+    if usuario_id:
+        condicoes.append(ObjetivoStats.usuario_id == usuario_id)
+
+    result = db.execute(
+        update(ObjetivoStats)
+        .where(*condicoes)
+        .values(**valores)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        db.flush()
+        reconstruir_objetivo_stats(db, objetivo_id=objetivo_id)
+
+def registrar_habito(db: Session, habito: Habito, sinal: int = 1) -> None:
+    """Hábito criado (sinal=1) ou removido (sinal=-1)"""
+    aplicar_delta_objetivo(
+        db, habito.objetivo_id, habito.usuario_id,
+        total_habitos=sinal,
+        habitos_ativos=sinal if habito.status == 'ativo' else 0,
+        soma_progresso_habitos=sinal * _progresso(habito.progresso)
+    )
+
+def registrar_alteracao_habito(
+    db: Session,
+    habito: Habito,
+    status_anterior: Optional[str] = None,
+    progresso_anterior=None
+) -> None:
+    """Aplica a diferença de status e/ou progresso de um hábito alterado"""
+    deltas = {}
+    if status_anterior is not None:
+        deltas["habitos_ativos"] = (habito.status == 'ativo') - (status_anterior == 'ativo')
+    if progresso_anterior is not None:
+        deltas["soma_progresso_habitos"] = _progresso(habito.progresso) - _progresso(progresso_anterior)
+    aplicar_delta_objetivo(db, habito.objetivo_id, habito.usuario_id, **deltas)
+
+def registrar_remocao_habito(db: Session, habito: Habito) -> None:
+    """Hábito removido: desconta o hábito e as tarefas que eram contadas por ele"""
+    totais = db.execute(
+        select(
+            func.count(Tarefa.id),
+            func.coalesce(func.sum(case((Tarefa.status == 'concluida', 1), else_=0)), 0),
+            func.coalesce(func.sum(case((Tarefa.status == 'concluida', 100), else_=Tarefa.progresso)), 0)
+        ).where(
+            Tarefa.habito_id == habito.id,
+            Tarefa.usuario_id == habito.usuario_id
+        )
+    ).one()
+
+    aplicar_delta_objetivo(
+        db, habito.objetivo_id, habito.usuario_id,
+        total_habitos=-1,
+        habitos_ativos=-1 if habito.status == 'ativo' else 0,
+        soma_progresso_habitos=-_progresso(habito.progresso),
+        total_tarefas=-totais[0],
+        tarefas_concluidas=-int(totais[1]),
+        soma_progresso_tarefas=-Decimal(str(totais[2]))
+    )
+
+def registrar_tarefa(db: Session, objetivo_id: Optional[str], status: Optional[str], progresso, sinal: int = 1) -> None:
+    """Tarefa criada (sinal=1) ou removida (sinal=-1)"""
+    aplicar_delta_objetivo(
+        db, objetivo_id,
+        total_tarefas=sinal,
+        tarefas_concluidas=sinal if status == 'concluida' else 0,
+        soma_progresso_tarefas=sinal * progresso_tarefa(status, progresso)
+    )
+
+def registrar_alteracao_tarefa(
+    db: Session,
+    objetivo_id: Optional[str],
+    status_anterior: Optional[str],
+    progresso_anterior,
+    status_novo: Optional[str],
+    progresso_novo
+) -> None:
+    """Aplica a diferença entre o estado anterior e o novo de uma tarefa"""
+    aplicar_delta_objetivo(
+        db, objetivo_id,
+        tarefas_concluidas=(status_novo == 'concluida') - (status_anterior == 'concluida'),
+        soma_progresso_tarefas=(
+            progresso_tarefa(status_novo, progresso_novo)
+            - progresso_tarefa(status_anterior, progresso_anterior)
+        )
+    )
+
+def consulta_estatisticas(
+    usuario_id: Optional[str] = None,
+    objetivo_id: Optional[str] = None,
+    usuario_ids: Optional[Sequence[str]] = None
+):
+    """
+    SELECT com as estatísticas calculadas a partir das tabelas de origem.
+    Hábitos e tarefas são agregados em subconsultas separadas, sem o produto
+    hábitos x tarefas do JOIN direto.
+    """
+    filtros_habito = []
+    filtros_objetivo = []
+    if usuario_id:
+        filtros_habito.append(Habito.usuario_id == usuario_id)
+        filtros_objetivo.append(Objetivo.usuario_id == usuario_id)
+    if usuario_ids is not None:
+        filtros_habito.append(Habito.usuario_id.in_(usuario_ids))
+        filtros_objetivo.append(Objetivo.usuario_id.in_(usuario_ids))
+    if objetivo_id:
+        filtros_habito.append(Habito.objetivo_id == objetivo_id)
+        filtros_objetivo.append(Objetivo.id == objetivo_id)
+
+    habitos = (
+        select(
+            Habito.objetivo_id,
+            Habito.usuario_id,
+            func.count(Habito.id).label("total"),
+            func.sum(case((Habito.status == 'ativo', 1), else_=0)).label("ativos"),
+            func.sum(Habito.progresso).label("soma")
+        )
+        .where(*filtros_habito)
+        .group_by(Habito.objetivo_id, Habito.usuario_id)
+        .subquery()
+    )
+
+    tarefas = (
+        select(
+            Habito.objetivo_id,
+            Habito.usuario_id,
+            func.count(Tarefa.id).label("total"),
+            func.sum(case((Tarefa.status == 'concluida', 1), else_=0)).label("concluidas"),
+            func.sum(case((Tarefa.status == 'concluida', 100), else_=Tarefa.progresso)).label("soma")
+        )
+        .join(Tarefa, and_(Tarefa.habito_id == Habito.id, Tarefa.usuario_id == Habito.usuario_id))
+        .where(*filtros_habito)
+        .group_by(Habito.objetivo_id, Habito.usuario_id)
+        .subquery()
+    )
+
+    return (
+        select(
+            Objetivo.id.label("objetivo_id"),
+            Objetivo.usuario_id.label("usuario_id"),
+            func.coalesce(habitos.c.total, 0).label("total_habitos"),
+            func.coalesce(habitos.c.ativos, 0).label("habitos_ativos"),
+            func.coalesce(habitos.c.soma, 0).label("soma_progresso_habitos"),
+            func.coalesce(tarefas.c.total, 0).label("total_tarefas"),
+            func.coalesce(tarefas.c.concluidas, 0).label("tarefas_concluidas"),
+            func.coalesce(tarefas.c.soma, 0).label("soma_progresso_tarefas")
+        )
+        .outerjoin(habitos, and_(habitos.c.objetivo_id == Objetivo.id, habitos.c.usuario_id == Objetivo.usuario_id))
+        .outerjoin(tarefas, and_(tarefas.c.objetivo_id == Objetivo.id, tarefas.c.usuario_id == Objetivo.usuario_id))
+        .where(*filtros_objetivo)
+    )
+
+def reconstruir_objetivo_stats(
+    db: Session,
+    usuario_id: Optional[str] = None,
+    objetivo_id: Optional[str] = None,
+    usuario_ids: Optional[Sequence[str]] = None
+) -> int:
+    """
+    Recalcula do zero as estatísticas (de um objetivo, de um ou mais usuários
+    ou de todos) com um DELETE + INSERT ... SELECT. Retorna o número de linhas.
+    """
+    remover = delete(ObjetivoStats).execution_options(synchronize_session=False)
+    if usuario_id:
+        remover = remover.where(ObjetivoStats.usuario_id == usuario_id)
+    if usuario_ids is not None:
+        remover = remover.where(ObjetivoStats.usuario_id.in_(usuario_ids))
+    if objetivo_id:
+        remover = remover.where(ObjetivoStats.objetivo_id == objetivo_id)
+    db.execute(remover)
+
+    origem = consulta_estatisticas(usuario_id=usuario_id, objetivo_id=objetivo_id, usuario_ids=usuario_ids)
+    result = db.execute(
+        insert(ObjetivoStats).from_select(
+            ["objetivo_id", "usuario_id", *CAMPOS_STATS],
+            origem
+        )
+    )
+    return result.rowcount
+
+def verificar_objetivo_stats(db: Session, usuario_id: Optional[str] = None) -> List[dict]:
+    """
+    Compara a tabela objetivo_stats com as estatísticas calculadas a partir
+    das tabelas de origem. Retorna a lista de divergências (vazia se consistente).
+    """
+    esperado = {
+        row.objetivo_id: row
+        for row in db.execute(consulta_estatisticas(usuario_id=usuario_id))
+    }
+
+    query = select(ObjetivoStats)
+    if usuario_id:
+        query = query.where(ObjetivoStats.usuario_id == usuario_id)
+    armazenado = {s.objetivo_id: s for s in db.execute(query).scalars()}
+
+    divergencias = []
+    for objetivo_id, calc in esperado.items():
+        stats = armazenado.get(objetivo_id)
+        if stats is None:
+            divergencias.append({"objetivo_id": objetivo_id, "problema": "linha ausente"})
+            continue
+        campos = {
+            campo: {"armazenado": getattr(stats, campo), "esperado": getattr(calc, campo)}
+            for campo in CAMPOS_STATS
+            if Decimal(str(getattr(stats, campo))) != Decimal(str(getattr(calc, campo)))
+        }
+        if campos:
+            divergencias.append({"objetivo_id": objetivo_id, "problema": "valores divergentes", "campos": campos})
+
+    for objetivo_id in armazenado.keys() - esperado.keys():
+        divergencias.append({"objetivo_id": objetivo_id, "problema": "objetivo inexistente"})
+
+    return divergencias
@@ -0,0 +1,108 @@
+"""
+Serviço de exclusão em cascata de objetivos
+
+As tabelas não têm chaves estrangeiras, então os filhos são removidos
+explicitamente: tarefas e realizações dos hábitos do objetivo, os hábitos,
+as estatísticas (objetivo_stats) e por fim o objetivo. Cada etapa seleciona
+as chaves pelo conjunto (subconsulta dos hábitos do objetivo, sem carregar
+entidades no ORM) e as remove com um DELETE ... WHERE id IN; até
+settings.delete_chunk_size filhos por tabela o número de comandos é fixo.
+
+Acima disso os filhos são removidos em blocos desse tamanho, com commit
+entre os blocos, para que a exclusão de um objetivo muito grande não
+mantenha bloqueios de linha por muito tempo.
+Os filhos saem antes do objetivo: se a exclusão for interrompida, o objetivo
+continua visível e basta repeti-la. Como os blocos já confirmados não voltam
+com o rollback, a falha reconstrói as estatísticas e o progresso dos
+objetivos a partir dos filhos que restaram.
+"""
+import logging
+from typing import List
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Objetivo, Habito, HabitoRealizacao, Tarefa
+from app.services.dashboard import invalidar_dashboard
+from app.services.estatisticas import reconstruir_objetivo_stats, remover_stats_objetivos
+from app.services.progress import aplicar_progresso_objetivo
+from app.services.sincronizacao import registrar_exclusoes
+from app.utils.pagination import invalidar_totais
+
+logger = logging.getLogger(__name__)
+
+def _remover_em_blocos(db: Session, usuario_id: str, modelo: type, condicoes: list, tamanho: int) -> int:
+    """
+    Remove as linhas de `modelo` que atendem às condições em blocos de até
+    `tamanho` chaves primárias (com os tombstones da sincronização), com
+    commit entre os blocos. Até `tamanho` linhas a remoção fica na
+    transação corrente.
+    """
+    removidas = 0
+    while True:
+        ids = db.execute(select(modelo.id).where(*condicoes).limit(tamanho)).scalars().all()
+        if ids:
+            registrar_exclusoes(db, usuario_id, modelo.__tablename__, ids)
+            db.execute(delete(modelo).where(modelo.id.in_(ids)).execution_options(synchronize_session=False))
+            removidas += len(ids)
+        if len(ids) < tamanho:
+            return removidas
+        db.commit()
+
+def remover_objetivos(db: Session, usuario_id: str, objetivo_ids: List[str]) -> int:
+    """
+    Remove os objetivos do usuário com hábitos, tarefas, realizações e
+    estatísticas. Faz o commit; retorna o número de objetivos removidos.
+    """
+    try:
+        tamanho = settings.delete_chunk_size
+        habitos = select(Habito.id).where(
+            Habito.objetivo_id.in_(objetivo_ids),
+            Habito.usuario_id == usuario_id
+        )
+        
+        _remover_em_blocos(db, usuario_id, Tarefa, [Tarefa.habito_id.in_(habitos), Tarefa.usuario_id == usuario_id], tamanho)
+        _remover_em_blocos(
+            db, usuario_id, HabitoRealizacao,
+            [HabitoRealizacao.habito_id.in_(habitos), HabitoRealizacao.usuario_id == usuario_id],
+            tamanho
+        )
+        _remover_em_blocos(db, usuario_id, Habito, [Habito.objetivo_id.in_(objetivo_ids), Habito.usuario_id == usuario_id], tamanho)
+        
+        # Tombstones apenas dos objetivos que são do usuário
+        removidos = db.execute(
+            select(Objetivo.id).where(Objetivo.id.in_(objetivo_ids), Objetivo.usuario_id == usuario_id)
+        ).scalars().all()
+        if removidos:
+            remover_stats_objetivos(db, removidos)
+            registrar_exclusoes(db, usuario_id, Objetivo.__tablename__, removidos)
+            db.execute(
+                delete(Objetivo)
+                .where(Objetivo.id.in_(removidos))
+                .execution_options(synchronize_session=False)
+            )
+        
+        db.commit()
+        return len(removidos)
+    
+    except Exception as e:
+        db.rollback()
+        _reconciliar_objetivos(db, usuario_id, objetivo_ids)
+        raise e
+
+def _reconciliar_objetivos(db: Session, usuario_id: str, objetivo_ids: List[str]) -> None:
+    """
+    Após uma exclusão interrompida, alinha objetivo_stats e o progresso dos
+    objetivos aos filhos que restaram (os blocos confirmados já saíram)
+    """
+    try:
+        for objetivo_id in objetivo_ids:
+            if reconstruir_objetivo_stats(db, usuario_id=usuario_id, objetivo_id=objetivo_id):
+                aplicar_progresso_objetivo(db, objetivo_id)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Erro ao reconstruir estatísticas após exclusão interrompida: {e}")
+    invalidar_totais(usuario_id)
+    invalidar_dashboard(usuario_id)
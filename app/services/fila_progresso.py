@@ -0,0 +1,182 @@
+"""
+Fila de recálculo de progresso em segundo plano (debounce)
+
+As rotas marcam os hábitos/objetivos afetados após o commit e uma task
+asyncio os recalcula depois de uma janela curta. IDs marcados várias vezes
+dentro da janela (ex.: vários cards arrastados no kanban) são recalculados
+uma única vez, em um único commit.
+
+Se o lote falhar (deadlock, conexão perdida), os IDs voltam para a fila e
+são tentados de novo na próxima janela, até `max_tentativas` vezes; depois
+disso são descartados com um log de erro (o reparo fica com
+recalcular_progressos.py).
+"""
+import asyncio
+import logging
+from typing import Dict, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core import database
+from app.services.progress import recalcular_lote
+from app.services.dashboard import invalidar_dashboard
+
+logger = logging.getLogger(__name__)
+
+class FilaRecalculoProgresso:
+    """
+    Agrupa IDs de hábitos/objetivos e os recalcula em lote após `janela`
+    segundos. Com janela <= 0 a fila fica inativa e as rotas recalculam
+    na própria transação.
+    """
+
+    def __init__(self, janela: float, max_tentativas: int = 3):
+        self.janela = janela
+        self.max_tentativas = max_tentativas
+        self._habitos: Set[str] = set()
+        self._objetivos: Set[str] = set()
+        self._usuarios: Set[str] = set()  # dashboards a invalidar após o recálculo
+        self._marcacoes_pendentes = 0
+        self._falhas: Dict[Tuple[str, str], int] = {}  # ("habito"|"objetivo", id) -> lotes com erro
+        self._evento: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+        # Métricas
+        self.marcacoes = 0
+        self.recalculos = 0
+        self.lotes = 0
+        self.erros = 0
+        self.descartados = 0
+
+    @property
+    def ativa(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def marcar_habito(self, habito_id: Optional[str], usuario_id: Optional[str] = None) -> None:
+        """Agenda o recálculo do hábito (e do objetivo pai)"""
+        self._marcar(self._habitos, habito_id, usuario_id)
+
+    def marcar_objetivo(self, objetivo_id: Optional[str], usuario_id: Optional[str] = None) -> None:
+        """Agenda o recálculo do objetivo"""
+        self._marcar(self._objetivos, objetivo_id, usuario_id)
+
+    def _marcar(self, pendentes: Set[str], item_id: Optional[str], usuario_id: Optional[str]) -> None:
+        if not item_id or not self.ativa:
+            return
+        pendentes.add(item_id)
+        if usuario_id:
+            self._usuarios.add(usuario_id)
+        self.marcacoes += 1
+        self._marcacoes_pendentes += 1
+        self._evento.set()
+
+    async def iniciar(self) -> None:
+        """Inicia a task de processamento (chamado no startup da aplicação)"""
+        if self.janela <= 0 or self.ativa:
+            return
+        self._evento = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._executar(), name="fila-recalculo-progresso")
+        logger.info(f"Fila de recálculo de progresso iniciada (janela {self.janela}s)")
+
+    async def parar(self) -> None:
+        """Encerra a task processando o que estiver pendente"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        await self.flush()
+        self._task = None
+
+    async def _executar(self) -> None:
+        while True:
+            await self._evento.wait()
+            self._evento.clear()
+            await asyncio.sleep(self.janela)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Erro no recálculo de progresso em segundo plano: {e}")
+
+    async def flush(self) -> int:
+        """Recalcula imediatamente tudo o que estiver pendente (útil em testes)"""
+        if self._lock is None:
+            return 0
+
+        async with self._lock:
+            habitos, self._habitos = self._habitos, set()
+            objetivos, self._objetivos = self._objetivos, set()
+            usuarios, self._usuarios = self._usuarios, set()
+            marcacoes, self._marcacoes_pendentes = self._marcacoes_pendentes, 0
+            if not habitos and not objetivos:
+                return 0
+
+            try:
+                async with database.AsyncSessionLocal() as db:
+                    await db.run_sync(recalcular_lote, habitos, objetivos)
+            except Exception:
+                self.erros += 1
+                self._devolver(habitos, objetivos, usuarios)
+                raise
+            finally:
+                # Progresso dos objetivos mudou: snapshots do dashboard ficam velhos
+                for usuario_id in usuarios:
+                    invalidar_dashboard(usuario_id)
+
+            if self._falhas:
+                for habito_id in habitos:
+                    self._falhas.pop(("habito", habito_id), None)
+                for objetivo_id in objetivos:
+                    self._falhas.pop(("objetivo", objetivo_id), None)
+            recalculados = len(habitos) + len(objetivos)
+            self.recalculos += recalculados
+            self.lotes += 1
+            logger.debug(f"Recálculo em lote: {marcacoes} marcações -> {recalculados} recálculos")
+            return recalculados
+
+    def _devolver(self, habitos: Set[str], objetivos: Set[str], usuarios: Set[str]) -> None:
+        """Recoloca na fila os IDs de um lote com erro (até max_tentativas por ID)"""
+        descartados = []
+        for tipo, ids, pendentes in (("habito", habitos, self._habitos), ("objetivo", objetivos, self._objetivos)):
+            for item_id in ids:
+                chave = (tipo, item_id)
+                falhas = self._falhas.get(chave, 0) + 1
+                if falhas >= self.max_tentativas:
+                    self._falhas.pop(chave, None)
+                    descartados.append(chave)
+                else:
+                    self._falhas[chave] = falhas
+                    pendentes.add(item_id)
+
+        if descartados:
+            self.descartados += len(descartados)
+            logger.error(
+                f"Recálculo de progresso descartado após {self.max_tentativas} tentativas: {descartados}"
+            )
+        if self._habitos or self._objetivos:
+            self._usuarios |= usuarios
+            self._evento.set()
+
+    def metricas(self) -> dict:
+        """Profundidade da fila e taxa de coalescência (marcações evitadas)"""
+        processadas = self.marcacoes - self._marcacoes_pendentes
+        return {
+            "ativa": self.ativa,
+            "janela_s": self.janela,
+            "profundidade": len(self._habitos) + len(self._objetivos),
+            "marcacoes": self.marcacoes,
+            "recalculos": self.recalculos,
+            "lotes": self.lotes,
+            "erros": self.erros,
+            "descartados": self.descartados,
+            "taxa_coalescencia": round(1 - self.recalculos / processadas, 4) if processadas else 0.0,
+        }
+
+# Instância global usada pelas rotas
+fila_progresso = FilaRecalculoProgresso(
+    janela=settings.progress_recalc_debounce,
+    max_tentativas=settings.progress_recalc_max_tentativas
+)
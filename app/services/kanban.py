@@ -0,0 +1,131 @@
+"""
+Serviço do quadro kanban: ordem dos cartões por rank_kanban
+
+Cada coluna do quadro é o conjunto de tarefas de um hábito cujos status são
+exibidos nela (COLUNAS_KANBAN: backlog reúne a_fazer e backlog, fazendo
+reúne bloqueada e fazendo), ordenado por rank_kanban (chave fracionária,
+ver app/utils/rank.py) e id. As funções abaixo recebem o status de uma
+tarefa e trabalham sempre com a coluna inteira em que ele é exibido.
+Mover um cartão grava apenas a chave nova da tarefa; quando as chaves de uma
+coluna ficam longas demais ela é redistribuída por rebalancear_coluna, em
+segundo plano (rebalancear_em_segundo_plano) depois da resposta.
+
+Como em estatisticas.py, as funções síncronas recebem uma Session e não
+fazem commit.
+"""
+import logging
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.orm import Session
+
+from app.core import database
+from app.models import Tarefa
+from app.utils.rank import rank_entre, ranks_distribuidos
+
+logger = logging.getLogger(__name__)
+
+# Colunas do quadro -> status das tarefas exibidas nelas (feito = concluida)
+COLUNAS_KANBAN = {
+    "backlog": ("a_fazer", "backlog"),
+    "fazendo": ("bloqueada", "fazendo"),
+    "feito": ("concluida",),
+}
+COLUNA_DO_STATUS = {status: coluna for coluna, todos in COLUNAS_KANBAN.items() for status in todos}
+
+# ORDER BY do quadro: as chaves são comparáveis dentro de cada coluna, e as
+# tarefas são agrupadas por coluna (coluna_kanban) preservando essa ordem
+ORDEM_KANBAN = (Tarefa.rank_kanban, Tarefa.id)
+
+def coluna_kanban(status) -> str:
+    """Coluna do quadro em que o status é exibido (desconhecidos: backlog)"""
+    return COLUNA_DO_STATUS.get(getattr(status, "value", status), "backlog")
+
+def _condicoes_coluna(habito_id: str, status, usuario_id: str) -> list:
+    return [
+        Tarefa.habito_id == habito_id,
+        Tarefa.status.in_(COLUNAS_KANBAN[coluna_kanban(status)]),
+        Tarefa.usuario_id == usuario_id
+    ]
+
+def rank_adjacente(
+    db: Session,
+    habito_id: str,
+    status: str,
+    usuario_id: str,
+    exceto: Optional[str] = None,
+    antes_de: Optional[str] = None,
+    depois_de: Optional[str] = None
+) -> Optional[str]:
+    """
+    Rank vizinho na coluna de `status`: o menor maior que `depois_de`, o maior
+    menor que `antes_de` ou, sem nenhum dos dois, o maior da coluna (None se
+    não houver)
+    """
+    condicoes = _condicoes_coluna(habito_id, status, usuario_id)
+    if exceto:
+        condicoes.append(Tarefa.id != exceto)
+    if depois_de is not None:
+        return db.execute(select(func.min(Tarefa.rank_kanban)).where(*condicoes, Tarefa.rank_kanban > depois_de)).scalar()
+    if antes_de is not None:
+        condicoes.append(Tarefa.rank_kanban < antes_de)
+    return db.execute(select(func.max(Tarefa.rank_kanban)).where(*condicoes)).scalar()
+
+def rank_no_fim(db: Session, habito_id: str, status: str, usuario_id: str, exceto: Optional[str] = None) -> str:
+    """Chave nova para um cartão que entra no fim da coluna de `status`"""
+    return rank_entre(rank_adjacente(db, habito_id, status, usuario_id, exceto), None)
+
+def ranks_no_fim(db: Session, usuario_id: str, tarefas: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], Optional[str]]:
+    """
+    {(habito_id, coluna_kanban): maior rank} das colunas em que os pares
+    (habito_id, status) informados são exibidos, em uma consulta
+    """
+    colunas = {(habito_id, coluna_kanban(status)) for habito_id, status in tarefas}
+    if not colunas:
+        return {}
+    habito_ids = {habito_id for habito_id, _ in colunas}
+    linhas = db.execute(
+        select(Tarefa.habito_id, Tarefa.status, func.max(Tarefa.rank_kanban))
+        .where(Tarefa.habito_id.in_(habito_ids), Tarefa.usuario_id == usuario_id)
+        .group_by(Tarefa.habito_id, Tarefa.status)
+    )
+    ultimos: Dict[Tuple[str, str], str] = {}
+    for habito_id, status, rank in linhas:
+        coluna = (habito_id, coluna_kanban(status))
+        if rank is not None and (coluna not in ultimos or rank > ultimos[coluna]):
+            ultimos[coluna] = rank
+    return {coluna: ultimos.get(coluna) for coluna in colunas}
+
+def rebalancear_coluna(db: Session, habito_id: str, status: str, usuario_id: str) -> int:
+    """
+    Redistribui as chaves da coluna de `status` (mantendo a ordem atual;
+    tarefas sem chave vão para o fim, pela data de criação) com um UPDATE
+    executemany. updated_at avança em todas (onupdate), para que GET /sync
+    envie as chaves novas. Retorna o número de tarefas da coluna.
+    """
+    ids = db.execute(
+        select(Tarefa.id)
+        .where(*_condicoes_coluna(habito_id, status, usuario_id))
+        .order_by(Tarefa.rank_kanban.is_(None), Tarefa.rank_kanban, Tarefa.created_at, Tarefa.id)
+    ).scalars().all()
+    if not ids:
+        return 0
+
+    tabela = Tarefa.__table__
+    db.connection().execute(
+        update(tabela)
+        .where(tabela.c.id == bindparam("b_id"))
+        .values(rank_kanban=bindparam("b_rank")),
+        [{"b_id": tarefa_id, "b_rank": rank} for tarefa_id, rank in zip(ids, ranks_distribuidos(len(ids)))]
+    )
+    return len(ids)
+
+async def rebalancear_em_segundo_plano(habito_id: str, status: str, usuario_id: str) -> None:
+    """Rebalanceia a coluna em uma sessão própria (BackgroundTasks, após a resposta)"""
+    try:
+        async with database.AsyncSessionLocal() as db:
+            total = await db.run_sync(rebalancear_coluna, habito_id, status, usuario_id)
+            await db.commit()
+        logger.debug(f"Coluna kanban rebalanceada: hábito {habito_id}, status {status}, {total} tarefas")
+    except Exception as e:
+        logger.error(f"Erro ao rebalancear coluna kanban (hábito {habito_id}, status {status}): {e}")
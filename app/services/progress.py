@@ -1,16 +1,118 @@
 """
 Serviço para recálculo de progresso
 Implementa as stored procedures em Python
+
+As funções recebem uma Session síncrona para poderem ser usadas tanto por
+scripts quanto pelas rotas assíncronas, que as executam via
+``await db.run_sync(funcao, *args)`` sem bloquear o event loop.
+
+Unidade de trabalho: as funções ``aplicar_*`` apenas alteram a sessão (sem
+commit) e podem ser combinadas; as funções públicas (recalcular_*, marcar_*,
+resetar_*) aplicam todas as etapas da cascata contador -> hábito -> objetivo
+e fazem um único commit, incluindo o que a rota já tiver adicionado à sessão.
 """
 from sqlalchemy.orm import Session
-from sqlalchemy import text
-from app.models import Objetivo, Habito, Tarefa
-from decimal import Decimal
-from typing import Optional
+from sqlalchemy import text, update, case, func, insert
+from app.models import Objetivo, ObjetivoStats, Habito, HabitoRealizacao, Tarefa
+from app.services.estatisticas import registrar_alteracao_habito, reconstruir_objetivo_stats, aplicar_delta_objetivo
+from app.services.dashboard import invalidar_dashboard
+from decimal import Decimal, ROUND_HALF_UP
+from datetime import date
+from typing import Optional, Sequence, List
+import uuid
+
+def calcular_progresso_habito(habito: Habito) -> Decimal:
+    """Progresso do hábito a partir das realizações no período (0 a 100)"""
+    if habito.alvo_por_periodo > 0:
+        novo_progresso = min(100.0, (habito.realizados_no_periodo / habito.alvo_por_periodo) * 100)
+    else:
+        novo_progresso = 0.0
+    return Decimal(str(novo_progresso)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+def aplicar_progresso_habito(db: Session, habito: Habito) -> Decimal:
+    """
+    Calcula o progresso do hábito a partir das realizações e aplica a
+    diferença nas estatísticas do objetivo (sem commit)
+    """
+    progresso_anterior = habito.progresso
+    habito.progresso = calcular_progresso_habito(habito)
+    registrar_alteracao_habito(db, habito, progresso_anterior=progresso_anterior)
+    return habito.progresso
+
+def aplicar_progresso_objetivo(db: Session, objetivo_id: str, completo: bool = False) -> bool:
+    """
+    Atualiza o progresso do objetivo (média dos progressos de hábitos e
+    tarefas) a partir das somas e contagens mantidas em objetivo_stats (sem commit).
+    
+    É um único UPDATE objetivos JOIN objetivo_stats, com custo constante
+    independente do número de hábitos/tarefas. Sem linha de estatísticas
+    (ou com completo=True) usa o recálculo completo.
+    """
+    if not completo:
+        total = ObjetivoStats.total_habitos + ObjetivoStats.total_tarefas
+        soma = ObjetivoStats.soma_progresso_habitos + ObjetivoStats.soma_progresso_tarefas
+        result = db.execute(
+            update(Objetivo)
+            .where(
+                Objetivo.id == objetivo_id,
+                ObjetivoStats.objetivo_id == Objetivo.id
+            )
+            .values(progresso=case((total > 0, soma / total), else_=0))
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount:
+            return True
+    
+    return aplicar_progresso_objetivo_completo(db, objetivo_id) is not None
+
+def aplicar_progresso_objetivo_completo(db: Session, objetivo_id: str) -> Optional[Decimal]:
+    """
+    Recalcula o progresso de um objetivo carregando todos os hábitos e tarefas
+    (sem commit). Caminho O(n) usado como fallback quando o objetivo não
+    possui estatísticas.
+    """
+    # Buscar objetivo
+    objetivo = db.query(Objetivo).filter(Objetivo.id == objetivo_id).first()
+    if not objetivo:
+        return None
+    
+    # Buscar progressos de hábitos
+    habitos = db.query(Habito).filter(Habito.objetivo_id == objetivo_id).all()
+    progresso_habitos = [h.progresso for h in habitos]
+    
+    # Buscar IDs dos hábitos para buscar tarefas
+    habito_ids = [h.id for h in habitos]
+    
+    # Buscar progressos de tarefas através dos hábitos
+    # (tarefas agora são ligadas apenas a hábitos, não diretamente a objetivos)
+    progresso_tarefas = []
+    if habito_ids:
+        tarefas = db.query(Tarefa).filter(
+            Tarefa.habito_id.in_(habito_ids)
+        ).all()
+        
+        for t in tarefas:
+            if t.status == 'concluida':
+                progresso_tarefas.append(Decimal('100.00'))
+            else:
+                progresso_tarefas.append(t.progresso)
+    
+    # Calcular média dos progressos
+    todos_progressos = progresso_habitos + progresso_tarefas
+    
+    if todos_progressos:
+        novo_progresso = sum(todos_progressos) / len(todos_progressos)
+    else:
+        novo_progresso = Decimal('0.00')
+    
+    # Atualizar progresso do objetivo
+    objetivo.progresso = novo_progresso
+    return objetivo.progresso
 
 def recalcular_progresso_habito(db: Session, habito_id: str) -> Optional[Decimal]:
     """
     Recalcula o progresso de um hábito baseado nas realizações
+    e o do objetivo pai (um único commit)
     """
     try:
         # Buscar dados do hábito
@@ -18,84 +120,81 @@ def recalcular_progresso_habito(db: Session, habito_id: str) -> Optional[Decimal
         if not habito:
             return None
         
-        # Calcular novo progresso
-        if habito.alvo_por_periodo > 0:
-            novo_progresso = min(100.0, (habito.realizados_no_periodo / habito.alvo_por_periodo) * 100)
-        else:
-            novo_progresso = 0.0
-        
-        # Atualizar progresso
-        habito.progresso = Decimal(str(novo_progresso))
-        db.commit()
+        aplicar_progresso_habito(db, habito)
         
         # Recalcular progresso do objetivo pai
         if habito.objetivo_id:
-            recalcular_progresso_objetivo(db, habito.objetivo_id)
+            aplicar_progresso_objetivo(db, habito.objetivo_id)
         
+        db.commit()
         return habito.progresso
-        
+    
     except Exception as e:
         db.rollback()
         raise e
 
-def recalcular_progresso_objetivo(db: Session, objetivo_id: str) -> Optional[Decimal]:
+def recalcular_progresso_objetivo(db: Session, objetivo_id: str, completo: bool = False) -> bool:
     """
-    Recalcula o progresso de um objetivo baseado em hábitos e tarefas
+    Recalcula o progresso de um objetivo (ver aplicar_progresso_objetivo)
     """
     try:
-        # Buscar objetivo
-        objetivo = db.query(Objetivo).filter(Objetivo.id == objetivo_id).first()
-        if not objetivo:
-            return None
-        
-        # Buscar progressos de hábitos
-        habitos = db.query(Habito).filter(Habito.objetivo_id == objetivo_id).all()
-        progresso_habitos = [h.progresso for h in habitos]
-        
-        # Buscar IDs dos hábitos para buscar tarefas
-        habito_ids = [h.id for h in habitos]
-        
-        # Buscar progressos de tarefas através dos hábitos
-        # (tarefas agora são ligadas apenas a hábitos, não diretamente a objetivos)
-        progresso_tarefas = []
-        if habito_ids:
-            tarefas = db.query(Tarefa).filter(
-                Tarefa.habito_id.in_(habito_ids)
-            ).all()
-            
-            for t in tarefas:
-                if t.status == 'concluida':
-                    progresso_tarefas.append(Decimal('100.00'))
-                else:
-                    progresso_tarefas.append(t.progresso)
-        
-        # Calcular média dos progressos
-        todos_progressos = progresso_habitos + progresso_tarefas
-        
-        if todos_progressos:
-            novo_progresso = sum(todos_progressos) / len(todos_progressos)
-        else:
-            novo_progresso = Decimal('0.00')
-        
-        # Atualizar progresso do objetivo
-        objetivo.progresso = novo_progresso
+        atualizado = aplicar_progresso_objetivo(db, objetivo_id, completo)
         db.commit()
+        return atualizado
+    
+    except Exception as e:
+        db.rollback()
+        raise e
+
+def recalcular_progresso_objetivo_completo(db: Session, objetivo_id: str) -> Optional[Decimal]:
+    """
+    Recalcula o progresso de um objetivo carregando todos os hábitos e tarefas
+    """
+    try:
+        progresso = aplicar_progresso_objetivo_completo(db, objetivo_id)
+        db.commit()
+        return progresso
+    
+    except Exception as e:
+        db.rollback()
+        raise e
+
+def recalcular_lote(db: Session, habito_ids, objetivo_ids) -> int:
+    """
+    Recalcula um lote de hábitos e objetivos em um único commit.
+    Os objetivos pais dos hábitos entram no lote (cada um recalculado uma vez).
+    Usado pela fila de recálculo em segundo plano.
+    """
+    try:
+        objetivos = set(objetivo_ids)
+        if habito_ids:
+            habitos = db.query(Habito).filter(Habito.id.in_(list(habito_ids))).all()
+            for habito in habitos:
+                aplicar_progresso_habito(db, habito)
+                if habito.objetivo_id:
+                    objetivos.add(habito.objetivo_id)
         
-        return objetivo.progresso
+        for objetivo_id in objetivos:
+            aplicar_progresso_objetivo(db, objetivo_id)
         
+        db.commit()
+        return len(objetivos)
+    
     except Exception as e:
         db.rollback()
         raise e
 
 def marcar_habito_feito(
-    db: Session, 
-    habito_id: str, 
-    usuario_id: str, 
-    data_realizacao: str = None, 
+    db: Session,
+    habito_id: str,
+    usuario_id: str,
+    data_realizacao: str = None,
     quantidade: int = 1
 ) -> bool:
     """
-    Marca um hábito como feito incrementando o contador
+    Marca um hábito como feito incrementando o contador.
+    Contador, progresso do hábito e do objetivo (e a realização adicionada
+    pela rota) são gravados em uma única transação.
     """
     try:
         # Buscar hábito
@@ -107,22 +206,88 @@ def marcar_habito_feito(
         if not habito:
             return False
         
-        # Incrementar contador
+        # Incrementar contador e recalcular progressos
         habito.realizados_no_periodo += quantidade
+        aplicar_progresso_habito(db, habito)
+        if habito.objetivo_id:
+            aplicar_progresso_objetivo(db, habito.objetivo_id)
+        
         db.commit()
+        invalidar_dashboard(usuario_id)
+        return True
+    
+    except Exception as e:
+        db.rollback()
+        raise e
+
+def marcar_habitos_feitos(db: Session, usuario_id: str, itens: List) -> List[dict]:
+    """
+    Registra um lote de realizações (MarcarHabitoFeitoItem) em um único commit.
+    
+    As realizações são gravadas com um INSERT de várias linhas; cada hábito
+    recebe a soma das quantidades do lote (um incremento e um recálculo por
+    hábito), cada objetivo recebe a soma das diferenças de progresso dos seus
+    hábitos e é recalculado uma vez. Retorna o resultado de cada item
+    (status 201 ou 404 para hábito inexistente).
+    """
+    try:
+        habitos = {
+            habito.id: habito
+            for habito in db.query(Habito).filter(
+                Habito.id.in_({item.habito_id for item in itens}),
+                Habito.usuario_id == usuario_id
+            )
+        }
         
-        # Recalcular progresso
-        recalcular_progresso_habito(db, habito_id)
+        resultados = []
+        linhas = []
+        quantidades = {}
+        for indice, item in enumerate(itens):
+            if item.habito_id not in habitos:
+                resultados.append({"indice": indice, "status": 404, "id": None, "habito_id": item.habito_id, "erro": "Hábito não encontrado"})
+                continue
+            
+            realizacao_id = str(uuid.uuid4())
+            linhas.append({
+                "id": realizacao_id,
+                "habito_id": item.habito_id,
+                "usuario_id": usuario_id,
+                "data_realizacao": item.data_realizacao or date.today(),
+                "quantidade": item.quantidade,
+                "observacoes": item.observacoes,
+            })
+            quantidades[item.habito_id] = quantidades.get(item.habito_id, 0) + item.quantidade
+            resultados.append({"indice": indice, "status": 201, "id": realizacao_id, "habito_id": item.habito_id, "erro": None})
         
-        return True
+        if linhas:
+            db.execute(insert(HabitoRealizacao), linhas)
+        
+        # Contadores e progresso por hábito; diferenças somadas por objetivo
+        deltas = {}
+        for habito_id, quantidade in quantidades.items():
+            habito = habitos[habito_id]
+            progresso_anterior = habito.progresso or Decimal('0')
+            habito.realizados_no_periodo += quantidade
+            habito.progresso = calcular_progresso_habito(habito)
+            if habito.objetivo_id:
+                deltas[habito.objetivo_id] = deltas.get(habito.objetivo_id, 0) + habito.progresso - progresso_anterior
         
+        db.flush()
+        for objetivo_id, delta in deltas.items():
+            aplicar_delta_objetivo(db, objetivo_id, usuario_id, soma_progresso_habitos=delta)
+            aplicar_progresso_objetivo(db, objetivo_id)
+        
+        db.commit()
+        invalidar_dashboard(usuario_id)
+        return resultados
+    
     except Exception as e:
         db.rollback()
         raise e
 
 def resetar_ciclo_habito(db: Session, habito_id: str, usuario_id: str) -> bool:
     """
-    Reseta o contador de realizações de um hábito
+    Reseta o contador de realizações de um hábito (um único commit)
     """
     try:
         # Buscar hábito
@@ -135,37 +300,87 @@ def resetar_ciclo_habito(db: Session, habito_id: str, usuario_id: str) -> bool:
             return False
         
         # Resetar contador
+        progresso_anterior = habito.progresso
         habito.realizados_no_periodo = 0
         habito.progresso = Decimal('0.00')
-        db.commit()
+        registrar_alteracao_habito(db, habito, progresso_anterior=progresso_anterior)
         
         # Recalcular progresso do objetivo pai
         if habito.objetivo_id:
-            recalcular_progresso_objetivo(db, habito.objetivo_id)
+            aplicar_progresso_objetivo(db, habito.objetivo_id)
         
+        db.commit()
+        invalidar_dashboard(usuario_id)
         return True
-        
+    
     except Exception as e:
         db.rollback()
         raise e
 
+def aplicar_progressos_em_lote(db: Session, usuario_ids: Optional[Sequence[str]] = None) -> dict:
+    """
+    Recalcula de forma set-based (sem commit) o progresso de todos os hábitos
+    e objetivos dos usuários informados (ou do banco inteiro com None):
+
+      1. UPDATE habitos: progresso a partir de realizados/alvo
+      2. objetivo_stats reconstruída (DELETE + INSERT ... SELECT)
+      3. UPDATE objetivos JOIN objetivo_stats: média de hábitos e tarefas
+
+    Só são alteradas as linhas cujo progresso mudou (updated_at preservado
+    nas demais). Retorna o número de hábitos/objetivos alterados.
+    """
+    filtros_habito = []
+    filtros_objetivo = []
+    if usuario_ids is not None:
+        filtros_habito.append(Habito.usuario_id.in_(usuario_ids))
+        filtros_objetivo.append(Objetivo.usuario_id.in_(usuario_ids))
+    
+    # 1. Hábitos
+    progresso_habito = func.round(
+        case(
+            (Habito.alvo_por_periodo > 0,
+             func.least(100, Habito.realizados_no_periodo * 100 / Habito.alvo_por_periodo)),
+            else_=0
+        ),
+        2
+    )
+    habitos = db.execute(
+        update(Habito)
+        .where(*filtros_habito, Habito.progresso != progresso_habito)
+        .values(progresso=progresso_habito)
+        .execution_options(synchronize_session=False)
+    )
+    
+    # 2. Estatísticas por objetivo (já com o novo progresso dos hábitos)
+    reconstruir_objetivo_stats(db, usuario_ids=usuario_ids)
+    
+    # 3. Objetivos
+    total = ObjetivoStats.total_habitos + ObjetivoStats.total_tarefas
+    soma = ObjetivoStats.soma_progresso_habitos + ObjetivoStats.soma_progresso_tarefas
+    progresso_objetivo = func.round(case((total > 0, soma / total), else_=0), 2)
+    objetivos = db.execute(
+        update(Objetivo)
+        .where(
+            *filtros_objetivo,
+            ObjetivoStats.objetivo_id == Objetivo.id,
+            Objetivo.progresso != progresso_objetivo
+        )
+        .values(progresso=progresso_objetivo)
+        .execution_options(synchronize_session=False)
+    )
+    
+    return {"habitos": habitos.rowcount, "objetivos": objetivos.rowcount}
+
 def recalcular_todos_progressos(db: Session, usuario_id: str) -> bool:
     """
-    Recalcula todos os progressos de um usuário
+    Recalcula todos os progressos de um usuário (set-based, um único commit)
     """
     try:
-        # Recalcular todos os hábitos
-        habitos = db.query(Habito).filter(Habito.usuario_id == usuario_id).all()
-        for habito in habitos:
-            recalcular_progresso_habito(db, habito.id)
-        
-        # Recalcular todos os objetivos
-        objetivos = db.query(Objetivo).filter(Objetivo.usuario_id == usuario_id).all()
-        for objetivo in objetivos:
-            recalcular_progresso_objetivo(db, objetivo.id)
-        
+        aplicar_progressos_em_lote(db, [usuario_id])
+        db.commit()
+        invalidar_dashboard(usuario_id)
         return True
-        
+    
     except Exception as e:
         db.rollback()
         raise e
\ No newline at end of file
@@ -0,0 +1,138 @@
+"""
+Serviço de sincronização incremental (GET /sync?since=<cursor>)
+
+Devolve, como um stream NDJSON, os objetivos, hábitos, tarefas e realizações
+criados ou alterados desde o cursor (updated_at; created_at nas realizações,
+que não são alteradas) e as exclusões registradas em registros_excluidos
+(tombstones). Cada entidade é lida em blocos de settings.sync_chunk_size
+linhas por paginação keyset nos índices (usuario_id, updated_at, id), então
+um cliente em dia lê apenas o que mudou. Toda escrita de tarefas avança
+updated_at, inclusive a da ordem do kanban (mover e rebalancear rank_kanban),
+então a ordem do quadro também é sincronizada.
+
+Linhas do stream:
+    {"tipo": "inicio", "completo": bool}
+    {"tipo": "objetivos", "op": "upsert", "dados": {...}}
+    {"tipo": "tarefas", "op": "delete", "id": "..."}
+    {"tipo": "fim", "cursor": "...", "total": n}
+
+Sem cursor, ou com um cursor mais antigo que a retenção dos tombstones
+(settings.sync_tombstone_retention_days), a resposta é a carga completa
+("completo": true): o cliente substitui os dados locais. O cursor seguinte é
+o instante do início da leitura menos settings.sync_cursor_margin segundos,
+para não perder escritas de transações em andamento; itens podem então ser
+reenviados e o cliente deve aplicá-los como upsert.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Iterable, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core import database
+from app.core.config import settings
+from app.models import Objetivo, Habito, HabitoRealizacao, Tarefa, RegistroExcluido
+from app.utils.pagination import condicao_keyset
+from app.utils.responses import linha_ndjson
+from app.utils.serialization import colunas_modelo, serializador
+
+# (tipo no stream, modelo, coluna de alteração) na ordem de envio: pais antes dos filhos
+ENTIDADES = (
+    ("objetivos", Objetivo, Objetivo.updated_at),
+    ("habitos", Habito, Habito.updated_at),
+    ("tarefas", Tarefa, Tarefa.updated_at),
+    ("habito_realizacoes", HabitoRealizacao, HabitoRealizacao.created_at),
+)
+
+def registrar_exclusoes(db: Session, usuario_id: str, tabela: str, registro_ids: Iterable[str]) -> None:
+    """Grava os tombstones dos registros excluídos (um INSERT de várias linhas, sem commit)"""
+    linhas = [
+        {"usuario_id": usuario_id, "tabela": tabela, "registro_id": registro_id}
+        for registro_id in registro_ids
+    ]
+    if linhas:
+        db.execute(insert(RegistroExcluido), linhas)
+
+def codificar_cursor(instante: datetime) -> str:
+    payload = json.dumps({"t": instante.isoformat()}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decodificar_cursor(cursor: str) -> datetime:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return datetime.fromisoformat(json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))["t"])
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de sincronização inválido"
+        )
+
+async def _blocos(db, query, coluna, coluna_id, posicoes: tuple):
+    """
+    Percorre a consulta em blocos ordenados por (coluna, id), por keyset.
+    `posicoes`: índices de coluna e id nas linhas selecionadas.
+    """
+    tamanho = settings.sync_chunk_size
+    ultimo = None
+    while True:
+        pagina = query.order_by(coluna, coluna_id).limit(tamanho)
+        if ultimo is not None:
+            pagina = pagina.where(condicao_keyset(coluna, coluna_id, "asc", *ultimo))
+        linhas = (await db.execute(pagina)).all()
+        if not linhas:
+            return
+        yield linhas
+        if len(linhas) < tamanho:
+            return
+        ultimo = tuple(linhas[-1][posicao] for posicao in posicoes)
+
+async def gerar_sincronizacao(usuario_id: str, desde: Optional[datetime]) -> AsyncIterator[bytes]:
+    """
+    Stream NDJSON das alterações do usuário desde `desde` (None = carga completa).
+    Usa uma sessão própria: a da requisição é fechada antes do corpo ser enviado.
+    """
+    async with database.AsyncSessionLocal() as db:
+        inicio = (await db.execute(select(func.now()))).scalar()
+        limite_tombstones = inicio - timedelta(days=settings.sync_tombstone_retention_days)
+        completo = desde is None or desde < limite_tombstones
+        total = 0
+
+        yield linha_ndjson({"tipo": "inicio", "completo": completo})
+
+        for tipo, modelo, coluna in ENTIDADES:
+            colunas = colunas_modelo(modelo)
+            chaves = [atributo.key for atributo in colunas]
+            montar = serializador(modelo, linhas=True)
+            query = select(*colunas).where(modelo.usuario_id == usuario_id)
+            if not completo:
+                query = query.where(coluna >= desde)
+
+            posicoes = (chaves.index(coluna.key), chaves.index("id"))
+            async for linhas in _blocos(db, query, coluna, modelo.id, posicoes):
+                total += len(linhas)
+                yield b"".join(
+                    linha_ndjson({"tipo": tipo, "op": "upsert", "dados": montar(linha)})
+                    for linha in linhas
+                )
+
+        if not completo:
+            query = select(
+                RegistroExcluido.tabela, RegistroExcluido.registro_id,
+                RegistroExcluido.excluido_em, RegistroExcluido.id
+            ).where(
+                RegistroExcluido.usuario_id == usuario_id,
+                RegistroExcluido.excluido_em >= desde
+            )
+            async for linhas in _blocos(db, query, RegistroExcluido.excluido_em, RegistroExcluido.id, (2, 3)):
+                total += len(linhas)
+                yield b"".join(
+                    linha_ndjson({"tipo": linha.tabela, "op": "delete", "id": linha.registro_id})
+                    for linha in linhas
+                )
+
+        cursor = codificar_cursor(inicio - timedelta(seconds=settings.sync_cursor_margin))
+        yield linha_ndjson({"tipo": "fim", "cursor": cursor, "total": total})
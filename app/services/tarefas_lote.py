@@ -0,0 +1,209 @@
+"""
+Serviço de escrita de tarefas em lote (POST e PATCH /tarefas/bulk)
+
+O lote inteiro é gravado com um INSERT de várias linhas (criação) ou com um
+UPDATE executemany por conjunto de campos alterados (atualização), e cada
+objetivo afetado recebe a soma dos deltas do lote em um único UPDATE de
+objetivo_stats. O recálculo de progresso fica com a rota, uma vez por
+objetivo.
+
+Itens que não podem ser gravados (hábito ou tarefa inexistente, tarefa
+repetida no lote) são reportados no resultado do item sem impedir os demais.
+
+Como em estatisticas.py, as funções recebem uma Session síncrona e não
+fazem commit.
+"""
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import bindparam, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models import Habito, Tarefa
+from app.services.estatisticas import aplicar_delta_objetivo, conclusao_alterada, progresso_tarefa
+from app.services.kanban import coluna_kanban, ranks_no_fim
+from app.utils.rank import rank_entre
+from app.utils.serialization import colunas_modelo, serializador
+
+Resultado = Dict[str, Any]
+
+# Campos do TarefaUpdate que existem na tabela (os demais são ignorados, como no PUT)
+_COLUNAS_TAREFA = frozenset(Tarefa.__table__.columns.keys())
+
+def _resultado(indice: int, status_item: int, tarefa_id: Optional[str] = None, erro: Optional[str] = None) -> Resultado:
+    return {"indice": indice, "status": status_item, "id": tarefa_id, "erro": erro, "tarefa": None}
+
+def _somar(deltas: Dict[str, Dict[str, Any]], objetivo_id: Optional[str], **valores) -> None:
+    """Acumula os deltas de estatísticas do objetivo"""
+    if not objetivo_id:
+        return
+    atual = deltas.setdefault(objetivo_id, {})
+    for campo, valor in valores.items():
+        atual[campo] = atual.get(campo, 0) + valor
+
+def _objetivos_dos_habitos(db: Session, habito_ids: Iterable[str], usuario_id: str) -> Dict[str, Optional[str]]:
+    """{habito_id: objetivo_id} dos hábitos do usuário (uma consulta)"""
+    habito_ids = set(habito_ids)
+    if not habito_ids:
+        return {}
+    linhas = db.execute(
+        select(Habito.id, Habito.objetivo_id).where(Habito.id.in_(habito_ids), Habito.usuario_id == usuario_id)
+    )
+    return {linha.id: linha.objetivo_id for linha in linhas}
+
+def _aplicar_deltas(db: Session, deltas: Dict[str, Dict[str, Any]], usuario_id: str) -> Set[str]:
+    """Um UPDATE de objetivo_stats por objetivo; retorna os objetivos alterados"""
+    alterados = set()
+    for objetivo_id, valores in deltas.items():
+        if any(valores.values()):
+            aplicar_delta_objetivo(db, objetivo_id, usuario_id, **valores)
+            alterados.add(objetivo_id)
+    return alterados
+
+def _registrar_conclusoes(db: Session, usuario_id: str, concluidas: List[str], reabertas: List[str] = ()) -> None:
+    """concluida_em = NOW() nas tarefas que passaram a concluida e NULL nas reabertas"""
+    for ids, valor in ((concluidas, func.now()), (reabertas, None)):
+        if ids:
+            db.execute(
+                update(Tarefa)
+                .where(Tarefa.id.in_(ids), Tarefa.usuario_id == usuario_id)
+                .values(concluida_em=valor)
+                .execution_options(synchronize_session=False)
+            )
+
+def _preencher_tarefas(db: Session, resultados: List[Resultado]) -> None:
+    """Lê as tarefas gravadas (uma consulta) e as coloca nos resultados"""
+    ids = {resultado["id"] for resultado in resultados if resultado["erro"] is None}
+    if not ids:
+        return
+    montar = serializador(Tarefa, linhas=True)
+    colunas = colunas_modelo(Tarefa)
+    tarefas = {linha.id: montar(linha) for linha in db.execute(select(*colunas).where(Tarefa.id.in_(ids)))}
+    for resultado in resultados:
+        if resultado["erro"] is None:
+            resultado["tarefa"] = tarefas.get(resultado["id"])
+
+def criar_tarefas_em_lote(db: Session, usuario_id: str, itens: List) -> Tuple[List[Resultado], Set[str]]:
+    """
+    Cria as tarefas (TarefaCreate) com um único INSERT de várias linhas.
+    Retorna (resultado por item, objetivos com estatísticas alteradas).
+    """
+    objetivos = _objetivos_dos_habitos(db, (item.habito_id for item in itens), usuario_id)
+    # Cartões novos entram no fim da coluna do kanban, na ordem do lote
+    ultimos = ranks_no_fim(db, usuario_id, (
+        (item.habito_id, item.status) for item in itens if item.habito_id in objetivos
+    ))
+
+    resultados = []
+    linhas = []
+    concluidas = []
+    deltas: Dict[str, Dict[str, Any]] = {}
+    for indice, item in enumerate(itens):
+        if item.habito_id not in objetivos:
+            resultados.append(_resultado(indice, 404, erro="Hábito não encontrado"))
+            continue
+
+        dados = item.model_dump()
+        tarefa_id = str(uuid.uuid4())
+        coluna = (item.habito_id, coluna_kanban(item.status))
+        ultimos[coluna] = rank_entre(ultimos[coluna], None)
+        linhas.append({"id": tarefa_id, "usuario_id": usuario_id, "rank_kanban": ultimos[coluna], **dados})
+        resultados.append(_resultado(indice, 201, tarefa_id))
+        if dados["status"] == "concluida":
+            concluidas.append(tarefa_id)
+        _somar(
+            deltas, objetivos[item.habito_id],
+            total_tarefas=1,
+            tarefas_concluidas=int(dados["status"] == "concluida"),
+            soma_progresso_tarefas=progresso_tarefa(dados["status"], None)
+        )
+
+    if linhas:
+        db.execute(insert(Tarefa), linhas)
+    _registrar_conclusoes(db, usuario_id, concluidas)
+
+    alterados = _aplicar_deltas(db, deltas, usuario_id)
+    _preencher_tarefas(db, resultados)
+    return resultados, alterados
+
+def atualizar_tarefas_em_lote(db: Session, usuario_id: str, itens: List) -> Tuple[List[Resultado], Set[str]]:
+    """
+    Aplica as alterações (TarefaBulkUpdateItem) com um UPDATE executemany por
+    conjunto de campos alterados (ex.: status + posicao ao reordenar o kanban).
+    Tarefas que mudam de coluna do quadro recebem uma chave no fim da nova.
+    Retorna (resultado por item, objetivos com estatísticas alteradas).
+    """
+    atuais = {
+        linha.id: linha
+        for linha in db.execute(
+            select(Tarefa.id, Tarefa.habito_id, Tarefa.status, Tarefa.progresso)
+            .where(Tarefa.id.in_({item.id for item in itens}), Tarefa.usuario_id == usuario_id)
+        )
+    }
+    objetivos = _objetivos_dos_habitos(db, (atual.habito_id for atual in atuais.values()), usuario_id)
+    # Tarefas que mudam de coluna do quadro entram no fim da coluna nova, na ordem do lote
+    ultimos = ranks_no_fim(db, usuario_id, (
+        (atuais[item.id].habito_id, item.status) for item in itens
+        if item.id in atuais and item.status is not None
+        and coluna_kanban(item.status) != coluna_kanban(atuais[item.id].status)
+    ))
+
+    resultados = []
+    concluidas = []
+    reabertas = []
+    grupos: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+    deltas: Dict[str, Dict[str, Any]] = {}
+    vistas = set()
+    for indice, item in enumerate(itens):
+        atual = atuais.get(item.id)
+        if atual is None:
+            resultados.append(_resultado(indice, 404, item.id, "Tarefa não encontrada"))
+            continue
+        if item.id in vistas:
+            resultados.append(_resultado(indice, 409, item.id, "Tarefa repetida no lote"))
+            continue
+        vistas.add(item.id)
+        resultados.append(_resultado(indice, 200, item.id))
+
+        dados = {
+            campo: valor for campo, valor in item.model_dump(exclude_unset=True, exclude={"id"}).items()
+            if campo in _COLUNAS_TAREFA
+        }
+        if not dados:
+            continue
+        if dados.get("status") is not None and coluna_kanban(dados["status"]) != coluna_kanban(atual.status):
+            coluna = (atual.habito_id, coluna_kanban(dados["status"]))
+            ultimos[coluna] = rank_entre(ultimos[coluna], None)
+            dados["rank_kanban"] = ultimos[coluna]
+        grupos.setdefault(tuple(sorted(dados)), []).append(
+            {"b_id": item.id, **{f"v_{campo}": valor for campo, valor in dados.items()}}
+        )
+
+        status_novo = dados.get("status", atual.status)
+        progresso_novo = dados.get("progresso", atual.progresso)
+        conclusao = conclusao_alterada(atual.status, status_novo)
+        if conclusao is not None:
+            (concluidas if conclusao else reabertas).append(item.id)
+        _somar(
+            deltas, objetivos.get(atual.habito_id),
+            tarefas_concluidas=(status_novo == "concluida") - (atual.status == "concluida"),
+            soma_progresso_tarefas=(
+                progresso_tarefa(status_novo, progresso_novo)
+                - progresso_tarefa(atual.status, atual.progresso)
+            )
+        )
+
+    tabela = Tarefa.__table__
+    conexao = db.connection()
+    for campos, parametros in grupos.items():
+        conexao.execute(
+            update(tabela)
+            .where(tabela.c.id == bindparam("b_id"), tabela.c.usuario_id == usuario_id)
+            .values({campo: bindparam(f"v_{campo}", type_=tabela.c[campo].type) for campo in campos}),
+            parametros
+        )
+    _registrar_conclusoes(db, usuario_id, concluidas, reabertas)
+
+    alterados = _aplicar_deltas(db, deltas, usuario_id)
+    _preencher_tarefas(db, resultados)
+    return resultados, alterados
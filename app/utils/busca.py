@@ -0,0 +1,65 @@
+"""
+Busca textual do parâmetro `busca` das listagens
+
+Com settings.fulltext_search ativo, a busca usa os índices FULLTEXT do MySQL
+(migração 0002_busca_fulltext) em modo booleano: cada palavra vira um termo
+obrigatório com prefixo (+palavra*), e a relevância do MATCH ... AGAINST
+pode ser usada como ordenação (order_by=relevancia). Em tarefas, as tags
+entram na busca pela coluna gerada tags_texto.
+
+Sem o modo ativo, ou quando nenhuma palavra atinge o tamanho mínimo de
+termo do índice, a busca volta ao LIKE '%termo%' em título e descrição.
+"""
+import re
+from typing import Optional, Tuple
+
+from sqlalchemy import Float, literal_column, or_, type_coerce
+from sqlalchemy.dialects.mysql import match
+
+from app.core.config import settings
+
+ORDENACAO_RELEVANCIA = "relevancia"
+
+# innodb_ft_min_token_size padrão: palavras menores não estão no índice
+TAMANHO_MINIMO_TERMO = 3
+
+# Colunas de cada índice FULLTEXT (o MATCH precisa listar exatamente as mesmas)
+COLUNAS_FULLTEXT = {
+    "objetivos": ("titulo", "descricao"),
+    "habitos": ("titulo", "descricao"),
+    "tarefas": ("titulo", "descricao", "tags_texto"),
+}
+
+_PALAVRA = re.compile(r"\w+")
+
+def expressao_booleana(busca: str) -> Optional[str]:
+    """
+    Expressão do MATCH em modo booleano: todas as palavras obrigatórias e com
+    prefixo. Operadores digitados pelo usuário são descartados. None se
+    nenhuma palavra puder ser atendida pelo índice.
+    """
+    termos = [palavra for palavra in _PALAVRA.findall(busca) if len(palavra) >= TAMANHO_MINIMO_TERMO]
+    if not termos:
+        return None
+    return " ".join(f"+{termo}*" for termo in termos)
+
+def _colunas_fulltext(modelo) -> list:
+    # tags_texto é uma coluna gerada criada pela migração (fora do modelo)
+    tabela = modelo.__table__
+    return [
+        tabela.c[nome] if nome in tabela.c else literal_column(f"{tabela.name}.{nome}")
+        for nome in COLUNAS_FULLTEXT[tabela.name]
+    ]
+
+def condicao_busca(modelo, busca: str) -> Tuple[object, Optional[object]]:
+    """
+    (condição WHERE, coluna de relevância) da busca em `modelo`.
+    A relevância é None no fallback por LIKE.
+    """
+    expressao = expressao_booleana(busca) if settings.fulltext_search else None
+    if expressao is None:
+        return or_(modelo.titulo.contains(busca), modelo.descricao.contains(busca)), None
+
+    correspondencia = match(*_colunas_fulltext(modelo), against=expressao).in_boolean_mode()
+    relevancia = type_coerce(correspondencia, Float).label(ORDENACAO_RELEVANCIA)
+    return correspondencia, relevancia
@@ -0,0 +1,126 @@
+"""
+Cache em memória com limite de tamanho (LRU) e expiração por TTL
+
+Itens expirados são removidos na leitura e também periodicamente por
+expirar_caches_periodicamente() (task iniciada no lifespan da aplicação),
+para que chaves que nunca mais são lidas não ocupem memória até serem
+empurradas pelo LRU. Cada cache nomeado aparece em metricas_caches().
+"""
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Caches nomeados (para expiração periódica e métricas)
+_caches: "weakref.WeakValueDictionary[str, TTLCache]" = weakref.WeakValueDictionary()
+
+class TTLCache:
+    """
+    Cache LRU limitado com expiração por TTL.
+    Todas as operações são O(1) e protegidas por lock (seguro entre threads),
+    exceto expirar(), que percorre o cache.
+    """
+
+    def __init__(self, max_size: int, ttl: float, nome: Optional[str] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.nome = nome
+        self._dados: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Estatísticas
+        self.acertos = 0
+        self.falhas = 0
+        self.remocoes_lru = 0
+        self.expirados = 0
+
+        if nome:
+            _caches[nome] = self
+
+    def get(self, chave: Hashable, default: Any = None) -> Any:
+        """Retorna o valor da chave (ou default se ausente/expirada)"""
+        with self._lock:
+            item = self._dados.get(chave)
+            if item is None:
+                self.falhas += 1
+                return default
+            expira_em, valor = item
+            if expira_em <= time.monotonic():
+                del self._dados[chave]
+                self.expirados += 1
+                self.falhas += 1
+                return default
+            self._dados.move_to_end(chave)
+            self.acertos += 1
+            return valor
+
+    def set(self, chave: Hashable, valor: Any, ttl: Optional[float] = None) -> None:
+        """Armazena o valor, removendo o item menos recente se o limite for excedido"""
+        expira_em = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._dados[chave] = (expira_em, valor)
+            self._dados.move_to_end(chave)
+            while len(self._dados) > self.max_size:
+                self._dados.popitem(last=False)
+                self.remocoes_lru += 1
+
+    def __contains__(self, chave: Hashable) -> bool:
+        """Se a chave está em cache e válida (não conta acerto/falha nem altera o LRU)"""
+        with self._lock:
+            item = self._dados.get(chave)
+            return item is not None and item[0] > time.monotonic()
+
+    def delete(self, chave: Hashable) -> None:
+        with self._lock:
+            self._dados.pop(chave, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._dados.clear()
+
+    def expirar(self) -> int:
+        """Remove todos os itens expirados; retorna quantos foram removidos"""
+        agora = time.monotonic()
+        with self._lock:
+            vencidas = [chave for chave, (expira_em, _) in self._dados.items() if expira_em <= agora]
+            for chave in vencidas:
+                del self._dados[chave]
+            self.expirados += len(vencidas)
+        return len(vencidas)
+
+    def metricas(self) -> Dict[str, Any]:
+        consultas = self.acertos + self.falhas
+        return {
+            "tamanho": len(self._dados),
+            "max_size": self.max_size,
+            "ttl_s": self.ttl,
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            "taxa_acerto": round(self.acertos / consultas, 4) if consultas else 0.0,
+            "remocoes_lru": self.remocoes_lru,
+            "expirados": self.expirados,
+        }
+
+    def __len__(self) -> int:
+        return len(self._dados)
+
+def metricas_caches() -> Dict[str, Dict[str, Any]]:
+    """Estatísticas de todos os caches nomeados"""
+    return {nome: cache.metricas() for nome, cache in sorted(_caches.items())}
+
+async def expirar_caches_periodicamente(intervalo: float) -> None:
+    """Loop (task asyncio) que remove os itens expirados dos caches nomeados"""
+    while True:
+        await asyncio.sleep(intervalo)
+        for nome, cache in list(_caches.items()):
+            try:
+                removidos = cache.expirar()
+                if removidos:
+                    logger.debug("Cache %s: %s itens expirados removidos", nome, removidos)
+            except Exception as e:
+                logger.error(f"Erro ao expirar cache {nome}: {e}")
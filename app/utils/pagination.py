@@ -0,0 +1,238 @@
+"""
+Utilitários de paginação - offset e keyset (cursor)
+
+A paginação por cursor usa a tupla (coluna de ordenação, id) da última linha
+da página como ponto de partida da próxima. Com os índices compostos
+(usuario_id, coluna, id) o MySQL lê apenas as linhas da página, em vez de
+percorrer e descartar todas as linhas puladas pelo OFFSET.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime, date
+from decimal import Decimal
+from typing import Any, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_, asc, desc, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.schemas.base import PaginationResponse
+from app.utils.cache import TTLCache
+
+# Colunas aceitas em order_by por tabela. Cada uma possui índice composto
+# (usuario_id, coluna, id) declarado no modelo correspondente.
+COLUNAS_ORDENACAO = {
+    "objetivos": ("created_at", "updated_at", "titulo", "progresso", "inicio", "fim"),
+    "habitos": ("created_at", "updated_at", "titulo", "progresso"),
+    "tarefas": ("created_at", "updated_at", "titulo", "prioridade", "progresso", "prazo", "posicao"),
+}
+
+ORDENACAO_PADRAO = "created_at"
+
+# Modos do parâmetro with_total
+WITH_TOTAL_PATTERN = r"^(false|exact|estimate)$"
+
+# Totais usados em with_total=estimate: {(usuario_id, assinatura): total}.
+# Uma entrada por consulta, então o max_size do LRU limita o total de entradas
+_totais_cache = TTLCache(
+    max_size=settings.total_estimate_cache_size,
+    ttl=settings.total_estimate_ttl,
+    nome="totais_estimados"
+)
+
+# Assinaturas em cache de cada usuário, para invalidar_totais: {usuario_id: {assinatura}}
+_assinaturas_usuario = TTLCache(
+    max_size=settings.total_estimate_cache_size,
+    ttl=settings.total_estimate_ttl,
+    nome="totais_estimados_usuarios"
+)
+
+def invalidar_totais(usuario_id: str) -> None:
+    """Descarta os totais estimados do usuário (chamado nas rotas de escrita)"""
+    assinaturas = _assinaturas_usuario.get(usuario_id, ())
+    _assinaturas_usuario.delete(usuario_id)
+    for assinatura in assinaturas:
+        _totais_cache.delete((usuario_id, assinatura))
+
+async def _total_estimado(db: AsyncSession, query_total, usuario_id: Optional[str]) -> int:
+    """
+    Total em cache para a mesma consulta; calcula e armazena na primeira vez.
+    A assinatura vem da chave de cache do statement (estrutura + valores dos
+    parâmetros), sem compilar o SQL: construções de dialeto como o MATCH da
+    busca FULLTEXT não compilam fora do MySQL.
+    """
+    chave = query_total._generate_cache_key()
+    if chave is not None:
+        assinatura = hash((chave.key, tuple(repr(parametro.effective_value) for parametro in chave.bindparams)))
+    else:
+        compilada = query_total.compile(dialect=db.bind.dialect)
+        assinatura = hash((str(compilada), tuple(sorted((k, repr(v)) for k, v in compilada.params.items()))))
+
+    total = _totais_cache.get((usuario_id, assinatura))
+    if total is not None:
+        return total
+
+    total = await db.scalar(query_total) or 0
+    _totais_cache.set((usuario_id, assinatura), total)
+    # Mantém só as assinaturas ainda em cache (as removidas pelo LRU/TTL saem)
+    assinaturas = {
+        anterior for anterior in _assinaturas_usuario.get(usuario_id, ())
+        if (usuario_id, anterior) in _totais_cache
+    }
+    assinaturas.add(assinatura)
+    _assinaturas_usuario.set(usuario_id, assinaturas)
+    return total
+
+def coluna_ordenacao(model, order_by: Optional[str], relevancia=None):
+    """
+    Retorna a coluna de ordenação permitida (created_at para valores desconhecidos).
+    order_by=relevancia usa a coluna de relevância da busca, quando houver.
+    """
+    if relevancia is not None and order_by == relevancia.key:
+        return relevancia
+    permitidas = COLUNAS_ORDENACAO.get(model.__tablename__, ())
+    if order_by not in permitidas:
+        order_by = ORDENACAO_PADRAO
+    return getattr(model, order_by)
+
+def _serializar_valor(valor: Any) -> Any:
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return str(valor)
+    return valor
+
+def _desserializar_valor(coluna, valor: Any) -> Any:
+    if valor is None:
+        return None
+    tipo = coluna.type.python_type
+    if tipo is datetime:
+        return datetime.fromisoformat(valor)
+    if tipo is date:
+        return date.fromisoformat(valor)
+    if tipo is Decimal:
+        return Decimal(valor)
+    return valor
+
+def encode_cursor(coluna, order_dir: str, valor: Any, registro_id: str) -> str:
+    """Gera o cursor opaco (base64url) para a posição (valor, id)"""
+    payload = json.dumps(
+        {"c": coluna.key, "d": order_dir, "v": _serializar_valor(valor), "id": registro_id},
+        separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, coluna, order_dir: str) -> Tuple[Any, str]:
+    """Decodifica o cursor validando que ele pertence à mesma ordenação"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if payload["c"] != coluna.key or payload["d"] != order_dir:
+            raise ValueError("cursor de outra ordenação")
+        return _desserializar_valor(coluna, payload["v"]), payload["id"]
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor inválido para esta ordenação"
+        )
+
+def condicao_keyset(coluna, coluna_id, order_dir: str, valor: Any, registro_id: str):
+    """
+    Condição WHERE das linhas posteriores a (valor, id).
+    Segue a ordenação do MySQL, em que NULL é o menor valor.
+    """
+    nullable = getattr(coluna.expression, "nullable", False)
+
+    if order_dir == "desc":
+        if valor is None:
+            return and_(coluna.is_(None), coluna_id < registro_id)
+        condicoes = [coluna < valor, and_(coluna == valor, coluna_id < registro_id)]
+        if nullable:
+            condicoes.append(coluna.is_(None))
+        return or_(*condicoes)
+
+    if valor is None:
+        return or_(coluna.isnot(None), and_(coluna.is_(None), coluna_id > registro_id))
+    return or_(coluna > valor, and_(coluna == valor, coluna_id > registro_id))
+
+async def paginar(
+    db: AsyncSession,
+    query,
+    *,
+    coluna,
+    coluna_id,
+    order_dir: str,
+    page: int,
+    limit: int,
+    cursor: Optional[str] = None,
+    query_total=None,
+    entidade: bool = True,
+    with_total: str = "exact",
+    usuario_id: Optional[str] = None
+):
+    """
+    Executa a query paginada e retorna (itens, PaginationResponse).
+
+    Com `cursor` a página é obtida por keyset; sem ele usa OFFSET (compatibilidade).
+    Em ambos os casos é buscada uma linha a mais para determinar has_next e
+    next_cursor. `entidade=False` retorna as linhas completas: o cursor é
+    lido das colunas da própria linha (select de colunas Core, ou a coluna
+    de relevância acrescentada à entidade) e, no que faltar, da entidade na
+    primeira coluna.
+
+    with_total: "exact" executa o COUNT, "estimate" usa o total em cache do
+    usuário e "false" não calcula total (has_next vem da linha extra).
+    """
+    total = None
+    if with_total != "false":
+        if query_total is None:
+            query_total = select(func.count()).select_from(query.order_by(None).subquery())
+        if with_total == "estimate":
+            total = await _total_estimado(db, query_total, usuario_id)
+        else:
+            total = await db.scalar(query_total) or 0
+
+    ordem = desc if order_dir == "desc" else asc
+    query = query.order_by(ordem(coluna), ordem(coluna_id))
+
+    if cursor:
+        valor, ultimo_id = decode_cursor(cursor, coluna, order_dir)
+        query = query.where(condicao_keyset(coluna, coluna_id, order_dir, valor, ultimo_id))
+    else:
+        query = query.offset((page - 1) * limit)
+
+    result = await db.execute(query.limit(limit + 1))
+    itens = result.scalars().all() if entidade else result.all()
+
+    has_next = len(itens) > limit
+    itens = itens[:limit]
+
+    next_cursor = None
+    if has_next:
+        ultimo = itens[-1]
+        # Linhas (Entidade, ..., relevancia): o id vem da entidade e o valor
+        # de ordenação da própria linha, quando ela tiver a coluna
+        registro = ultimo
+        if not entidade and not hasattr(ultimo, coluna_id.key):
+            registro = ultimo[0]
+        origem_valor = ultimo if not entidade and hasattr(ultimo, coluna.key) else registro
+        next_cursor = encode_cursor(
+            coluna, order_dir, getattr(origem_valor, coluna.key), getattr(registro, coluna_id.key)
+        )
+
+    total_pages = (total + limit - 1) // limit if total is not None else None
+
+    pagination = PaginationResponse(
+        page=page,
+        limit=limit,
+        total=total,
+        total_pages=total_pages,
+        total_estimated=with_total == "estimate",
+        has_next=has_next,
+        has_prev=bool(cursor) or page > 1,
+        next_cursor=next_cursor
+    )
+
+    return itens, pagination
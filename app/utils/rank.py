@@ -0,0 +1,90 @@
+"""
+Chaves de ordenação fracionárias (estilo LexoRank) para o kanban
+
+Cada tarefa guarda em rank_kanban uma string base 36 (0-9a-z) e a coluna é
+ordenada pela comparação lexicográfica dessas strings. Para inserir um cartão
+entre dois outros basta gerar uma chave entre as chaves vizinhas, sem
+renumerar os demais: mover um cartão altera uma única linha.
+
+As chaves geradas nunca terminam em "0", o que garante que sempre exista uma
+chave menor e uma entre quaisquer duas. Só são usados dígitos e letras
+minúsculas, que têm a mesma ordem em collations binárias e *_ci do MySQL.
+
+Inserções repetidas no mesmo ponto alongam as chaves; acima de
+TAMANHO_MAXIMO_RANK a coluna é redistribuída (ranks_distribuidos).
+"""
+from typing import List, Optional
+
+ALFABETO = "0123456789abcdefghijklmnopqrstuvwxyz"
+BASE = len(ALFABETO)
+_DIGITO = {caractere: valor for valor, caractere in enumerate(ALFABETO)}
+
+# Chaves maiores que isto disparam o rebalanceamento da coluna
+TAMANHO_MAXIMO_RANK = 24
+# Tamanho da coluna no banco (folga para as inserções antes do rebalanceamento)
+TAMANHO_COLUNA_RANK = 64
+
+def rank_entre(anterior: Optional[str], proximo: Optional[str]) -> str:
+    """
+    Chave estritamente entre `anterior` e `proximo` (None = sem limite).
+    ValueError se anterior >= proximo.
+    """
+    if anterior is not None and proximo is not None and anterior >= proximo:
+        raise ValueError(f"rank anterior ({anterior}) deve ser menor que o próximo ({proximo})")
+
+    anterior = anterior or ""
+
+    # No fim da coluna: incrementa o primeiro dígito que ainda comporta
+    if proximo is None:
+        for posicao, caractere in enumerate(anterior):
+            if _DIGITO[caractere] < BASE - 1:
+                return anterior[:posicao] + ALFABETO[_DIGITO[caractere] + 1]
+        return anterior + ALFABETO[BASE // 2]
+
+    # No início da coluna: decrementa o primeiro dígito que não vira "0"
+    if not anterior:
+        for posicao, caractere in enumerate(proximo):
+            if _DIGITO[caractere] > 1:
+                return proximo[:posicao] + ALFABETO[_DIGITO[caractere] - 1]
+
+    resultado = []
+    posicao = 0
+    while True:
+        digito_anterior = _DIGITO[anterior[posicao]] if posicao < len(anterior) else 0
+        digito_proximo = (
+            _DIGITO[proximo[posicao]] if proximo is not None and posicao < len(proximo) else BASE
+        )
+
+        if digito_anterior == digito_proximo:
+            # Prefixo comum
+            resultado.append(ALFABETO[digito_anterior])
+        else:
+            meio = (digito_anterior + digito_proximo) // 2
+            if meio > digito_anterior:
+                resultado.append(ALFABETO[meio])
+                return "".join(resultado)
+            # Dígitos consecutivos: mantém o do anterior e procura espaço depois dele,
+            # onde o próximo já não limita
+            resultado.append(ALFABETO[digito_anterior])
+            proximo = None
+        posicao += 1
+
+def ranks_distribuidos(quantidade: int) -> List[str]:
+    """`quantidade` chaves crescentes, igualmente espaçadas e do menor tamanho possível"""
+    if quantidade <= 0:
+        return []
+
+    tamanho = 1
+    while BASE ** tamanho <= quantidade:
+        tamanho += 1
+    passo = BASE ** tamanho // (quantidade + 1)
+
+    ranks = []
+    for indice in range(1, quantidade + 1):
+        valor = indice * passo
+        digitos = []
+        for _ in range(tamanho):
+            valor, resto = divmod(valor, BASE)
+            digitos.append(ALFABETO[resto])
+        ranks.append("".join(reversed(digitos)).rstrip("0"))
+    return ranks
@@ -0,0 +1,69 @@
+"""
+Respostas JSON rápidas para listagens
+
+Com settings.fast_json_responses, as rotas de listagem devolvem uma
+FastJSONResponse em vez de DataResponse: o FastAPI não revalida o payload
+(já serializado) pelo response_model e o corpo é codificado com orjson,
+que trata datetime/date nativamente. O JSON gerado é o mesmo do caminho
+padrão (Decimal como string, como no modo JSON do Pydantic).
+"""
+import json
+import logging
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Optional
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.schemas.base import DataResponse, PaginationResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson é opcional
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+if settings.fast_json_responses and orjson is None:
+    logger.warning("fast_json_responses habilitado, mas orjson não está instalado; usando DataResponse")
+
+def _default(valor: Any) -> Any:
+    """Tipos que o orjson não serializa nativamente"""
+    if isinstance(valor, Decimal):
+        return str(valor)
+    if isinstance(valor, BaseModel):
+        return valor.model_dump(mode="json")
+    raise TypeError(f"Tipo não serializável em JSON: {type(valor).__name__}")
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse codificada com orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+
+def linha_ndjson(objeto: Any) -> bytes:
+    """Uma linha de um stream NDJSON (application/x-ndjson), com orjson quando disponível"""
+    if orjson is not None:
+        return orjson.dumps(objeto, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+
+    def padrao(valor: Any) -> Any:
+        if isinstance(valor, (datetime, date)):
+            return valor.isoformat()
+        return _default(valor)
+
+    return (json.dumps(objeto, default=padrao, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+def resposta_lista(data: Any, pagination: Optional[PaginationResponse] = None):
+    """
+    Resposta das rotas de listagem: DataResponse (validada pelo
+    response_model) ou, com fast_json_responses, FastJSONResponse.
+    """
+    if not settings.fast_json_responses or orjson is None:
+        return DataResponse(data=data, pagination=pagination)
+
+    return FastJSONResponse({
+        "data": data,
+        "pagination": pagination.model_dump() if pagination else None
+    })
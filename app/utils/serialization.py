@@ -1,12 +1,116 @@
 """
 Utilitários para serialização de objetos SQLAlchemy
+
+Os serializadores são montados uma única vez por classe de modelo (lista
+de colunas, conversores por tipo e nomes das chaves já resolvidos) e
+guardados em um registro; serializar uma linha é apenas ler os valores
+carregados e converter os datetime/date/Decimal.
+
+Dois formatos:
+  - snake_case (serialize_model): datetime/date em ISO e Decimal em float
+  - camelCase (serialize_tarefas): mesma saída de TarefaResponse; os valores
+    seguem como estão e o encoder JSON da resposta os converte (Decimal
+    vira string, como no modo JSON do Pydantic)
+
+Além de instâncias ORM, os serializadores de linhas convertem tuplas Core
+de select(*colunas_modelo(Modelo)), sem materializar objetos ORM.
 """
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from operator import attrgetter, itemgetter
+from sqlalchemy import Date, DateTime, Numeric
 from sqlalchemy.orm import class_mapper
-from sqlalchemy.inspection import inspect
-from datetime import datetime, date
+from datetime import date
 from decimal import Decimal
-from app.schemas.tarefa import TarefaResponse
+from app.models import Tarefa
+from app.schemas.tarefa import to_camel
+
+Serializador = Callable[[Any], Dict[str, Any]]
+
+# Registro de serializadores: (classe do modelo, camelCase, linhas Core) -> função
+_serializadores: Dict[Tuple[type, bool, bool], Serializador] = {}
+
+# Os conversores conferem o tipo do valor: linhas montadas a partir de SQL
+# textual podem trazer valores de outro tipo (ex.: datas como str)
+def _isoformat(valor) -> Any:
+    return valor.isoformat() if isinstance(valor, date) else valor
+
+def _float(valor) -> Any:
+    return float(valor) if isinstance(valor, Decimal) else valor
+
+def _conversor(tipo) -> Optional[Callable[[Any], Any]]:
+    """Conversor JSON do valor da coluna a partir do tipo (None se não precisar)"""
+    if isinstance(tipo, (DateTime, Date)):
+        return _isoformat
+    if isinstance(tipo, Numeric):
+        return _float
+    return None
+
+def colunas_modelo(modelo: type) -> list:
+    """Atributos de coluna do modelo, na ordem usada pelos serializadores de linhas"""
+    return [getattr(modelo, prop.key) for prop in class_mapper(modelo).column_attrs]
+
+def _montar(saidas: Tuple[str, ...], conversoes: tuple) -> Callable[[Sequence[Any]], Dict[str, Any]]:
+    """Função que transforma a tupla de valores (na ordem das colunas) em dict"""
+    if not conversoes:
+        return lambda valores: dict(zip(saidas, valores))
+
+    def montar(valores) -> Dict[str, Any]:
+        resultado = dict(zip(saidas, valores))
+        for saida, indice, conversor in conversoes:
+            valor = valores[indice]
+            if valor is not None:
+                resultado[saida] = conversor(valor)
+        return resultado
+
+    return montar
+
+def _construir_serializador(modelo: type, camel: bool, linhas: bool) -> Serializador:
+    chaves = []
+    saidas = []
+    conversoes = []
+    for indice, prop in enumerate(class_mapper(modelo).column_attrs):
+        chaves.append(prop.key)
+        saidas.append(to_camel(prop.key) if camel else prop.key)
+        conversor = None if camel else _conversor(prop.columns[0].type)
+        if conversor:
+            conversoes.append((saidas[-1], indice, conversor))
+
+    montar = _montar(tuple(saidas), tuple(conversoes))
+    if linhas:
+        return montar
+
+    # Atributos já carregados ficam no __dict__ da instância (leitura direta,
+    # sem passar pelos descritores do ORM); expirados/adiados usam getattr
+    ler_dict = itemgetter(*chaves)
+    ler_attr = attrgetter(*chaves)
+    if len(chaves) == 1:
+        ler_dict_um, ler_attr_um = ler_dict, ler_attr
+        ler_dict = lambda dados: (ler_dict_um(dados),)
+        ler_attr = lambda instancia: (ler_attr_um(instancia),)
+
+    def serializar(instancia) -> Dict[str, Any]:
+        if instancia is None:
+            return None
+        try:
+            valores = ler_dict(instancia.__dict__)
+        except KeyError:
+            valores = ler_attr(instancia)
+        return montar(valores)
+
+    serializar.__name__ = f"serializar_{modelo.__name__.lower()}"
+    return serializar
+
+def serializador(modelo: type, camel: bool = False, linhas: bool = False) -> Serializador:
+    """
+    Função especializada que converte instâncias de `modelo` (ou, com
+    linhas=True, tuplas de select(*colunas_modelo(modelo))) em dict com
+    chaves snake_case ou camelCase. Montada na primeira chamada.
+    """
+    chave = (modelo, camel, linhas)
+    funcao = _serializadores.get(chave)
+    if funcao is None:
+        funcao = _serializadores[chave] = _construir_serializador(modelo, camel, linhas)
+    return funcao
 
 def serialize_model(model_instance) -> Dict[str, Any]:
     """
@@ -15,49 +119,44 @@ def serialize_model(model_instance) -> Dict[str, Any]:
     """
     if model_instance is None:
         return None
-        
-    # Obter todas as colunas do modelo
-    mapper = class_mapper(model_instance.__class__)
-    columns = [column.key for column in mapper.columns]
-    
-    result = {}
-    for column in columns:
-        value = getattr(model_instance, column, None)
-        
-        # Converter tipos especiais para JSON serializável
-        if isinstance(value, datetime):
-            result[column] = value.isoformat()
-        elif isinstance(value, date):
-            result[column] = value.isoformat()
-        elif isinstance(value, Decimal):
-            result[column] = float(value)
-        else:
-            result[column] = value
-            
-    return result
+    return serializador(model_instance.__class__)(model_instance)
 
 def serialize_models(model_instances: List) -> List[Dict[str, Any]]:
     """
     Serializa uma lista de instâncias de modelo SQLAlchemy.
     """
+    if not model_instances:
+        return []
+
+    classe = model_instances[0].__class__
+    serializar = serializador(classe)
+    if all(instance.__class__ is classe for instance in model_instances):
+        return [serializar(instance) for instance in model_instances]
     return [serialize_model(instance) for instance in model_instances]
 
 def serialize_tarefa(tarefa_instance) -> Dict[str, Any]:
     """
-    Serializa uma tarefa usando o schema Pydantic para garantir camelCase
-    e incluir todos os campos (estimativa_horas, horas_gastas, etc).
+    Serializa uma tarefa com chaves camelCase (mesmos campos e saída JSON
+    de TarefaResponse, incluindo estimativa_horas, horas_gastas, etc).
     """
     if tarefa_instance is None:
         return None
-    
-    return TarefaResponse.model_validate(tarefa_instance).model_dump(
-        by_alias=True,
-        exclude_none=False  # Incluir campos None para garantir que todos os campos apareçam
-    )
+    return serializador(tarefa_instance.__class__, camel=True)(tarefa_instance)
 
 def serialize_tarefas(tarefa_instances: List) -> List[Dict[str, Any]]:
     """
-    Serializa uma lista de tarefas usando o schema Pydantic.
-    Garante camelCase e inclui todos os campos.
+    Serializa uma lista de tarefas com chaves camelCase.
+    """
+    if not tarefa_instances:
+        return []
+
+    serializar = serializador(tarefa_instances[0].__class__, camel=True)
+    return [serializar(tarefa) for tarefa in tarefa_instances]
+
+def serialize_tarefas_linhas(linhas: Sequence[Sequence[Any]]) -> List[Dict[str, Any]]:
+    """
+    Serializa tuplas de select(*colunas_modelo(Tarefa)) com chaves camelCase,
+    em uma única passada e sem criar objetos Tarefa.
     """
-    return [serialize_tarefa(tarefa) for tarefa in tarefa_instances]
\ No newline at end of file
+    montar = serializador(Tarefa, camel=True, linhas=True)
+    return [montar(linha) for linha in linhas]
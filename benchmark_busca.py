@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark da busca de tarefas: LIKE '%termo%' x FULLTEXT (MySQL).
+
+Cria um usuário de teste com N tarefas (padrão 100.000) com títulos,
+descrições e tags sorteados de um vocabulário, e mede a latência de uma
+página de GET /tarefas?busca=... (consulta da página + COUNT, como em
+with_total=exact) em três modos:
+
+  - like:       settings.fulltext_search desligado (LIKE em título/descrição)
+  - fulltext:   MATCH ... AGAINST em modo booleano, ordenado por created_at
+  - relevancia: MATCH ... AGAINST ordenado por relevância
+
+Requer as migrações aplicadas (alembic upgrade head). As tarefas de teste
+são removidas no final, a não ser com --manter.
+
+Uso:
+    python benchmark_busca.py
+    python benchmark_busca.py --tarefas 100000 --repeticoes 30 --manter
+"""
+import argparse
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, desc, func, inspect, select
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models import Objetivo, Habito, Tarefa
+from app.utils.busca import condicao_busca
+
+VOCABULARIO = (
+    "relatório reunião projeto cliente orçamento revisão entrega contrato planilha apresentação "
+    "treino corrida leitura estudo inglês curso capítulo exercício academia alongamento "
+    "compras mercado limpeza cozinha jardim consulta médico exame dentista farmácia "
+    "viagem passagem hotel reserva bagagem documento passaporte visto seguro câmbio "
+    "código deploy teste servidor banco migração índice consulta desempenho monitoramento"
+).split()
+PALAVRA_RARA = "zircônio"  # presente em ~0,1% das tarefas
+
+CENARIOS = (
+    ("comum", "projeto"),
+    ("rara", PALAVRA_RARA),
+    ("prefixo", "migra"),
+    ("duas palavras", "relatório cliente"),
+)
+
+
+def frase(sorteio: random.Random, palavras: int) -> str:
+    return " ".join(sorteio.choice(VOCABULARIO) for _ in range(palavras))
+
+
+def popular(conn, usuario_id: str, total: int, lote: int = 5000) -> None:
+    sorteio = random.Random(42)
+    objetivo_id, habito_id = str(uuid.uuid4()), str(uuid.uuid4())
+    conn.execute(Objetivo.__table__.insert(), [{"id": objetivo_id, "usuario_id": usuario_id, "titulo": "Benchmark busca"}])
+    conn.execute(Habito.__table__.insert(), [{
+        "id": habito_id, "usuario_id": usuario_id, "objetivo_id": objetivo_id,
+        "titulo": "Benchmark busca", "frequencia": "diario", "alvo_por_periodo": 1
+    }])
+
+    inicio = datetime(2025, 1, 1)
+    for base in range(0, total, lote):
+        linhas = []
+        for i in range(base, min(base + lote, total)):
+            titulo = frase(sorteio, 4)
+            if i % 1000 == 0:
+                titulo += f" {PALAVRA_RARA}"
+            momento = inicio + timedelta(seconds=i)
+            linhas.append({
+                "id": str(uuid.uuid4()), "usuario_id": usuario_id, "habito_id": habito_id,
+                "titulo": titulo, "descricao": frase(sorteio, 12), "status": "backlog",
+                "tags": [sorteio.choice(VOCABULARIO), sorteio.choice(VOCABULARIO)],
+                "created_at": momento, "updated_at": momento,
+            })
+        conn.execute(Tarefa.__table__.insert(), linhas)
+        conn.commit()
+        print(f"   {min(base + lote, total)}/{total} tarefas inseridas", end="\r")
+    print()
+
+
+def remover(conn, usuario_id: str) -> None:
+    for modelo in (Tarefa, Habito, Objetivo):
+        conn.execute(delete(modelo).where(modelo.usuario_id == usuario_id))
+    conn.commit()
+
+
+def consultar(conn, usuario_id: str, busca: str, por_relevancia: bool) -> int:
+    """Página de 50 (+1) tarefas e COUNT, como em listar_tarefas"""
+    condicao, relevancia = condicao_busca(Tarefa, busca)
+    query = select(Tarefa.id).where(Tarefa.usuario_id == usuario_id, condicao)
+    total = conn.scalar(select(func.count()).select_from(query.subquery()))
+    if por_relevancia and relevancia is not None:
+        query = query.add_columns(relevancia).order_by(desc(relevancia), desc(Tarefa.id))
+    else:
+        query = query.order_by(desc(Tarefa.created_at), desc(Tarefa.id))
+    conn.execute(query.limit(51)).all()
+    return total
+
+
+def medir(conn, usuario_id: str, busca: str, por_relevancia: bool, repeticoes: int):
+    """(mediana ms, p95 ms, linhas encontradas)"""
+    encontradas = consultar(conn, usuario_id, busca, por_relevancia)
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        consultar(conn, usuario_id, busca, por_relevancia)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    tempos.sort()
+    return statistics.median(tempos), tempos[int(len(tempos) * 0.95) - 1], encontradas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de busca LIKE x FULLTEXT")
+    parser.add_argument("--tarefas", type=int, default=100000)
+    parser.add_argument("--repeticoes", type=int, default=30)
+    parser.add_argument("--manter", action="store_true", help="não remove as tarefas de teste")
+    args = parser.parse_args()
+
+    indices = {indice["name"] for indice in inspect(engine).get_indexes("tarefas")}
+    if "ft_tarefas_busca" not in indices:
+        print("❌ Índice ft_tarefas_busca não encontrado: rode `alembic upgrade head`")
+        return
+
+    usuario_id = f"bench-busca-{uuid.uuid4().hex[:8]}"
+    modos = (("like", False, False), ("fulltext", True, False), ("relevancia", True, True))
+    anterior = settings.fulltext_search
+
+    with engine.connect() as conn:
+        print(f"📦 Criando {args.tarefas} tarefas para {usuario_id}")
+        popular(conn, usuario_id, args.tarefas)
+        try:
+            print(f"\n{'cenário':<15} {'modo':<11} {'mediana (ms)':>12} {'p95 (ms)':>10} {'linhas':>8}")
+            for nome, busca in CENARIOS:
+                resultados = {}
+                for modo, fulltext, por_relevancia in modos:
+                    settings.fulltext_search = fulltext
+                    resultados[modo] = medir(conn, usuario_id, busca, por_relevancia, args.repeticoes)
+                    mediana, p95, linhas = resultados[modo]
+                    print(f"{nome:<15} {modo:<11} {mediana:>12.1f} {p95:>10.1f} {linhas:>8}")
+                ganho = resultados["like"][0] / resultados["fulltext"][0]
+                print(f"{nome:<15} {'fulltext/like':<11} {ganho:>11.1f}x")
+        finally:
+            settings.fulltext_search = anterior
+            if not args.manter:
+                remover(conn, usuario_id)
+                print("\n🧹 Dados de teste removidos")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de concorrência da API.
+Dispara requisições simultâneas contra uma rota de listagem e mede a vazão
+(req/s) para níveis crescentes de clientes concorrentes.
+
+Com as rotas bloqueando o event loop a vazão fica estável (flatline) a partir
+de 1 cliente; com a sessão assíncrona ela deve crescer com a concorrência até
+saturar o pool de conexões.
+
+Uso (com o servidor rodando):
+    python benchmark_concorrencia.py --email teste@goalmanager.com --senha password
+    python benchmark_concorrencia.py --rota /api/v1/tarefas --niveis 1 4 16 64
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+async def obter_token(client: httpx.AsyncClient, email: str, senha: str) -> str:
+    response = await client.post("/api/v1/auth/login", json={"email": email, "password": senha})
+    response.raise_for_status()
+    return response.json()["data"]["access_token"]
+
+
+async def executar_nivel(client: httpx.AsyncClient, rota: str, headers: dict, clientes: int, requisicoes: int):
+    """Executa `requisicoes` chamadas divididas entre `clientes` workers concorrentes"""
+    latencias = []
+    erros = 0
+    fila = asyncio.Queue()
+    for _ in range(requisicoes):
+        fila.put_nowait(None)
+
+    async def worker():
+        nonlocal erros
+        while True:
+            try:
+                fila.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            inicio = time.perf_counter()
+            response = await client.get(rota, headers=headers)
+            latencias.append(time.perf_counter() - inicio)
+            if response.status_code != 200:
+                erros += 1
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(clientes)))
+    duracao = time.perf_counter() - inicio
+
+    latencias.sort()
+    p95 = latencias[int(len(latencias) * 0.95) - 1] if latencias else 0.0
+    return {
+        "clientes": clientes,
+        "req_s": requisicoes / duracao,
+        "p50_ms": statistics.median(latencias) * 1000 if latencias else 0.0,
+        "p95_ms": p95 * 1000,
+        "erros": erros,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark de concorrência da API")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--rota", default="/api/v1/objetivos")
+    parser.add_argument("--email", default="teste@goalmanager.com")
+    parser.add_argument("--senha", default="password")
+    parser.add_argument("--token", default=None, help="Token JWT (dispensa login)")
+    parser.add_argument("--niveis", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--requisicoes", type=int, default=200, help="Requisições por nível")
+    args = parser.parse_args()
+
+    limites = httpx.Limits(max_connections=max(args.niveis), max_keepalive_connections=max(args.niveis))
+    async with httpx.AsyncClient(base_url=args.url, limits=limites, timeout=60) as client:
+        token = args.token or await obter_token(client, args.email, args.senha)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        # Aquecimento (conexões do pool, caches)
+        await executar_nivel(client, args.rota, headers, 4, 20)
+
+        print(f"🚀 Benchmark de concorrência: {args.rota}")
+        print(f"{'clientes':>9} {'req/s':>10} {'p50 (ms)':>10} {'p95 (ms)':>10} {'erros':>6}")
+        base = None
+        for clientes in args.niveis:
+            r = await executar_nivel(client, args.rota, headers, clientes, args.requisicoes)
+            base = base or r["req_s"]
+            print(
+                f"{r['clientes']:>9} {r['req_s']:>10.1f} {r['p50_ms']:>10.1f} "
+                f"{r['p95_ms']:>10.1f} {r['erros']:>6}   (x{r['req_s'] / base:.2f})"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do overhead por requisição do RequestLoggingMiddleware.
+
+Monta uma aplicação FastAPI mínima (sem banco de dados) e mede, em processo
+via httpx.ASGITransport, o tempo médio por requisição com e sem o
+middleware para:
+
+  - GET simples
+  - POST com JSON de ~1 KB
+  - POST com corpo de ~5 MB (upload grande)
+
+Os logs do middleware são gerados normalmente, mas descartados
+(NullHandler), para medir o custo do middleware e não o do terminal.
+
+Uso:
+    python benchmark_middleware.py
+    python benchmark_middleware.py --requisicoes 5000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+
+import httpx
+from fastapi import FastAPI, Request
+
+from app.middleware import RequestLoggingMiddleware
+
+
+def criar_app(com_middleware: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.post("/eco")
+    async def eco(request: Request):
+        corpo = await request.body()
+        return {"bytes": len(corpo)}
+
+    if com_middleware:
+        app.add_middleware(RequestLoggingMiddleware)
+    return app
+
+
+async def medir(app: FastAPI, metodo: str, rota: str, corpo: bytes, requisicoes: int) -> float:
+    """Tempo médio por requisição (µs)"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        headers = {"content-type": "application/json"}
+        for _ in range(min(50, requisicoes)):
+            await client.request(metodo, rota, content=corpo, headers=headers)
+
+        inicio = time.perf_counter()
+        for _ in range(requisicoes):
+            await client.request(metodo, rota, content=corpo, headers=headers)
+        return (time.perf_counter() - inicio) / requisicoes * 1_000_000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Overhead do middleware de logging")
+    parser.add_argument("--requisicoes", type=int, default=2000)
+    args = parser.parse_args()
+
+    logger = logging.getLogger("app.middleware.logging")
+    logger.handlers = [logging.NullHandler()]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+
+    json_1kb = json.dumps({"titulo": "x" * 1000}).encode()
+    upload_5mb = b"0" * (5 * 1024 * 1024)
+    cenarios = [
+        ("GET /ping", "GET", "/ping", b"", args.requisicoes),
+        ("POST JSON 1KB", "POST", "/eco", json_1kb, args.requisicoes),
+        ("POST 5MB", "POST", "/eco", upload_5mb, max(1, args.requisicoes // 50)),
+    ]
+
+    sem = criar_app(False)
+    com = criar_app(True)
+
+    print(f"{'cenário':<16} {'sem (µs)':>10} {'com (µs)':>10} {'overhead (µs)':>14}")
+    for nome, metodo, rota, corpo, n in cenarios:
+        base = await medir(sem, metodo, rota, corpo, n)
+        mw = await medir(com, metodo, rota, corpo, n)
+        print(f"{nome:<16} {base:>10.1f} {mw:>10.1f} {mw - base:>14.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do recálculo de progresso de objetivos.
+
+Cria um objetivo sintético com N tarefas (padrão 10.000) distribuídas entre
+alguns hábitos e compara:
+
+  - completo: recalcular_progresso_objetivo_completo (carrega todos os
+    hábitos e tarefas e faz a média em Python)
+  - delta:    recalcular_progresso_objetivo (UPDATE objetivos JOIN
+    objetivo_stats, custo constante)
+
+Os dados são criados com um usuario_id aleatório e removidos ao final.
+
+Uso:
+    python benchmark_progresso.py
+    python benchmark_progresso.py --tarefas 10000 --repeticoes 50
+    python benchmark_progresso.py --database-url sqlite:///bench.db
+"""
+import argparse
+import statistics
+import time
+import uuid
+from decimal import Decimal
+
+from sqlalchemy import create_engine, delete
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.database import Base
+from app.models import Objetivo, ObjetivoStats, Habito, Tarefa
+from app.services.estatisticas import reconstruir_objetivo_stats
+from app.services.progress import recalcular_progresso_objetivo, recalcular_progresso_objetivo_completo
+
+
+def criar_dados(db, usuario_id: str, n_habitos: int, n_tarefas: int) -> str:
+    objetivo = Objetivo(usuario_id=usuario_id, titulo="benchmark progresso")
+    db.add(objetivo)
+    db.flush()
+
+    habitos = [
+        Habito(
+            usuario_id=usuario_id, objetivo_id=objetivo.id, titulo=f"hábito {i}",
+            frequencia="diario", alvo_por_periodo=5, realizados_no_periodo=i % 6,
+            progresso=Decimal(min(100, (i % 6) * 20))
+        )
+        for i in range(n_habitos)
+    ]
+    db.add_all(habitos)
+    db.flush()
+
+    db.execute(
+        Tarefa.__table__.insert(),
+        [
+            {
+                "id": str(uuid.uuid4()),
+                "usuario_id": usuario_id,
+                "habito_id": habitos[i % n_habitos].id,
+                "titulo": f"tarefa {i}",
+                "status": "concluida" if i % 4 == 0 else "fazendo",
+                "progresso": Decimal(i % 100),
+            }
+            for i in range(n_tarefas)
+        ]
+    )
+    reconstruir_objetivo_stats(db, objetivo_id=objetivo.id)
+    db.commit()
+    return objetivo.id
+
+
+def remover_dados(db, usuario_id: str) -> None:
+    db.execute(delete(Tarefa).where(Tarefa.usuario_id == usuario_id))
+    db.execute(delete(Habito).where(Habito.usuario_id == usuario_id))
+    db.execute(delete(ObjetivoStats).where(ObjetivoStats.usuario_id == usuario_id))
+    db.execute(delete(Objetivo).where(Objetivo.usuario_id == usuario_id))
+    db.commit()
+
+
+def medir(funcao, db, objetivo_id: str, repeticoes: int):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(db, objetivo_id)
+        tempos.append(time.perf_counter() - inicio)
+        db.expire_all()
+    return statistics.median(tempos) * 1000, max(tempos) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do recálculo de progresso de objetivos")
+    parser.add_argument("--database-url", default=settings.database_url)
+    parser.add_argument("--habitos", type=int, default=20)
+    parser.add_argument("--tarefas", type=int, default=10000)
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(bind=engine, tables=[ObjetivoStats.__table__])
+    db = sessionmaker(bind=engine, autoflush=False)()
+    usuario_id = str(uuid.uuid4())
+
+    try:
+        print(f"🔧 Criando objetivo com {args.habitos} hábitos e {args.tarefas} tarefas...")
+        objetivo_id = criar_dados(db, usuario_id, args.habitos, args.tarefas)
+
+        recalcular_progresso_objetivo_completo(db, objetivo_id)
+        esperado = db.get(Objetivo, objetivo_id).progresso
+        recalcular_progresso_objetivo(db, objetivo_id)
+        db.expire_all()
+        obtido = db.get(Objetivo, objetivo_id).progresso
+        print(f"   progresso completo={esperado} delta={obtido}")
+
+        completo_p50, completo_max = medir(recalcular_progresso_objetivo_completo, db, objetivo_id, args.repeticoes)
+        delta_p50, delta_max = medir(recalcular_progresso_objetivo, db, objetivo_id, args.repeticoes)
+
+        print(f"\n🚀 Recálculo de progresso ({args.repeticoes} repetições)")
+        print(f"{'caminho':>10} {'p50 (ms)':>10} {'max (ms)':>10}")
+        print(f"{'completo':>10} {completo_p50:>10.2f} {completo_max:>10.2f}")
+        print(f"{'delta':>10} {delta_p50:>10.2f} {delta_max:>10.2f}   (x{completo_p50 / delta_p50:.1f})")
+    finally:
+        remover_dados(db, usuario_id)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark das respostas de listagem: DataResponse x FastJSONResponse.
+
+Monta uma aplicação FastAPI mínima (sem banco de dados) com rotas
+response_model=DataResponse que devolvem páginas de 100 itens via
+resposta_lista(), alternando settings.fast_json_responses:
+
+  - objetivos: dicts com Decimal, date e datetime (como listar_objetivos)
+  - tarefas:   dicts já serializados pelo registro (camelCase)
+
+Mede latência média (httpx.ASGITransport, em processo) e CPU por
+requisição, e confere que o JSON retornado é idêntico nos dois caminhos.
+
+Uso:
+    python benchmark_respostas.py
+    python benchmark_respostas.py --requisicoes 5000 --itens 100
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, date, timedelta
+from decimal import Decimal
+
+import httpx
+from fastapi import FastAPI
+
+from app.core.config import settings
+from app.models import Tarefa
+from app.schemas.base import DataResponse, PaginationResponse
+from app.utils.responses import resposta_lista
+from app.utils.serialization import serialize_tarefas
+
+
+def criar_objetivos(n: int):
+    agora = datetime(2025, 1, 1, 12, 0, 0)
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "usuario_id": "usuario-bench",
+            "titulo": f"objetivo {i}",
+            "descricao": "descrição " * 5,
+            "inicio": date(2025, 1, 1),
+            "fim": date(2025, 12, 31) if i % 2 else None,
+            "status": "ativo",
+            "progresso": Decimal(i % 101).quantize(Decimal("0.01")),
+            "cor": "#3b82f6",
+            "icone": "target",
+            "created_at": agora + timedelta(seconds=i),
+            "updated_at": agora + timedelta(seconds=i),
+            "total_habitos": i % 7,
+            "habitos_ativos": i % 5,
+            "total_tarefas": i % 11,
+            "tarefas_concluidas": i % 3,
+            "progresso_medio_habitos": Decimal("33.333333"),
+            "progresso_medio_tarefas": Decimal("0.000000"),
+        }
+        for i in range(n)
+    ]
+
+
+def criar_tarefas(n: int):
+    agora = datetime(2025, 1, 1, 12, 0, 0)
+    return serialize_tarefas([
+        Tarefa(
+            id=str(uuid.uuid4()), usuario_id="usuario-bench", habito_id=f"habito-{i % 20}",
+            titulo=f"tarefa {i}", descricao=None, prioridade="media", status="fazendo",
+            estimativa_horas=Decimal("2.50"), horas_gastas=Decimal("1.25"), prazo=date(2025, 3, 1),
+            progresso=Decimal("50.00"), posicao=i, tags=["bench"], anexos=None,
+            created_at=agora, updated_at=agora,
+        )
+        for i in range(n)
+    ])
+
+
+def criar_app(itens: int) -> FastAPI:
+    app = FastAPI()
+    objetivos = criar_objetivos(itens)
+    tarefas = criar_tarefas(itens)
+    pagination = PaginationResponse(page=1, limit=itens, total=itens * 3, total_pages=3, has_next=True, has_prev=False)
+
+    @app.get("/objetivos", response_model=DataResponse)
+    async def listar_objetivos():
+        return resposta_lista(objetivos, pagination)
+
+    @app.get("/tarefas", response_model=DataResponse)
+    async def listar_tarefas():
+        return resposta_lista(tarefas, pagination)
+
+    return app
+
+
+async def medir(client: httpx.AsyncClient, rota: str, requisicoes: int):
+    """(latência média µs, CPU média µs) por requisição"""
+    for _ in range(min(50, requisicoes)):
+        await client.get(rota)
+
+    inicio, inicio_cpu = time.perf_counter(), time.process_time()
+    for _ in range(requisicoes):
+        await client.get(rota)
+    latencia = (time.perf_counter() - inicio) / requisicoes * 1_000_000
+    cpu = (time.process_time() - inicio_cpu) / requisicoes * 1_000_000
+    return latencia, cpu
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="DataResponse x FastJSONResponse")
+    parser.add_argument("--requisicoes", type=int, default=2000)
+    parser.add_argument("--itens", type=int, default=100)
+    args = parser.parse_args()
+
+    app = criar_app(args.itens)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # O JSON deve ser idêntico nos dois caminhos
+        for rota in ("/objetivos", "/tarefas"):
+            settings.fast_json_responses = False
+            padrao = (await client.get(rota)).json()
+            settings.fast_json_responses = True
+            rapido = (await client.get(rota)).json()
+            assert padrao == rapido, f"JSON divergente em {rota}"
+
+        print(f"páginas de {args.itens} itens, {args.requisicoes} requisições")
+        print(f"{'rota':<12} {'caminho':<10} {'latência (µs)':>14} {'CPU (µs)':>10}")
+        for rota in ("/objetivos", "/tarefas"):
+            resultados = {}
+            for nome, rapido in (("padrão", False), ("orjson", True)):
+                settings.fast_json_responses = rapido
+                resultados[nome] = await medir(client, rota, args.requisicoes)
+                latencia, cpu = resultados[nome]
+                print(f"{rota:<12} {nome:<10} {latencia:>14.1f} {cpu:>10.1f}")
+            delta_lat = resultados["orjson"][0] - resultados["padrão"][0]
+            delta_cpu = resultados["orjson"][1] - resultados["padrão"][1]
+            print(f"{rota:<12} {'delta':<10} {delta_lat:>14.1f} {delta_cpu:>10.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
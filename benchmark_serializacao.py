@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Microbenchmark da serialização de listas de tarefas.
+
+Monta N instâncias de Tarefa em memória (padrão 10.000, sem banco de dados)
+e compara, por página completa:
+
+  - reflexivo: implementação anterior de serialize_model (class_mapper e
+    cadeia de isinstance a cada linha)
+  - registro:  serialize_models com o serializador pré-montado por modelo
+  - pydantic:  implementação anterior de serialize_tarefas
+    (TarefaResponse.model_validate + model_dump, camelCase)
+  - camel:     serialize_tarefas com o serializador camelCase do registro
+  - linhas:    serialize_tarefas_linhas sobre tuplas Core (sem objetos ORM)
+
+Também confere que as saídas equivalem às das implementações anteriores.
+
+Uso:
+    python benchmark_serializacao.py
+    python benchmark_serializacao.py --linhas 10000 --repeticoes 20
+"""
+import argparse
+import json
+import statistics
+import time
+import uuid
+from datetime import datetime, date, timedelta
+from decimal import Decimal
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import class_mapper
+
+from app.models import Tarefa
+from app.schemas.tarefa import TarefaResponse
+from app.utils.serialization import serialize_models, serialize_tarefas, serialize_tarefas_linhas, colunas_modelo
+
+
+def serialize_model_reflexivo(model_instance):
+    """serialize_model antes do registro de serializadores"""
+    if model_instance is None:
+        return None
+    mapper = class_mapper(model_instance.__class__)
+    columns = [column.key for column in mapper.columns]
+    result = {}
+    for column in columns:
+        value = getattr(model_instance, column, None)
+        if isinstance(value, datetime):
+            result[column] = value.isoformat()
+        elif isinstance(value, date):
+            result[column] = value.isoformat()
+        elif isinstance(value, Decimal):
+            result[column] = float(value)
+        else:
+            result[column] = value
+    return result
+
+
+def serialize_tarefa_pydantic(tarefa):
+    """serialize_tarefa antes do registro de serializadores"""
+    return TarefaResponse.model_validate(tarefa).model_dump(by_alias=True, exclude_none=False)
+
+
+def criar_tarefas(n: int):
+    agora = datetime(2025, 1, 1, 12, 0, 0)
+    status = ("backlog", "a_fazer", "fazendo", "bloqueada", "concluida")
+    return [
+        Tarefa(
+            id=str(uuid.uuid4()),
+            usuario_id="usuario-bench",
+            habito_id=f"habito-{i % 20}",
+            titulo=f"tarefa {i}",
+            descricao="descrição " * 5 if i % 3 else None,
+            prioridade=("baixa", "media", "alta")[i % 3],
+            status=status[i % 5],
+            estimativa_horas=Decimal("2.50") if i % 2 else None,
+            horas_gastas=Decimal("1.25"),
+            prazo=date(2025, 1, 1) + timedelta(days=i % 90) if i % 4 else None,
+            progresso=Decimal(i % 101).quantize(Decimal("0.01")),
+            posicao=i,
+            tags=["bench", f"t{i % 7}"],
+            anexos=None,
+            created_at=agora + timedelta(seconds=i),
+            updated_at=agora + timedelta(seconds=i),
+        )
+        for i in range(n)
+    ]
+
+
+def medir(funcao, repeticoes: int) -> float:
+    """Mediana do tempo (ms) de uma chamada"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmark de serialização de tarefas")
+    parser.add_argument("--linhas", type=int, default=10000)
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args()
+
+    tarefas = criar_tarefas(args.linhas)
+    chaves = [coluna.key for coluna in colunas_modelo(Tarefa)]
+    linhas = [tuple(getattr(t, chave) for chave in chaves) for t in tarefas]
+
+    # Mesmo conteúdo das implementações anteriores (o JSON byte a byte da
+    # resposta é verificado em test_serializacao_tarefas.py)
+    assert serialize_models(tarefas) == [serialize_model_reflexivo(t) for t in tarefas]
+    assert json.dumps(jsonable_encoder(serialize_tarefas(tarefas))) == json.dumps(
+        jsonable_encoder([serialize_tarefa_pydantic(t) for t in tarefas])
+    )
+    assert serialize_tarefas_linhas(linhas) == serialize_tarefas(tarefas)
+
+    cenarios = [
+        ("reflexivo", lambda: [serialize_model_reflexivo(t) for t in tarefas]),
+        ("registro", lambda: serialize_models(tarefas)),
+        ("pydantic", lambda: [serialize_tarefa_pydantic(t) for t in tarefas]),
+        ("camel", lambda: serialize_tarefas(tarefas)),
+        ("linhas", lambda: serialize_tarefas_linhas(linhas)),
+    ]
+
+    print(f"{args.linhas} tarefas, mediana de {args.repeticoes} execuções")
+    resultados = {}
+    for nome, funcao in cenarios:
+        resultados[nome] = medir(funcao, args.repeticoes)
+        por_linha = resultados[nome] * 1000 / args.linhas
+        print(f"   {nome:<10} {resultados[nome]:>9.1f} ms   ({por_linha:.2f} µs/linha)")
+
+    print(f"   snake_case: {resultados['reflexivo'] / resultados['registro']:.1f}x mais rápido")
+    print(f"   camelCase:  {resultados['pydantic'] / resultados['camel']:.1f}x mais rápido")
+
+
+if __name__ == "__main__":
+    main()
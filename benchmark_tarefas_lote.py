@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark das rotas de tarefas em lote.
+Compara N chamadas individuais (POST /tarefas e PUT /tarefas/{id}) com uma
+única chamada em lote (POST e PATCH /tarefas/bulk) e mede a vazão em
+tarefas/s de cada modo.
+
+Cria um objetivo e um hábito temporários pela API e os remove no final
+(as tarefas são removidas junto com o objetivo).
+
+Uso (com o servidor rodando):
+    python benchmark_tarefas_lote.py --email teste@goalmanager.com --senha password
+    python benchmark_tarefas_lote.py --tarefas 100 200 500
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+
+async def obter_token(client: httpx.AsyncClient, email: str, senha: str) -> str:
+    response = await client.post("/api/v1/auth/login", json={"email": email, "password": senha})
+    response.raise_for_status()
+    return response.json()["data"]["access_token"]
+
+
+async def criar_estrutura(client: httpx.AsyncClient, headers: dict):
+    """(objetivo_id, habito_id) temporários para as tarefas do benchmark"""
+    response = await client.post(
+        "/api/v1/objetivos", headers=headers, json={"titulo": "Benchmark tarefas em lote"}
+    )
+    response.raise_for_status()
+    objetivo_id = response.json()["data"]["id"]
+    response = await client.post("/api/v1/habitos", headers=headers, json={
+        "objetivo_id": objetivo_id, "titulo": "Benchmark tarefas em lote",
+        "frequencia": "diario", "alvo_por_periodo": 1
+    })
+    response.raise_for_status()
+    return objetivo_id, response.json()["data"]["id"]
+
+
+async def medir(chamadas) -> float:
+    """Executa as chamadas em sequência e retorna a duração em segundos"""
+    inicio = time.perf_counter()
+    for chamada in chamadas:
+        response = await chamada()
+        response.raise_for_status()
+    return time.perf_counter() - inicio
+
+
+async def executar_tamanho(client: httpx.AsyncClient, headers: dict, habito_id: str, total: int):
+    """Tempos (criar individual, criar em lote, atualizar individual, atualizar em lote)"""
+    itens = [{"habito_id": habito_id, "titulo": f"Tarefa {i}"} for i in range(total)]
+    ids = []
+
+    async def criar(item):
+        response = await client.post("/api/v1/tarefas", headers=headers, json=item)
+        ids.append(response.json()["data"]["id"])
+        return response
+
+    criar_individual = await medir([lambda item=item: criar(item) for item in itens])
+
+    async def criar_lote():
+        response = await client.post("/api/v1/tarefas/bulk", headers=headers, json={"tarefas": itens})
+        ids_lote.extend(r["id"] for r in response.json()["data"]["resultados"])
+        return response
+
+    ids_lote = []
+    criar_em_lote = await medir([criar_lote])
+
+    atualizar_individual = await medir([
+        lambda tarefa_id=tarefa_id, posicao=posicao: client.put(
+            f"/api/v1/tarefas/{tarefa_id}", headers=headers, json={"status": "fazendo", "posicao": posicao}
+        )
+        for posicao, tarefa_id in enumerate(ids)
+    ])
+
+    alteracoes = [{"id": tarefa_id, "status": "fazendo", "posicao": posicao} for posicao, tarefa_id in enumerate(ids_lote)]
+    atualizar_em_lote = await medir([
+        lambda: client.patch("/api/v1/tarefas/bulk", headers=headers, json={"tarefas": alteracoes})
+    ])
+
+    return criar_individual, criar_em_lote, atualizar_individual, atualizar_em_lote
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark de tarefas em lote")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--email", default="teste@goalmanager.com")
+    parser.add_argument("--senha", default="password")
+    parser.add_argument("--token", default=None, help="Token JWT (dispensa login)")
+    parser.add_argument("--tarefas", type=int, nargs="+", default=[10, 100, 500], help="Tamanhos de lote (máx. 500)")
+    args = parser.parse_args()
+
+    async with httpx.AsyncClient(base_url=args.url, timeout=120) as client:
+        token = args.token or await obter_token(client, args.email, args.senha)
+        headers = {"Authorization": f"Bearer {token}"}
+        objetivo_id, habito_id = await criar_estrutura(client, headers)
+
+        try:
+            print("🚀 Benchmark de tarefas em lote (tarefas/s)")
+            print(f"{'tarefas':>8} {'POST x N':>10} {'POST bulk':>10} {'PUT x N':>10} {'PATCH bulk':>11}")
+            for total in args.tarefas:
+                tempos = await executar_tamanho(client, headers, habito_id, total)
+                vazoes = [total / tempo for tempo in tempos]
+                print(
+                    f"{total:>8} {vazoes[0]:>10.1f} {vazoes[1]:>10.1f} {vazoes[2]:>10.1f} {vazoes[3]:>11.1f}"
+                    f"   (criar x{vazoes[1] / vazoes[0]:.1f}, atualizar x{vazoes[3] / vazoes[2]:.1f})"
+                )
+        finally:
+            await client.delete(f"/api/v1/objetivos/{objetivo_id}", headers=headers)
+            print("\n🧹 Objetivo de teste removido")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,50 @@
+"""
+Fixtures compartilhadas dos testes que rodam sem o MySQL
+
+banco_sqlite cria um arquivo SQLite em tmp_path com todas as tabelas,
+preenchido pela função `popular(db)` de cada módulo de teste, e devolve um
+TestClient da aplicação ligado a ele: database.AsyncSessionLocal (usado por
+get_async_db e pelas sessões próprias de streams e tarefas em segundo plano)
+passa a apontar para o arquivo e get_current_user devolve USUARIO.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from app.core import database
+from app.core.database import Base
+from app.main import app
+from app.services.auth import get_current_user
+
+USUARIO = {"sub": "u-1", "email": "usuario@exemplo.com", "nome": "Usuário"}
+
+@pytest.fixture
+def banco_sqlite(tmp_path, monkeypatch):
+    """Fábrica: banco_sqlite(popular) -> TestClient com os dados de `popular`"""
+    caminho = tmp_path / "teste.sqlite"
+
+    def criar_client(popular) -> TestClient:
+        engine = create_engine(f"sqlite:///{caminho}")
+        Base.metadata.create_all(engine)
+        with Session(engine) as db:
+            popular(db)
+            db.commit()
+        engine.dispose()
+
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{caminho}", poolclass=NullPool)
+        monkeypatch.setattr(
+            database, "AsyncSessionLocal",
+            async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+        )
+
+        async def usuario_teste():
+            return USUARIO
+
+        app.dependency_overrides[get_current_user] = usuario_teste
+        return TestClient(app)
+
+    yield criar_client
+    app.dependency_overrides.clear()
@@ -0,0 +1,12 @@
+-- Indices compostos do feed de atividades (/dashboard/recent-activity)
+-- Execute este SQL no MySQL em bancos ja existentes
+-- (bancos novos recebem os indices via Base.metadata.create_all)
+--
+-- Cada ramo do feed (realizacoes, tarefas concluidas, mudancas de status de
+-- objetivos no audit_log) le as linhas mais recentes do usuario a partir do
+-- cursor (created_at/concluida_em, id) diretamente pelo indice.
+-- tarefas.concluida_em vem da migracao 0005_tarefas_concluida_em.
+
+CREATE INDEX ix_habito_realizacoes_usuario_created_at_id ON habito_realizacoes (usuario_id, created_at, id);
+CREATE INDEX ix_tarefas_usuario_status_concluida_em_id ON tarefas (usuario_id, status, concluida_em, id);
+CREATE INDEX ix_audit_log_usuario_tabela_created_at_id ON audit_log (usuario_id, tabela, created_at, id);
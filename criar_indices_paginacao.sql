@@ -0,0 +1,41 @@
+-- Indices compostos para paginacao keyset (cursor)
+-- Execute este SQL no MySQL em bancos ja existentes
+-- (bancos novos recebem os indices via Base.metadata.create_all)
+--
+-- Cada indice cobre (usuario_id, coluna de ordenacao, id), permitindo que
+-- a pagina seguinte seja lida diretamente a partir do cursor, sem filesort
+-- e sem percorrer as linhas puladas pelo OFFSET.
+
+-- OBJETIVOS
+CREATE INDEX ix_objetivos_usuario_created_at_id ON objetivos (usuario_id, created_at, id);
+CREATE INDEX ix_objetivos_usuario_updated_at_id ON objetivos (usuario_id, updated_at, id);
+CREATE INDEX ix_objetivos_usuario_titulo_id ON objetivos (usuario_id, titulo, id);
+CREATE INDEX ix_objetivos_usuario_progresso_id ON objetivos (usuario_id, progresso, id);
+CREATE INDEX ix_objetivos_usuario_inicio_id ON objetivos (usuario_id, inicio, id);
+CREATE INDEX ix_objetivos_usuario_fim_id ON objetivos (usuario_id, fim, id);
+
+-- HABITOS
+CREATE INDEX ix_habitos_usuario_created_at_id ON habitos (usuario_id, created_at, id);
+CREATE INDEX ix_habitos_usuario_updated_at_id ON habitos (usuario_id, updated_at, id);
+CREATE INDEX ix_habitos_usuario_titulo_id ON habitos (usuario_id, titulo, id);
+CREATE INDEX ix_habitos_usuario_progresso_id ON habitos (usuario_id, progresso, id);
+CREATE INDEX ix_habitos_usuario_objetivo_created_at_id ON habitos (usuario_id, objetivo_id, created_at, id);
+
+-- TAREFAS
+CREATE INDEX ix_tarefas_usuario_created_at_id ON tarefas (usuario_id, created_at, id);
+CREATE INDEX ix_tarefas_usuario_updated_at_id ON tarefas (usuario_id, updated_at, id);
+CREATE INDEX ix_tarefas_usuario_titulo_id ON tarefas (usuario_id, titulo, id);
+CREATE INDEX ix_tarefas_usuario_prioridade_id ON tarefas (usuario_id, prioridade, id);
+CREATE INDEX ix_tarefas_usuario_progresso_id ON tarefas (usuario_id, progresso, id);
+CREATE INDEX ix_tarefas_usuario_prazo_id ON tarefas (usuario_id, prazo, id);
+CREATE INDEX ix_tarefas_usuario_posicao_id ON tarefas (usuario_id, posicao, id);
+CREATE INDEX ix_tarefas_usuario_habito_created_at_id ON tarefas (usuario_id, habito_id, created_at, id);
+
+-- Conferir os indices criados
+SELECT TABLE_NAME, INDEX_NAME, GROUP_CONCAT(COLUMN_NAME ORDER BY SEQ_IN_INDEX) AS columns
+FROM INFORMATION_SCHEMA.STATISTICS
+WHERE TABLE_SCHEMA = DATABASE()
+AND TABLE_NAME IN ('objetivos', 'habitos', 'tarefas')
+AND INDEX_NAME LIKE 'ix_%_usuario_%'
+GROUP BY TABLE_NAME, INDEX_NAME
+ORDER BY TABLE_NAME, INDEX_NAME;
@@ -0,0 +1,21 @@
+-- Tabela de estatisticas por objetivo (objetivo_stats)
+-- Execute este SQL no MySQL em bancos ja existentes e em seguida
+--     python objetivo_stats.py reconstruir
+-- (bancos novos recebem a tabela via Base.metadata.create_all; com alembic,
+-- a migracao 0006_objetivo_stats cria e preenche a tabela)
+--
+-- A tabela e mantida incrementalmente pela API (app/services/estatisticas.py)
+-- e substitui o GROUP BY sobre objetivos x habitos x tarefas da listagem.
+
+CREATE TABLE IF NOT EXISTS objetivo_stats (
+    objetivo_id VARCHAR(36) NOT NULL PRIMARY KEY,
+    usuario_id VARCHAR(36) NOT NULL,
+    total_habitos INT NOT NULL DEFAULT 0,
+    habitos_ativos INT NOT NULL DEFAULT 0,
+    soma_progresso_habitos DECIMAL(14,2) NOT NULL DEFAULT 0.00,
+    total_tarefas INT NOT NULL DEFAULT 0,
+    tarefas_concluidas INT NOT NULL DEFAULT 0,
+    soma_progresso_tarefas DECIMAL(14,2) NOT NULL DEFAULT 0.00,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX ix_objetivo_stats_usuario_id (usuario_id)
+);
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Limpeza dos tombstones da sincronização (tabela registros_excluidos).
+
+Remove os registros mais antigos que settings.sync_tombstone_retention_days,
+em blocos por chave primária, com um commit por bloco. O limite é calculado
+com o relógio do banco (o mesmo de excluido_em e do limite usado por
+GET /sync), não com o relógio do host do script. Clientes com cursor
+mais antigo que a retenção recebem a carga completa em GET /sync, então os
+tombstones removidos não fazem falta.
+
+    python limpar_registros_excluidos.py                  # retenção da configuração
+    python limpar_registros_excluidos.py --dias 30 --lote 10000
+
+Indicado para execução noturna (cron).
+"""
+import argparse
+import sys
+import time
+from datetime import timedelta
+
+from sqlalchemy import delete, func, select
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import RegistroExcluido
+
+
+def limpar(dias: int, tamanho_lote: int) -> int:
+    db = SessionLocal()
+    inicio = time.perf_counter()
+    total = 0
+    try:
+        limite = db.execute(select(func.now())).scalar() - timedelta(days=dias)
+        while True:
+            ids = db.execute(
+                select(RegistroExcluido.id)
+                .where(RegistroExcluido.excluido_em < limite)
+                .limit(tamanho_lote)
+            ).scalars().all()
+            if not ids:
+                break
+            db.execute(delete(RegistroExcluido).where(RegistroExcluido.id.in_(ids)))
+            db.commit()
+            total += len(ids)
+            print(f"   {total} tombstones removidos...")
+            if len(ids) < tamanho_lote:
+                break
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Erro ao limpar registros excluídos: {e}")
+        return 2
+    finally:
+        db.close()
+
+    duracao = time.perf_counter() - inicio
+    print(f"✅ {total} tombstones anteriores a {limite:%Y-%m-%d %H:%M} removidos em {duracao:.1f}s")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Limpeza dos tombstones da sincronização")
+    parser.add_argument("--dias", type=int, default=settings.sync_tombstone_retention_days,
+                        help="Retenção em dias (padrão: SYNC_TOMBSTONE_RETENTION_DAYS)")
+    parser.add_argument("--lote", type=int, default=settings.delete_chunk_size, help="Registros por lote/transação")
+    args = parser.parse_args()
+
+    print("🧹 Limpando registros excluídos...")
+    sys.exit(limpar(args.dias, args.lote))
+
+
+if __name__ == "__main__":
+    main()
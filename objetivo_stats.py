@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Manutenção da tabela objetivo_stats (estatísticas por objetivo).
+
+    python objetivo_stats.py verificar               # lista divergências
+    python objetivo_stats.py verificar --usuario ID
+    python objetivo_stats.py reconstruir             # recalcula tudo do zero
+    python objetivo_stats.py reconstruir --usuario ID
+
+Use `reconstruir` após criar a tabela em um banco existente sem alembic
+(`alembic upgrade head` já a preenche) ou se `verificar` apontar divergências. O código de saída de `verificar` é 1
+quando há divergências, permitindo o uso em cron/CI.
+"""
+import argparse
+import sys
+
+from app.core.database import SessionLocal, engine
+from app.models import ObjetivoStats
+from app.services.estatisticas import reconstruir_objetivo_stats, verificar_objetivo_stats
+
+
+def reconstruir(usuario_id=None) -> int:
+    ObjetivoStats.__table__.create(bind=engine, checkfirst=True)
+    db = SessionLocal()
+    try:
+        linhas = reconstruir_objetivo_stats(db, usuario_id=usuario_id)
+        db.commit()
+        print(f"✅ objetivo_stats reconstruída: {linhas} objetivos")
+        return 0
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Erro ao reconstruir objetivo_stats: {e}")
+        return 2
+    finally:
+        db.close()
+
+
+def verificar(usuario_id=None) -> int:
+    db = SessionLocal()
+    try:
+        divergencias = verificar_objetivo_stats(db, usuario_id=usuario_id)
+    finally:
+        db.close()
+
+    if not divergencias:
+        print("✅ objetivo_stats consistente")
+        return 0
+
+    print(f"⚠️  {len(divergencias)} objetivos com divergência:")
+    for d in divergencias:
+        print(f"   {d['objetivo_id']}: {d['problema']}")
+        for campo, valores in d.get("campos", {}).items():
+            print(f"      {campo}: armazenado={valores['armazenado']} esperado={valores['esperado']}")
+    print("   Execute `python objetivo_stats.py reconstruir` para corrigir")
+    return 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manutenção da tabela objetivo_stats")
+    parser.add_argument("comando", choices=["verificar", "reconstruir"])
+    parser.add_argument("--usuario", default=None, help="Restringe a um usuário")
+    args = parser.parse_args()
+
+    if args.comando == "reconstruir":
+        sys.exit(reconstruir(args.usuario))
+    sys.exit(verificar(args.usuario))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Recálculo administrativo de progressos (hábitos, objetivo_stats e objetivos).
+
+Usa o recálculo set-based de app/services/progress.py: poucas instruções
+UPDATE ... JOIN por lote de usuários, com um commit por lote.
+
+    python recalcular_progressos.py --todos                 # banco inteiro, lotes de 500 usuários
+    python recalcular_progressos.py --todos --lote 1000
+    python recalcular_progressos.py --usuario ID [--usuario ID2 ...]
+
+Indicado para reparos noturnos (cron) após importações ou correções manuais.
+"""
+import argparse
+import sys
+import time
+
+from sqlalchemy import select, union
+
+from app.core.database import SessionLocal
+from app.models import Objetivo, Habito
+from app.services.progress import aplicar_progressos_em_lote
+
+
+def lotes_de_usuarios(db, tamanho: int):
+    """Percorre os usuario_id com dados (hábitos/objetivos) em lotes ordenados (keyset)"""
+    ids = union(select(Objetivo.usuario_id), select(Habito.usuario_id)).subquery()
+    ultimo = None
+    while True:
+        query = select(ids.c.usuario_id).order_by(ids.c.usuario_id).limit(tamanho)
+        if ultimo is not None:
+            query = query.where(ids.c.usuario_id > ultimo)
+        lote = db.execute(query).scalars().all()
+        if not lote:
+            return
+        yield lote
+        ultimo = lote[-1]
+
+
+def recalcular(usuario_ids, tamanho_lote: int) -> int:
+    db = SessionLocal()
+    inicio = time.perf_counter()
+    totais = {"usuarios": 0, "habitos": 0, "objetivos": 0}
+    try:
+        lotes = [usuario_ids] if usuario_ids else lotes_de_usuarios(db, tamanho_lote)
+        for numero, lote in enumerate(lotes, start=1):
+            alterados = aplicar_progressos_em_lote(db, lote)
+            db.commit()
+
+            totais["usuarios"] += len(lote)
+            totais["habitos"] += alterados["habitos"]
+            totais["objetivos"] += alterados["objetivos"]
+            print(
+                f"   lote {numero}: {len(lote)} usuários | "
+                f"{alterados['habitos']} hábitos e {alterados['objetivos']} objetivos alterados"
+            )
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Erro ao recalcular progressos: {e}")
+        return 2
+    finally:
+        db.close()
+
+    duracao = time.perf_counter() - inicio
+    print(
+        f"✅ {totais['usuarios']} usuários em {duracao:.1f}s | "
+        f"{totais['habitos']} hábitos e {totais['objetivos']} objetivos alterados"
+    )
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recálculo set-based de progressos")
+    grupo = parser.add_mutually_exclusive_group(required=True)
+    grupo.add_argument("--todos", action="store_true", help="Todos os usuários, em lotes")
+    grupo.add_argument("--usuario", action="append", help="ID do usuário (pode repetir)")
+    parser.add_argument("--lote", type=int, default=500, help="Usuários por lote/transação")
+    args = parser.parse_args()
+
+    print("🔧 Recalculando progressos...")
+    sys.exit(recalcular(args.usuario, args.lote))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Teste de regressão do feed /dashboard/recent-activity
+
+Garante que o feed é montado em uma única consulta (cabeçalho X-DB-Queries),
+independente do limit, e que a paginação por cursor percorre todas as
+atividades (realizações de hábitos, tarefas concluídas e mudanças de status
+de objetivos) em ordem decrescente de data, sem repetições. Tarefas
+concluídas entram pela data de conclusão: editar ou reordenar no kanban uma
+tarefa já concluída não a move no feed.
+
+Não precisa do servidor nem do MySQL (usa SQLite via aiosqlite):
+    python -m pytest -q test_atividade_recente.py
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.metrics import HEADER_CONSULTAS
+from app.models import AuditLog, Habito, HabitoRealizacao, Objetivo, Tarefa
+
+REALIZACOES = 12
+TAREFAS_CONCLUIDAS = 6
+MUDANCAS_STATUS = 4
+TOTAL_ATIVIDADES = REALIZACOES + TAREFAS_CONCLUIDAS + MUDANCAS_STATUS
+
+def popular(db):
+    """Feed do usuário u-1 (e dados de outro usuário, que não podem aparecer)"""
+    inicio = datetime(2025, 1, 1, 8, 0, 0)
+    db.add(Objetivo(id="o-1", usuario_id="u-1", titulo="Saúde", status="em_andamento"))
+    db.add(Habito(
+        id="h-1", usuario_id="u-1", objetivo_id="o-1", titulo="Correr",
+        frequencia="diario", alvo_por_periodo=1, status="ativo"
+    ))
+    # Outro usuário (não pode aparecer no feed)
+    db.add(Habito(
+        id="h-2", usuario_id="u-2", objetivo_id="o-2", titulo="Ler",
+        frequencia="diario", alvo_por_periodo=1, status="ativo"
+    ))
+    db.add(HabitoRealizacao(habito_id="h-2", usuario_id="u-2", data_realizacao=inicio.date(), created_at=inicio))
+
+    for i in range(REALIZACOES):
+        db.add(HabitoRealizacao(
+            id=f"r-{i:02d}", habito_id="h-1", usuario_id="u-1",
+            data_realizacao=inicio.date(), created_at=inicio + timedelta(minutes=3 * i)
+        ))
+    for i in range(TAREFAS_CONCLUIDAS + 3):
+        momento = inicio + timedelta(minutes=3 * i + 1)
+        concluida = i < TAREFAS_CONCLUIDAS
+        db.add(Tarefa(
+            id=f"t-{i:02d}", usuario_id="u-1", habito_id="h-1", titulo=f"Tarefa {i}",
+            status="concluida" if concluida else "fazendo",
+            created_at=momento, updated_at=momento, concluida_em=momento if concluida else None
+        ))
+    for i in range(MUDANCAS_STATUS):
+        db.add(AuditLog(
+            id=f"a-{i:02d}", usuario_id="u-1", tabela="objetivos", registro_id="o-1", acao="UPDATE",
+            dados_antigos={"status": "planejado"}, dados_novos={"status": "em_andamento"},
+            created_at=inicio + timedelta(minutes=3 * i + 2)
+        ))
+    # Mesmo instante de uma realização: o desempate é pelo id
+    db.add(AuditLog(
+        id="a-99", usuario_id="u-1", tabela="objetivos", registro_id="o-1", acao="UPDATE",
+        dados_antigos={"titulo": "Antigo"}, dados_novos={"titulo": "Saúde"},
+        created_at=inicio
+    ))
+
+@pytest.fixture
+def client(banco_sqlite):
+    return banco_sqlite(popular)
+
+def test_consultas_constantes(client):
+    """Uma consulta por página, qualquer que seja o limit"""
+    for limit in (1, 5, 20, 100):
+        resposta = client.get("/api/v1/dashboard/recent-activity", params={"limit": limit})
+        assert resposta.status_code == 200, resposta.text
+        assert resposta.headers[HEADER_CONSULTAS] == "1", f"limit={limit}"
+        assert len(resposta.json()["data"]) == min(limit, TOTAL_ATIVIDADES)
+
+def test_paginacao_por_cursor(client):
+    """O cursor percorre o feed inteiro em ordem decrescente, sem repetições"""
+    atividades = []
+    cursor = None
+    while True:
+        params = {"limit": 5}
+        if cursor:
+            params["cursor"] = cursor
+        resposta = client.get("/api/v1/dashboard/recent-activity", params=params)
+        assert resposta.headers[HEADER_CONSULTAS] == "1"
+        corpo = resposta.json()
+        atividades.extend(corpo["data"])
+        cursor = corpo["pagination"]["next_cursor"]
+        if not corpo["pagination"]["has_next"]:
+            assert cursor is None
+            break
+
+    assert len(atividades) == TOTAL_ATIVIDADES
+    assert len({a["id"] for a in atividades}) == TOTAL_ATIVIDADES
+    chaves = [(a["data"], a["id"]) for a in atividades]
+    assert chaves == sorted(chaves, reverse=True)
+
+    tipos = [a["tipo"] for a in atividades]
+    assert tipos.count("habito_realizado") == REALIZACOES
+    assert tipos.count("tarefa_concluida") == TAREFAS_CONCLUIDAS
+    assert tipos.count("objetivo_status") == MUDANCAS_STATUS
+
+def test_formato_atividades(client):
+    atividades = client.get("/api/v1/dashboard/recent-activity", params={"limit": 100}).json()["data"]
+    por_tipo = {a["tipo"]: a for a in atividades}
+
+    realizacao = por_tipo["habito_realizado"]
+    assert realizacao["descricao"] == "Completou hábito: Correr"
+    assert realizacao["entidade"] == {"id": "h-1", "titulo": "Correr", "tipo": "habito"}
+
+    tarefa = por_tipo["tarefa_concluida"]
+    assert tarefa["descricao"].startswith("Concluiu tarefa: ")
+    assert tarefa["entidade"]["tipo"] == "tarefa"
+
+    objetivo = por_tipo["objetivo_status"]
+    assert objetivo["entidade"] == {"id": "o-1", "titulo": "Saúde", "tipo": "objetivo"}
+    assert (objetivo["status_anterior"], objetivo["status_novo"]) == ("planejado", "em_andamento")
+
+def test_edicao_de_tarefa_concluida(client):
+    """Editar, mover no quadro ou reenviar o status de uma tarefa concluída não muda o feed"""
+    def feed():
+        atividades = client.get("/api/v1/dashboard/recent-activity", params={"limit": 100}).json()["data"]
+        return [(a["id"], a["data"]) for a in atividades]
+
+    antes = feed()
+    resposta = client.patch("/api/v1/tarefas/bulk", json={"tarefas": [{"id": "t-00", "titulo": "Tarefa 0 revisada"}]})
+    assert resposta.status_code == 200, resposta.text
+    resposta = client.post("/api/v1/tarefas/t-01/move", json={"statusKanban": "feito"})
+    assert resposta.status_code == 200, resposta.text
+    resposta = client.patch("/api/v1/tarefas/t-02/status", params={"status_kanban": "feito"})
+    assert resposta.status_code == 200, resposta.text
+
+    assert feed() == antes
+
+def test_conclusao_entra_no_topo(client):
+    """Concluir uma tarefa a coloca no topo do feed; reabrir a remove"""
+    resposta = client.patch("/api/v1/tarefas/t-08/status", params={"status_kanban": "feito"})
+    assert resposta.status_code == 200, resposta.text
+    assert resposta.json()["data"]["concluida_em"] is not None
+    atividades = client.get("/api/v1/dashboard/recent-activity", params={"limit": 1}).json()["data"]
+    assert atividades[0]["id"] == "t-08"
+
+    resposta = client.patch("/api/v1/tarefas/bulk", json={"tarefas": [{"id": "t-08", "status": "fazendo"}]})
+    assert resposta.status_code == 200, resposta.text
+    assert resposta.json()["data"]["resultados"][0]["tarefa"]["concluida_em"] is None
+    atividades = client.get("/api/v1/dashboard/recent-activity", params={"limit": 100}).json()["data"]
+    assert "t-08" not in {a["id"] for a in atividades}
+
+def test_cursor_invalido(client):
+    resposta = client.get("/api/v1/dashboard/recent-activity", params={"cursor": "invalido"})
+    assert resposta.status_code == 400
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main(["-q", __file__]))
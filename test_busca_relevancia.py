@@ -0,0 +1,138 @@
+"""
+Teste de regressão da paginação por cursor com order_by=relevancia
+
+Com a busca FULLTEXT as linhas da listagem são (Entidade, relevancia): o
+cursor precisa ler a relevância da linha e o id da entidade. O MATCH ...
+AGAINST só existe no MySQL, então condicao_busca é trocada por uma
+relevância equivalente em SQLite (tamanho do título, com empates), montada
+da mesma forma (coluna rotulada "relevancia").
+
+O total estimado (with_total=estimate) da busca FULLTEXT é verificado com o
+MATCH real: a assinatura em cache não pode depender de compilar o SQL. Os
+totais em cache são limitados pelo max_size do LRU (uma entrada por
+consulta) e invalidar_totais descarta apenas os do usuário.
+
+Não precisa do servidor nem do MySQL (usa SQLite via aiosqlite):
+    python -m pytest -q test_busca_relevancia.py
+"""
+import asyncio
+
+import pytest
+from sqlalchemy import Float, func, select, type_coerce
+
+from app.api import objetivos as rotas_objetivos
+from app.api import tarefas as rotas_tarefas
+from app.core.config import settings
+from app.models import Habito, Objetivo, Tarefa
+from app.utils import pagination
+from app.utils.busca import ORDENACAO_RELEVANCIA, condicao_busca
+from app.utils.cache import TTLCache
+from app.utils.pagination import _total_estimado, invalidar_totais
+
+TITULOS = ["Ler", "Ler mais", "Ler livro", "Ler artigo", "Ler jornal", "Ler revista", "Ler um capítulo"]
+
+def popular(db):
+    """Objetivos e tarefas do usuário u-1 que casam com a busca "Ler" (e um que não casa)"""
+    db.add(Habito(
+        id="h-1", usuario_id="u-1", objetivo_id="o-00", titulo="Leitura",
+        frequencia="diario", alvo_por_periodo=1
+    ))
+    for i, titulo in enumerate(TITULOS):
+        db.add(Objetivo(id=f"o-{i:02d}", usuario_id="u-1", titulo=titulo))
+        db.add(Tarefa(id=f"t-{i:02d}", usuario_id="u-1", habito_id="h-1", titulo=titulo))
+    db.add(Objetivo(id="o-99", usuario_id="u-1", titulo="Correr"))
+    db.add(Tarefa(id="t-99", usuario_id="u-1", habito_id="h-1", titulo="Correr"))
+
+def condicao_busca_sqlite(modelo, busca):
+    relevancia = type_coerce(func.length(modelo.titulo), Float).label(ORDENACAO_RELEVANCIA)
+    return modelo.titulo.contains(busca), relevancia
+
+@pytest.fixture
+def client(banco_sqlite, monkeypatch):
+    monkeypatch.setattr(rotas_tarefas, "condicao_busca", condicao_busca_sqlite)
+    monkeypatch.setattr(rotas_objetivos, "condicao_busca", condicao_busca_sqlite)
+    return banco_sqlite(popular)
+
+def percorrer(client, rota, order_dir):
+    """Todas as páginas (limit=2) da busca ordenada por relevância"""
+    itens = []
+    cursor = None
+    while True:
+        params = {"busca": "Ler", "order_by": "relevancia", "order_dir": order_dir, "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        resposta = client.get(rota, params=params)
+        assert resposta.status_code == 200, resposta.text
+        corpo = resposta.json()
+        itens.extend(corpo["data"])
+        cursor = corpo["pagination"]["next_cursor"]
+        if not corpo["pagination"]["has_next"]:
+            return itens
+
+@pytest.mark.parametrize("rota", ["/api/v1/tarefas", "/api/v1/objetivos"])
+@pytest.mark.parametrize("order_dir", ["asc", "desc"])
+def test_paginacao_por_relevancia(client, rota, order_dir):
+    """O cursor percorre todos os resultados na ordem da relevância, sem repetições"""
+    itens = percorrer(client, rota, order_dir)
+
+    assert len(itens) == len(TITULOS)
+    assert len({item["id"] for item in itens}) == len(TITULOS)
+    chaves = [(len(item["titulo"]), item["id"]) for item in itens]
+    assert chaves == sorted(chaves, reverse=order_dir == "desc")
+
+class SessaoContadora:
+    """Sessão mínima para _total_estimado: conta os COUNT executados"""
+    def __init__(self):
+        self.consultas = 0
+
+    async def scalar(self, query):
+        self.consultas += 1
+        return 10 * self.consultas
+
+def test_total_estimado_fulltext(monkeypatch):
+    """O MATCH do MySQL não impede o cache do total; cada busca tem o seu"""
+    monkeypatch.setattr(settings, "fulltext_search", True)
+    db = SessaoContadora()
+
+    def query_total(busca):
+        condicao, _ = condicao_busca(Tarefa, busca)
+        return select(func.count(Tarefa.id)).where(Tarefa.usuario_id == "u-1", condicao)
+
+    async def executar():
+        return [
+            await _total_estimado(db, query_total(busca), "u-1")
+            for busca in ("ler livro", "ler livro", "ler artigo")
+        ]
+
+    invalidar_totais("u-1")
+    try:
+        assert asyncio.run(executar()) == [10, 10, 20]
+        assert db.consultas == 2
+    finally:
+        invalidar_totais("u-1")
+
+def test_totais_limitados(monkeypatch):
+    """Cada consulta ocupa uma entrada do LRU; a invalidação é por usuário"""
+    totais = TTLCache(max_size=3, ttl=60)
+    monkeypatch.setattr(pagination, "_totais_cache", totais)
+    monkeypatch.setattr(pagination, "_assinaturas_usuario", TTLCache(max_size=3, ttl=60))
+    db = SessaoContadora()
+
+    def query_total(titulo):
+        return select(func.count(Tarefa.id)).where(Tarefa.titulo == titulo)
+
+    async def executar(usuario_id, titulos):
+        return [await _total_estimado(db, query_total(titulo), usuario_id) for titulo in titulos]
+
+    asyncio.run(executar("u-1", ["a", "b", "c", "d"]))
+    asyncio.run(executar("u-2", ["a"]))
+    assert len(totais) == 3
+
+    invalidar_totais("u-1")
+    assert len(totais) == 1
+    consultas = db.consultas
+    asyncio.run(executar("u-2", ["a"]))
+    assert db.consultas == consultas
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main(["-q", __file__]))
@@ -0,0 +1,95 @@
+"""
+Teste de regressão dos contadores de tarefas de GET /dashboard/stats
+
+Os contadores backlog/fazendo/feitas seguem as colunas do kanban
+(app/services/kanban.py): a_fazer conta em backlog e bloqueada em fazendo,
+de modo que os três somam o total de tarefas do usuário.
+
+As realizações da última semana são recontadas a cada leitura, mesmo com o
+resto das estatísticas servido do snapshot em cache.
+
+Não precisa do servidor nem do MySQL (usa SQLite via aiosqlite):
+    python -m pytest -q test_dashboard.py
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import Habito, HabitoRealizacao, Objetivo, Tarefa
+from app.schemas.tarefa import StatusTarefa
+from app.services import dashboard
+from app.services.dashboard import cache_dashboard, invalidar_dashboard
+
+# Quantidade de tarefas por status (valores diferentes para distinguir os contadores)
+TAREFAS_POR_STATUS = {
+    StatusTarefa.BACKLOG: 1,
+    StatusTarefa.A_FAZER: 2,
+    StatusTarefa.FAZENDO: 3,
+    StatusTarefa.BLOQUEADA: 4,
+    StatusTarefa.CONCLUIDA: 5,
+}
+
+REALIZADA_EM = datetime(2025, 1, 1, 12, 0, 0)
+
+def popular(db):
+    """Tarefas do usuário u-1 em todos os status, uma realização (e uma tarefa de outro usuário)"""
+    db.add(Objetivo(id="o-1", usuario_id="u-1", titulo="Estudos"))
+    db.add(Habito(
+        id="h-1", usuario_id="u-1", objetivo_id="o-1", titulo="Ler",
+        frequencia="diario", alvo_por_periodo=1
+    ))
+    db.add(HabitoRealizacao(
+        id="r-1", habito_id="h-1", usuario_id="u-1",
+        data_realizacao=REALIZADA_EM.date(), created_at=REALIZADA_EM
+    ))
+    for status, quantidade in TAREFAS_POR_STATUS.items():
+        for i in range(quantidade):
+            db.add(Tarefa(
+                id=f"t-{status.value}-{i}", usuario_id="u-1", habito_id="h-1",
+                titulo=f"{status.value} {i}", status=status.value
+            ))
+    db.add(Tarefa(id="t-outro", usuario_id="u-2", habito_id="h-2", titulo="Outro", status="a_fazer"))
+
+@pytest.fixture
+def client(banco_sqlite):
+    # O snapshot é por processo: descarta o de outro teste do mesmo usuário
+    invalidar_dashboard("u-1")
+    yield banco_sqlite(popular)
+    invalidar_dashboard("u-1")
+
+def test_contadores_por_coluna(client):
+    resposta = client.get("/api/v1/dashboard/stats")
+    assert resposta.status_code == 200, resposta.text
+    estatisticas = resposta.json()["data"]
+
+    assert estatisticas["totais"]["tarefas"] == sum(TAREFAS_POR_STATUS.values())
+    assert estatisticas["tarefas"] == {"backlog": 1 + 2, "fazendo": 3 + 4, "feitas": 5}
+    assert sum(estatisticas["tarefas"].values()) == estatisticas["totais"]["tarefas"]
+
+def test_semana_fora_do_snapshot(client, monkeypatch):
+    """Com o snapshot em cache, a realização sai da contagem quando deixa a janela de 7 dias"""
+    relogio = {"agora": REALIZADA_EM + timedelta(days=1)}
+
+    class Relogio(datetime):
+        @classmethod
+        def utcnow(cls):
+            return relogio["agora"]
+
+    monkeypatch.setattr(dashboard, "datetime", Relogio)
+
+    def estatisticas():
+        resposta = client.get("/api/v1/dashboard/stats")
+        assert resposta.status_code == 200, resposta.text
+        return resposta.json()["data"]
+
+    assert estatisticas()["atividade"]["realizacoes_ultima_semana"] == 1
+
+    acertos = cache_dashboard.acertos
+    relogio["agora"] = REALIZADA_EM + timedelta(days=8)
+    dados = estatisticas()
+    assert cache_dashboard.acertos == acertos + 1
+    assert dados["atividade"]["realizacoes_ultima_semana"] == 0
+    assert dados["tarefas"]["feitas"] == TAREFAS_POR_STATUS[StatusTarefa.CONCLUIDA]
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main(["-q", __file__]))
@@ -0,0 +1,79 @@
+"""
+Teste de regressão da exclusão em cascata de objetivos (remover_objetivos)
+
+Com blocos pequenos (delete_chunk_size) os filhos são removidos com commit
+entre os blocos; uma falha no meio da exclusão não pode deixar objetivo_stats
+contando filhos que já saíram. Os tombstones da sincronização só são
+gravados para objetivos do usuário.
+
+Não precisa do servidor nem do MySQL (usa SQLite):
+    python -m pytest -q test_exclusao.py
+"""
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import Base
+from app.models import Habito, HabitoRealizacao, Objetivo, RegistroExcluido, Tarefa
+from app.services import exclusao
+from app.services.estatisticas import reconstruir_objetivo_stats, verificar_objetivo_stats
+
+TAREFAS = 5
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "delete_chunk_size", 2)
+    engine = create_engine(f"sqlite:///{tmp_path / 'teste.sqlite'}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as sessao:
+        sessao.add(Objetivo(id="o-1", usuario_id="u-1", titulo="Saúde"))
+        sessao.add(Objetivo(id="o-2", usuario_id="u-2", titulo="Leitura"))
+        sessao.add(Habito(
+            id="h-1", usuario_id="u-1", objetivo_id="o-1", titulo="Correr",
+            frequencia="diario", alvo_por_periodo=1, status="ativo"
+        ))
+        for i in range(TAREFAS):
+            sessao.add(Tarefa(
+                id=f"t-{i:02d}", usuario_id="u-1", habito_id="h-1", titulo=f"Tarefa {i}",
+                status="concluida" if i % 2 else "fazendo"
+            ))
+        sessao.add(HabitoRealizacao(id="r-1", habito_id="h-1", usuario_id="u-1", data_realizacao=date(2025, 1, 1)))
+        sessao.flush()
+        reconstruir_objetivo_stats(sessao)
+        sessao.commit()
+        yield sessao
+    engine.dispose()
+
+def test_falha_no_meio_da_exclusao(db, monkeypatch):
+    """Blocos já confirmados saem das estatísticas; o objetivo continua lá"""
+    registrar = exclusao.registrar_exclusoes
+
+    def registrar_com_falha(db, usuario_id, tabela, ids):
+        if tabela == "habitos":
+            raise RuntimeError("falha simulada")
+        registrar(db, usuario_id, tabela, ids)
+
+    monkeypatch.setattr(exclusao, "registrar_exclusoes", registrar_com_falha)
+    with pytest.raises(RuntimeError):
+        exclusao.remover_objetivos(db, "u-1", ["o-1"])
+
+    restantes = db.scalars(select(Tarefa.id)).all()
+    assert 0 < len(restantes) < TAREFAS
+    assert db.get(Objetivo, "o-1") is not None
+    assert verificar_objetivo_stats(db, "u-1") == []
+
+def test_tombstones_apenas_dos_objetivos_do_usuario(db):
+    assert exclusao.remover_objetivos(db, "u-1", ["o-1", "o-2"]) == 1
+
+    excluidos = db.scalars(
+        select(RegistroExcluido.registro_id).where(RegistroExcluido.tabela == "objetivos")
+    ).all()
+    assert excluidos == ["o-1"]
+    assert db.get(Objetivo, "o-2") is not None
+    assert verificar_objetivo_stats(db) == []
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main(["-q", __file__]))
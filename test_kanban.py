@@ -0,0 +1,90 @@
+"""
+Teste de regressão da ordem do quadro kanban (rank_kanban por coluna)
+
+As colunas do quadro reúnem mais de um status (backlog = a_fazer + backlog,
+fazendo = bloqueada + fazendo). Garante que a ordem e os vizinhos de
+POST /tarefas/{id}/move valem para a coluna exibida, não para o status, e
+que mudar o status por PATCH /status ou PATCH /bulk leva o cartão para o fim
+da coluna nova (o PUT usa NOW() do MySQL e fica fora deste teste).
+
+Não precisa do servidor nem do MySQL (usa SQLite via aiosqlite):
+    python -m pytest -q test_kanban.py
+"""
+import pytest
+
+from app.models import Habito, Objetivo, Tarefa
+
+# (id, status, rank): backlog intercalando a_fazer e backlog, fazendo com bloqueada
+TAREFAS = [
+    ("t-1", "backlog", "c"),
+    ("t-2", "a_fazer", "f"),
+    ("t-3", "backlog", "i"),
+    ("t-4", "a_fazer", "l"),
+    ("t-5", "fazendo", "h"),
+    ("t-6", "bloqueada", "p"),
+]
+
+def popular(db):
+    """Um hábito do usuário u-1 com as tarefas de TAREFAS"""
+    db.add(Objetivo(id="o-1", usuario_id="u-1", titulo="Estudos"))
+    db.add(Habito(
+        id="h-1", usuario_id="u-1", objetivo_id="o-1", titulo="Ler",
+        frequencia="diario", alvo_por_periodo=1
+    ))
+    for tarefa_id, status, rank in TAREFAS:
+        db.add(Tarefa(
+            id=tarefa_id, usuario_id="u-1", habito_id="h-1", titulo=tarefa_id,
+            status=status, rank_kanban=rank
+        ))
+
+@pytest.fixture
+def client(banco_sqlite):
+    return banco_sqlite(popular)
+
+def quadro(client):
+    resposta = client.get("/api/v1/tarefas/kanban/habito/h-1")
+    assert resposta.status_code == 200, resposta.text
+    return {coluna: [tarefa["id"] for tarefa in tarefas] for coluna, tarefas in resposta.json()["data"].items()}
+
+def test_coluna_reune_status(client):
+    """A coluna segue rank_kanban, qualquer que seja o status de cada cartão"""
+    assert quadro(client) == {"backlog": ["t-1", "t-2", "t-3", "t-4"], "fazendo": ["t-5", "t-6"], "feito": []}
+
+def test_mover_entre_status_diferentes(client):
+    """Vizinhos com status diferentes na mesma coluna são aceitos; o status é mantido"""
+    resposta = client.post("/api/v1/tarefas/t-4/move", json={
+        "statusKanban": "backlog", "anteriorId": "t-1", "proximoId": "t-2"
+    })
+    assert resposta.status_code == 200, resposta.text
+    assert resposta.json()["data"]["status"] == "a_fazer"
+    assert quadro(client)["backlog"] == ["t-1", "t-4", "t-2", "t-3"]
+
+    resposta = client.post("/api/v1/tarefas/t-1/move", json={
+        "statusKanban": "fazendo", "anteriorId": "t-5", "proximoId": "t-6"
+    })
+    assert resposta.status_code == 200, resposta.text
+    assert resposta.json()["data"]["status"] == "fazendo"
+    assert quadro(client)["fazendo"] == ["t-5", "t-1", "t-6"]
+
+def test_vizinho_de_outra_coluna(client):
+    resposta = client.post("/api/v1/tarefas/t-1/move", json={"statusKanban": "backlog", "anteriorId": "t-5"})
+    assert resposta.status_code == 400
+
+def test_mudanca_de_status_vai_para_o_fim(client):
+    """Fora de /move, mudar de coluna põe o cartão no fim; na mesma coluna a posição é mantida"""
+    resposta = client.patch("/api/v1/tarefas/t-1/status", params={"status_kanban": "fazendo"})
+    assert resposta.status_code == 200, resposta.text
+    assert resposta.json()["data"]["rank_kanban"] > "p"
+
+    client.patch("/api/v1/tarefas/t-2/status", params={"status_kanban": "fazendo"})
+    resposta = client.patch("/api/v1/tarefas/bulk", json={"tarefas": [
+        {"id": "t-3", "status": "concluida"},
+        {"id": "t-5", "status": "concluida"},
+        {"id": "t-4", "status": "backlog"},
+    ]})
+    assert resposta.status_code == 200, resposta.text
+
+    assert quadro(client) == {"backlog": ["t-4"], "fazendo": ["t-6", "t-1", "t-2"], "feito": ["t-3", "t-5"]}
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main(["-q", __file__]))
@@ -0,0 +1,41 @@
+"""
+Teste de regressão do acesso a GET /metrics
+
+As métricas internas ficam desligadas por padrão (settings.metrics_enabled)
+e, quando ligadas, exigem um usuário autenticado.
+
+Não precisa do servidor nem do MySQL:
+    python -m pytest -q test_metricas.py
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+from app.services.auth import get_current_user
+from conftest import USUARIO
+
+@pytest.fixture
+def autenticado():
+    async def usuario_teste():
+        return USUARIO
+
+    app.dependency_overrides[get_current_user] = usuario_teste
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+def test_desligadas_por_padrao(autenticado):
+    assert autenticado.get("/metrics").status_code == 404
+
+def test_ligadas(autenticado, monkeypatch):
+    monkeypatch.setattr(settings, "metrics_enabled", True)
+    resposta = autenticado.get("/metrics")
+    assert resposta.status_code == 200, resposta.text
+    assert {"fila_progresso", "logs", "dashboard", "caches"} <= set(resposta.json())
+
+def test_sem_autenticacao(monkeypatch):
+    monkeypatch.setattr(settings, "metrics_enabled", True)
+    assert TestClient(app).get("/metrics").status_code in (401, 403)
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main(["-q", __file__]))
@@ -0,0 +1,120 @@
+"""
+Teste de saída de referência (golden) da serialização de tarefas
+
+Garante que o JSON de GET /habitos/{id}/tarefas continua byte a byte igual
+ao gerado antes por TarefaResponse.model_validate(...).model_dump(by_alias=True),
+tanto para instâncias ORM (serialize_tarefas) quanto para tuplas Core
+(serialize_tarefas_linhas), com e sem fast_json_responses.
+
+Não precisa do servidor nem do MySQL (usa SQLite em memória):
+    python -m pytest -q test_serializacao_tarefas.py
+"""
+from datetime import datetime, date
+from decimal import Decimal
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+
+from app.core.config import settings
+from app.models import Tarefa
+from app.schemas.base import DataResponse
+from app.schemas.tarefa import TarefaResponse
+from app.utils.responses import resposta_lista
+from app.utils.serialization import serialize_tarefas, serialize_tarefas_linhas, colunas_modelo
+
+# JSON de referência gerado pela implementação com TarefaResponse
+GOLDEN = (
+    '{"data":['
+    '{"id":"t-1","usuarioId":"u-1","habitoId":"h-1","titulo":"Ler capítulo 3","descricao":"Anotações em «português» ✓",'
+    '"prioridade":"alta","status":"fazendo","estimativaHoras":"2.50","horasGastas":"1.25","prazo":"2025-03-01",'
+    '"progresso":"50.00","posicao":1,"rankKanban":"i","tags":["leitura","estudo"],"anexos":["https://exemplo.com/a.pdf"],'
+    '"createdAt":"2025-01-01T12:00:00","updatedAt":"2025-01-02T08:30:15.123456","concluidaEm":null},'
+    '{"id":"t-2","usuarioId":"u-1","habitoId":"h-1","titulo":"Revisar","descricao":null,'
+    '"prioridade":null,"status":"concluida","estimativaHoras":null,"horasGastas":"0.00","prazo":null,'
+    '"progresso":"100.00","posicao":2,"rankKanban":null,"tags":null,"anexos":null,'
+    '"createdAt":"2025-01-01T12:00:01","updatedAt":"2025-01-01T12:00:01","concluidaEm":"2025-01-01T12:00:01"}'
+    '],"pagination":null}'
+).encode("utf-8")
+
+def criar_tarefas():
+    return [
+        Tarefa(
+            id="t-1", usuario_id="u-1", habito_id="h-1", titulo="Ler capítulo 3",
+            descricao="Anotações em «português» ✓", prioridade="alta", status="fazendo",
+            estimativa_horas=Decimal("2.50"), horas_gastas=Decimal("1.25"), prazo=date(2025, 3, 1),
+            progresso=Decimal("50.00"), posicao=1, rank_kanban="i", tags=["leitura", "estudo"],
+            anexos=["https://exemplo.com/a.pdf"],
+            created_at=datetime(2025, 1, 1, 12, 0, 0), updated_at=datetime(2025, 1, 2, 8, 30, 15, 123456)
+        ),
+        Tarefa(
+            id="t-2", usuario_id="u-1", habito_id="h-1", titulo="Revisar",
+            descricao=None, prioridade=None, status="concluida",
+            estimativa_horas=None, horas_gastas=Decimal("0.00"), prazo=None,
+            progresso=Decimal("100.00"), posicao=2, rank_kanban=None, tags=None, anexos=None,
+            created_at=datetime(2025, 1, 1, 12, 0, 1), updated_at=datetime(2025, 1, 1, 12, 0, 1),
+            concluida_em=datetime(2025, 1, 1, 12, 0, 1)
+        ),
+    ]
+
+def linhas_core(tarefas):
+    """Tuplas Core reais (SELECT das colunas de Tarefa em SQLite)"""
+    engine = create_engine("sqlite://")
+    Tarefa.__table__.create(engine)
+    colunas = colunas_modelo(Tarefa)
+    with engine.begin() as conn:
+        conn.execute(Tarefa.__table__.insert(), [
+            {coluna.key: getattr(tarefa, coluna.key) for coluna in colunas}
+            for tarefa in tarefas
+        ])
+        return conn.execute(select(*colunas).order_by(Tarefa.posicao)).all()
+
+def criar_app(tarefas, linhas) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/pydantic", response_model=DataResponse)
+    async def pydantic():
+        return DataResponse(data=[
+            TarefaResponse.model_validate(t).model_dump(by_alias=True, exclude_none=False)
+            for t in tarefas
+        ])
+
+    @app.get("/instancias", response_model=DataResponse)
+    async def instancias():
+        return resposta_lista(serialize_tarefas(tarefas))
+
+    @app.get("/linhas", response_model=DataResponse)
+    async def core():
+        return resposta_lista(serialize_tarefas_linhas(linhas))
+
+    return app
+
+def corpos(rapido: bool):
+    tarefas = criar_tarefas()
+    client = TestClient(criar_app(tarefas, linhas_core(tarefas)))
+    anterior = settings.fast_json_responses
+    settings.fast_json_responses = rapido
+    try:
+        return {rota: client.get(rota).content for rota in ("/pydantic", "/instancias", "/linhas")}
+    finally:
+        settings.fast_json_responses = anterior
+
+def test_golden_pydantic():
+    """A implementação anterior gera exatamente o JSON de referência"""
+    assert corpos(False)["/pydantic"] == GOLDEN
+
+def test_serializacao_tarefas_identica():
+    for rapido in (False, True):
+        resultado = corpos(rapido)
+        assert resultado["/instancias"] == GOLDEN, f"instâncias (fast_json_responses={rapido})"
+        assert resultado["/linhas"] == GOLDEN, f"linhas Core (fast_json_responses={rapido})"
+
+def test_serializacao_tarefas_vazia():
+    assert serialize_tarefas([]) == []
+    assert serialize_tarefas_linhas([]) == []
+
+if __name__ == "__main__":
+    test_golden_pydantic()
+    test_serializacao_tarefas_identica()
+    test_serializacao_tarefas_vazia()
+    print("✅ Serialização de tarefas idêntica à referência")
@@ -0,0 +1,124 @@
+"""
+Teste de regressão de GET /sync (sincronização incremental em NDJSON)
+
+Garante que sem cursor o stream traz a carga completa de todas as entidades
+do usuário, que com cursor traz apenas o alterado e os tombstones gravados
+depois dele, que a leitura em blocos (sync_chunk_size) não repete nem perde
+linhas e que o cursor da linha "fim" pode ser usado na chamada seguinte.
+
+Não precisa do servidor nem do MySQL (usa SQLite via aiosqlite):
+    python -m pytest -q test_sincronizacao.py
+"""
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.models import Habito, HabitoRealizacao, Objetivo, RegistroExcluido, Tarefa
+from app.services.sincronizacao import codificar_cursor
+
+TAREFAS = 7
+REALIZACOES = 3
+# Tarefas alteradas depois do cursor (as demais ficam antes dele)
+TAREFAS_ALTERADAS = 2
+# Instantes relativos ao relógio do banco (func.now() em UTC no SQLite)
+AGORA = datetime.utcnow().replace(microsecond=0)
+ANTES = AGORA - timedelta(hours=2)
+CURSOR = AGORA - timedelta(hours=1)
+
+def popular(db):
+    """Dados do usuário u-1 antes e depois de CURSOR (e de outro usuário)"""
+    db.add(Objetivo(id="o-1", usuario_id="u-1", titulo="Saúde", created_at=ANTES, updated_at=ANTES))
+    db.add(Habito(
+        id="h-1", usuario_id="u-1", objetivo_id="o-1", titulo="Correr",
+        frequencia="diario", alvo_por_periodo=1, created_at=ANTES, updated_at=ANTES
+    ))
+    # Outro usuário (não pode aparecer no stream)
+    db.add(Objetivo(id="o-2", usuario_id="u-2", titulo="Leitura"))
+    db.add(RegistroExcluido(usuario_id="u-2", tabela="tarefas", registro_id="t-outro", excluido_em=AGORA))
+
+    for i in range(TAREFAS):
+        momento = AGORA if i < TAREFAS_ALTERADAS else ANTES
+        db.add(Tarefa(
+            id=f"t-{i:02d}", usuario_id="u-1", habito_id="h-1", titulo=f"Tarefa {i}",
+            created_at=ANTES, updated_at=momento
+        ))
+    for i in range(REALIZACOES):
+        db.add(HabitoRealizacao(
+            id=f"r-{i:02d}", habito_id="h-1", usuario_id="u-1",
+            data_realizacao=ANTES.date(), created_at=ANTES
+        ))
+    db.add(RegistroExcluido(usuario_id="u-1", tabela="tarefas", registro_id="t-antiga", excluido_em=ANTES))
+    db.add(RegistroExcluido(usuario_id="u-1", tabela="tarefas", registro_id="t-99", excluido_em=AGORA))
+
+@pytest.fixture
+def client(banco_sqlite, monkeypatch):
+    # Blocos pequenos para exercitar a paginação keyset do stream
+    monkeypatch.setattr(settings, "sync_chunk_size", 3)
+    return banco_sqlite(popular)
+
+def sincronizar(client, since=None):
+    resposta = client.get("/api/v1/sync", params={"since": since} if since else {})
+    assert resposta.status_code == 200, resposta.text
+    assert resposta.headers["content-type"].startswith("application/x-ndjson")
+    linhas = [json.loads(linha) for linha in resposta.text.splitlines()]
+    assert linhas[0]["tipo"] == "inicio" and linhas[-1]["tipo"] == "fim"
+    assert linhas[-1]["total"] == len(linhas) - 2
+    return linhas
+
+def test_carga_completa(client):
+    """Sem cursor: todas as entidades do usuário, pais antes dos filhos, sem repetições"""
+    linhas = sincronizar(client)
+    assert linhas[0]["completo"] is True
+
+    corpo = linhas[1:-1]
+    assert all(linha["op"] == "upsert" for linha in corpo)
+    tipos = [linha["tipo"] for linha in corpo]
+    assert tipos == ["objetivos", "habitos"] + ["tarefas"] * TAREFAS + ["habito_realizacoes"] * REALIZACOES
+    assert len({(linha["tipo"], linha["dados"]["id"]) for linha in corpo}) == len(corpo)
+    assert corpo[0]["dados"]["titulo"] == "Saúde"
+
+def test_incremental(client):
+    """Com cursor: só as alterações e as exclusões posteriores a ele"""
+    linhas = sincronizar(client, codificar_cursor(CURSOR))
+    assert linhas[0]["completo"] is False
+
+    upserts = sorted(linha["dados"]["id"] for linha in linhas if linha.get("op") == "upsert")
+    assert upserts == [f"t-{i:02d}" for i in range(TAREFAS_ALTERADAS)]
+    exclusoes = [(linha["tipo"], linha["id"]) for linha in linhas if linha.get("op") == "delete"]
+    assert exclusoes == [("tarefas", "t-99")]
+
+def test_cursor_da_resposta(client):
+    """O cursor da linha "fim" é aceito e cobre as alterações recentes (margem)"""
+    cursor = sincronizar(client)[-1]["cursor"]
+    linhas = sincronizar(client, cursor)
+    assert linhas[0]["completo"] is False
+    assert all(linha["dados"]["id"] not in ("o-1", "h-1") for linha in linhas if linha.get("op") == "upsert")
+
+def test_ordem_kanban(client, monkeypatch):
+    """Mover um cartão (e rebalancear a coluna, aqui sem chaves) é enviado como alteração"""
+    # O SQLite guarda func.now() sem microssegundos e compara datas como texto:
+    # o keyset entre blocos só vale para os instantes gravados pelo Python
+    monkeypatch.setattr(settings, "sync_chunk_size", 100)
+    resposta = client.post("/api/v1/tarefas/t-06/move", json={"anteriorId": "t-02", "proximoId": "t-03"})
+    assert resposta.status_code == 200, resposta.text
+
+    linhas = sincronizar(client, codificar_cursor(CURSOR))
+    ranks = {linha["dados"]["id"]: linha["dados"]["rank_kanban"] for linha in linhas if linha.get("op") == "upsert" and linha["tipo"] == "tarefas"}
+    assert len(ranks) == TAREFAS
+    assert ranks["t-02"] < ranks["t-06"] < ranks["t-03"]
+
+def test_cursor_expirado(client):
+    """Cursor mais antigo que a retenção dos tombstones: carga completa"""
+    antigo = AGORA - timedelta(days=settings.sync_tombstone_retention_days + 1)
+    linhas = sincronizar(client, codificar_cursor(antigo))
+    assert linhas[0]["completo"] is True
+    assert not any(linha.get("op") == "delete" for linha in linhas)
+
+def test_cursor_invalido(client):
+    resposta = client.get("/api/v1/sync", params={"since": "invalido"})
+    assert resposta.status_code == 400
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main(["-q", __file__]))
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Verificação dos planos de execução (EXPLAIN) das consultas da API no MySQL.
+
+Monta as consultas com os mesmos formatos usados pelas rotas (listagens
+paginadas por coluna de ordenação, filtros por status/hábito/objetivo,
+página por cursor, quadro kanban, dashboard, feed de atividades e
+estatísticas) para um usuário real do banco e sinaliza as que fazem
+leitura completa da tabela (type=ALL) ou ordenação fora do índice
+(Using filesort).
+
+    python verificar_planos_consultas.py                 # usuário com mais tarefas
+    python verificar_planos_consultas.py --usuario ID
+    python verificar_planos_consultas.py --detalhes      # imprime o EXPLAIN de todas
+
+Com settings.fulltext_search ativo também confere as buscas (FULLTEXT),
+em que a ordenação das linhas encontradas por filesort é esperada.
+
+Retorna código 1 se alguma consulta foi sinalizada. Rode após
+`alembic upgrade head`, em um banco com volume realista: em tabelas quase
+vazias o MySQL pode preferir a leitura completa mesmo com o índice certo.
+"""
+import argparse
+import sys
+from datetime import datetime
+
+from sqlalchemy import desc, func, select
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models import Objetivo, ObjetivoStats, Habito, Tarefa
+from app.services.atividades import consulta_atividades
+from app.services.dashboard import consulta_estatisticas_dashboard, consulta_realizacoes_semana
+from app.services.estatisticas import consulta_estatisticas
+from app.services.kanban import ORDEM_KANBAN
+from app.utils.busca import condicao_busca
+from app.utils.pagination import COLUNAS_ORDENACAO, condicao_keyset
+from app.utils.serialization import colunas_modelo
+
+LIMITE_PAGINA = 51  # limit padrão (50) + a linha extra de has_next
+
+# Buscas: o índice FULLTEXT seleciona as linhas e a ordenação é feita sobre elas
+FILESORT_ESPERADO = ("?busca=",)
+
+
+def pagina(query, coluna, coluna_id):
+    """Primeira página como montada por paginar() (ordem desc)"""
+    return query.order_by(desc(coluna), desc(coluna_id)).limit(LIMITE_PAGINA)
+
+
+def consultas_da_api(usuario_id: str, objetivo_id: str, habito_id: str):
+    """(nome, consulta) com os formatos de consulta das rotas"""
+    agora = datetime.utcnow()
+
+    listagens = {
+        "objetivos": (
+            Objetivo,
+            select(Objetivo, ObjetivoStats)
+            .outerjoin(ObjetivoStats, ObjetivoStats.objetivo_id == Objetivo.id)
+            .where(Objetivo.usuario_id == usuario_id)
+        ),
+        "habitos": (Habito, select(Habito).where(Habito.usuario_id == usuario_id)),
+        "tarefas": (Tarefa, select(Tarefa).where(Tarefa.usuario_id == usuario_id)),
+    }
+    for tabela, (modelo, query) in listagens.items():
+        for coluna in COLUNAS_ORDENACAO[tabela]:
+            yield f"GET /{tabela}?order_by={coluna}", pagina(query, getattr(modelo, coluna), modelo.id)
+        yield f"GET /{tabela} (contagem)", select(func.count()).select_from(query.subquery())
+
+    # Filtros por status (um status: igualdade no índice (usuario_id, status, created_at, id))
+    for modelo, status in ((Objetivo, "em_andamento"), (Habito, "ativo"), (Tarefa, "fazendo")):
+        query = select(modelo).where(modelo.usuario_id == usuario_id, modelo.status == status)
+        yield f"GET /{modelo.__tablename__}?status={status}", pagina(query, modelo.created_at, modelo.id)
+
+    # Página seguinte por cursor (keyset)
+    query = select(Tarefa).where(
+        Tarefa.usuario_id == usuario_id,
+        condicao_keyset(Tarefa.created_at, Tarefa.id, "desc", agora, "ffffffff")
+    )
+    yield "GET /tarefas?cursor=...", pagina(query, Tarefa.created_at, Tarefa.id)
+
+    # Relacionamentos
+    query = select(Habito).where(Habito.usuario_id == usuario_id, Habito.objetivo_id == objetivo_id)
+    yield "GET /objetivos/{id}/habitos", pagina(query, Habito.created_at, Habito.id)
+
+    query = select(*colunas_modelo(Tarefa)).where(Tarefa.usuario_id == usuario_id, Tarefa.habito_id == habito_id)
+    yield "GET /habitos/{id}/tarefas", pagina(query, Tarefa.created_at, Tarefa.id)
+
+    habitos_ids = select(Habito.id).where(Habito.objetivo_id == objetivo_id, Habito.usuario_id == usuario_id)
+    query = select(Tarefa).where(Tarefa.habito_id.in_(habitos_ids), Tarefa.usuario_id == usuario_id)
+    yield "GET /objetivos/{id}/tarefas", pagina(query, Tarefa.created_at, Tarefa.id)
+
+    # Quadro kanban: cartões do hábito na ordem de rank_kanban (agrupados por coluna na rota)
+    query = select(Tarefa).where(Tarefa.habito_id == habito_id, Tarefa.usuario_id == usuario_id)
+    yield "GET /tarefas/kanban/habito/{id}", query.order_by(*ORDEM_KANBAN)
+
+    # Busca (FULLTEXT), por data e por relevância
+    if settings.fulltext_search:
+        for modelo in (Objetivo, Habito, Tarefa):
+            condicao, relevancia = condicao_busca(modelo, "meta")
+            query = select(modelo).where(modelo.usuario_id == usuario_id, condicao)
+            yield f"GET /{modelo.__tablename__}?busca=meta", pagina(query, modelo.created_at, modelo.id)
+            yield (
+                f"GET /{modelo.__tablename__}?busca=meta&order_by=relevancia",
+                pagina(query.add_columns(relevancia), relevancia, modelo.id)
+            )
+
+    # Dashboard e feed de atividades
+    yield "GET /dashboard/stats", consulta_estatisticas_dashboard(usuario_id, agora)
+    yield "GET /dashboard/stats (em cache)", consulta_realizacoes_semana(usuario_id, agora)
+    yield "GET /dashboard/recent-activity", consulta_atividades(usuario_id, 11)
+    yield "GET /dashboard/recent-activity?cursor=...", consulta_atividades(usuario_id, 11, (agora, "ffffffff"))
+
+    # Estatísticas por objetivo (objetivo_stats)
+    yield "estatísticas do objetivo", consulta_estatisticas(usuario_id=usuario_id, objetivo_id=objetivo_id)
+    yield "totais das tarefas do hábito", select(func.count(Tarefa.id)).where(
+        Tarefa.habito_id == habito_id, Tarefa.usuario_id == usuario_id
+    )
+
+
+def sql_literal(query) -> str:
+    return str(query.compile(
+        dialect=engine.dialect,
+        compile_kwargs={"literal_binds": True, "render_postcompile": True}
+    ))
+
+
+def problemas(plano, filesort_esperado: bool = False) -> list:
+    """Leituras completas e filesorts em tabelas reais (tabelas derivadas são ignoradas)"""
+    encontrados = []
+    for linha in plano:
+        tabela = linha.get("table") or ""
+        if tabela.startswith("<"):
+            continue
+        extra = linha.get("Extra") or ""
+        if linha.get("type") == "ALL":
+            encontrados.append(f"leitura completa de {tabela}")
+        if "Using filesort" in extra and not filesort_esperado:
+            encontrados.append(f"filesort em {tabela}")
+    return encontrados
+
+
+def amostra(conn, usuario_id):
+    """(usuario_id, objetivo_id, habito_id) de um usuário com dados"""
+    if usuario_id is None:
+        usuario_id = conn.execute(
+            select(Tarefa.usuario_id).group_by(Tarefa.usuario_id).order_by(func.count().desc()).limit(1)
+        ).scalar()
+    if usuario_id is None:
+        return None
+    habito = conn.execute(
+        select(Habito.id, Habito.objetivo_id).where(Habito.usuario_id == usuario_id).limit(1)
+    ).first()
+    objetivo_id, habito_id = (habito.objetivo_id, habito.id) if habito else ("-", "-")
+    return usuario_id, objetivo_id, habito_id
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="EXPLAIN das consultas da API")
+    parser.add_argument("--usuario", help="usuario_id usado nas consultas (padrão: o com mais tarefas)")
+    parser.add_argument("--detalhes", action="store_true", help="imprime o plano de todas as consultas")
+    args = parser.parse_args()
+
+    with engine.connect() as conn:
+        parametros = amostra(conn, args.usuario)
+        if parametros is None:
+            print("❌ Nenhuma tarefa no banco: informe --usuario")
+            return 1
+        print(f"🔍 Planos de execução para o usuário {parametros[0]}\n")
+
+        sinalizadas = 0
+        for nome, query in consultas_da_api(*parametros):
+            plano = [dict(linha._mapping) for linha in conn.exec_driver_sql("EXPLAIN " + sql_literal(query))]
+            encontrados = problemas(plano, any(marca in nome for marca in FILESORT_ESPERADO))
+            if encontrados:
+                sinalizadas += 1
+            print(f"{'⚠️ ' if encontrados else '✅'} {nome}" + (f"  ->  {', '.join(encontrados)}" if encontrados else ""))
+
+            if args.detalhes or encontrados:
+                for linha in plano:
+                    print(
+                        f"      {linha.get('table')}: type={linha.get('type')} key={linha.get('key')} "
+                        f"rows={linha.get('rows')} extra={linha.get('Extra')}"
+                    )
+
+    print(f"\n{sinalizadas} consulta(s) sinalizada(s)")
+    return 1 if sinalizadas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())